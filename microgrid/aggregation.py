@@ -0,0 +1,228 @@
+import numpy as np
+from microgrid.engine import Network
+from microgrid.matrix import LinearProgram, NetworkProgram, add_energy_balance, storage_efficiencies, run_highs
+
+
+def cluster_periods(features: np.ndarray, n_clusters: int, seed: int = 0, iterations: int = 100):
+    """
+    k-means over period feature vectors (one row per period). Returns the cluster of every period and
+    the medoid of every cluster - the real period closest to its centre, used as the representative.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(features))
+
+    # k-means++ initialisation
+    centres = features[[rng.integers(len(features))]]
+    while len(centres) < n_clusters:
+        distances = ((features[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        if distances.sum() == 0:
+            choice = rng.integers(len(features))
+        else:
+            choice = rng.choice(len(features), p=distances / distances.sum())
+        centres = np.vstack([centres, features[choice]])
+
+    assignment = None
+    for _ in range(iterations):
+        distances = ((features[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+        new_assignment = distances.argmin(axis=1)
+        if assignment is not None and (new_assignment == assignment).all():
+            break
+        assignment = new_assignment
+        for c in range(n_clusters):
+            if (assignment == c).any():
+                centres[c] = features[assignment == c].mean(axis=0)
+
+    # Drop clusters that ended up empty and renumber
+    used = np.unique(assignment)
+    assignment = np.searchsorted(used, assignment)
+    centres = centres[used]
+    distances = ((features[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+    medoids = np.array([
+        np.flatnonzero(assignment == c)[distances[assignment == c, c].argmin()] for c in range(len(used))
+    ])
+    return assignment, medoids
+
+
+class TimeAggregation:
+    """
+    Solve a network on k weighted representative periods instead of every timestep.
+
+    The horizon is cut into periods of period_length timesteps (e.g. 24 for days of hourly data) which are
+    clustered on their load consumptions, generator capacities and generator costs. Each cluster is
+    represented by its medoid period, weighted by the number of periods it stands for.
+
+    Storage is linked between periods following Kotzur et al. (2018): each representative period has an
+    intra-period SOC relative to its start, and an inter-period SOC chain over the original periods carries
+    the net change of each period's representative, so energy can still be shifted between periods.
+    """
+    def __init__(self, network: Network, period_length: int, n_representatives: int, seed: int = 0):
+        network.check_timesteps()
+        if len(network.timesteps) % period_length:
+            raise ValueError(f"{len(network.timesteps)} timesteps can not be split into periods of {period_length}")
+        self.network = network
+        self.buses = list(network.buses.values())
+        self.generators = network.generator_table.components
+        self.loads = network.load_table.components
+        self.storage_units = network.storage_table.components
+        self.lines = network.line_table.components
+        self.period_length = period_length
+        self.n_periods = len(network.timesteps) // period_length
+
+        series = [
+            network.load_table.column('consumptions'),
+            network.generator_table.column('capacities'),
+            network.generator_table.column('costs'),
+        ]
+        features = []
+        for values in series:
+            scale = np.abs(values).max() or 1.0
+            periods = values.reshape(len(values), self.n_periods, period_length) / scale
+            features.append(periods.transpose(1, 0, 2).reshape(self.n_periods, -1))
+        features = np.hstack(features)
+
+        self.period_cluster, self.representatives = cluster_periods(features, n_representatives, seed)
+        self.weights = np.bincount(self.period_cluster, minlength=len(self.representatives)).astype(float)
+        self.objective = None
+
+    @property
+    def compression_ratio(self) -> float:
+        """Original timesteps per timestep in the reduced problem."""
+        return self.n_periods / len(self.representatives)
+
+    def representative_series(self, table, attribute) -> np.ndarray:
+        """(component, representative, timestep within period) input series."""
+        values = table.column(attribute)
+        periods = values.reshape(len(values), self.n_periods, self.period_length)
+        return periods[:, self.representatives, :]
+
+    def build(self):
+        network = self.network
+        lp = self.lp = LinearProgram()
+        C, P, D = len(self.representatives), self.period_length, self.n_periods
+        generators, storage, lines = network.generator_table, network.storage_table, network.line_table
+        S = len(storage)
+
+        # Dispatch variables only exist for the representative periods, costs weighted by how often each occurs
+        costs = self.representative_series(generators, 'costs') * self.weights[None, :, None]
+        self.generator_outputs = lp.add_variables(0, self.representative_series(generators, 'capacities'), costs)
+        self.charge_inflows = lp.add_variables(0, self.representative_series(storage, 'max_charge_capacities'))
+        self.discharge_outflows = lp.add_variables(0, self.representative_series(storage, 'max_discharge_capacities'))
+        line_capacities = self.representative_series(lines, 'capacities')
+        self.flows = lp.add_variables(-line_capacities, line_capacities)
+
+        self.energy_balance, _ = add_energy_balance(
+            lp, self, self.generator_outputs, self.charge_inflows, self.discharge_outflows, self.flows,
+            self.representative_series(network.load_table, 'consumptions'),
+        )
+
+        # Intra-period SOC at every timestep boundary of a representative period, relative to its start
+        max_soc = np.array([su.max_soc_capacity for su in storage.components], dtype=float)
+        intra_bound = np.broadcast_to(max_soc[:, None, None], (S, C, P + 1)).copy()
+        intra_lower = -intra_bound
+        intra_lower[:, :, 0] = intra_bound[:, :, 0] = 0
+        self.intra_socs = lp.add_variables(intra_lower, intra_bound)
+
+        charge_efficiency, discharge_efficiency = storage_efficiencies(storage.components)
+        consumptions = self.representative_series(storage, 'consumptions')
+        intra_balance = lp.add_constraints(-consumptions, -consumptions)
+        lp.add_coefficients(intra_balance, self.intra_socs[:, :, 1:], 1.0)
+        lp.add_coefficients(intra_balance, self.intra_socs[:, :, :-1], -1.0)
+        lp.add_coefficients(intra_balance, self.charge_inflows, -charge_efficiency[:, :, None])
+        lp.add_coefficients(intra_balance, self.discharge_outflows, 1 / discharge_efficiency[:, :, None])
+
+        # floor >= requirement - intra SOC and ceiling >= intra SOC at every boundary of the period, so the
+        # SOC bounds only need checking once per original period on the inter-period chain
+        requirements = np.zeros((S, C, P + 1))
+        requirements[:, :, :P] = np.maximum(self.representative_series(storage, 'min_soc_requirements_start_of_ts'), 0)
+        self.soc_floors = lp.add_variables(np.full((S, C), -np.inf), np.inf)
+        self.soc_ceilings = lp.add_variables(np.full((S, C), -np.inf), np.inf)
+        floor_rows = lp.add_constraints(requirements, np.inf)
+        lp.add_coefficients(floor_rows, self.soc_floors[:, :, None], 1.0)
+        lp.add_coefficients(floor_rows, self.intra_socs, 1.0)
+        ceiling_rows = lp.add_constraints(np.zeros((S, C, P + 1)), np.inf)
+        lp.add_coefficients(ceiling_rows, self.soc_ceilings[:, :, None], 1.0)
+        lp.add_coefficients(ceiling_rows, self.intra_socs, -1.0)
+
+        # Inter-period SOC at the start of every original period, plus the end of the horizon
+        min_socs = storage.column('min_soc_requirements_start_of_ts')
+        inter_lower = np.zeros((S, D + 1))
+        inter_upper = np.broadcast_to(max_soc[:, None], (S, D + 1)).copy()
+        inter_lower[:, 0] = inter_upper[:, 0] = min_socs[:, 0]
+        inter_lower[:, -1] = inter_upper[:, -1] = min_socs[:, -1]
+        self.inter_socs = lp.add_variables(inter_lower, inter_upper)
+
+        cluster = self.period_cluster
+        inter_balance = lp.add_constraints(np.zeros((S, D)), 0)
+        lp.add_coefficients(inter_balance, self.inter_socs[:, 1:], 1.0)
+        lp.add_coefficients(inter_balance, self.inter_socs[:, :-1], -1.0)
+        lp.add_coefficients(inter_balance, self.intra_socs[:, cluster, P], -1.0)
+
+        inter_floor = lp.add_constraints(np.zeros((S, D)), np.inf)
+        lp.add_coefficients(inter_floor, self.inter_socs[:, :-1], 1.0)
+        lp.add_coefficients(inter_floor, self.soc_floors[:, cluster], -1.0)
+        inter_ceiling = lp.add_constraints(np.full((S, D), -np.inf), max_soc[:, None])
+        lp.add_coefficients(inter_ceiling, self.inter_socs[:, :-1], 1.0)
+        lp.add_coefficients(inter_ceiling, self.soc_ceilings[:, cluster], 1.0)
+        return self
+
+    def solve(self):
+        """Solve the reduced problem and write the results back onto the original timestep axis."""
+        self.build()
+        print(f"Solving {len(self.representatives)} representative periods for {self.n_periods} periods ({self.compression_ratio:.1f}x compression)")
+        status, self.objective, col_value, row_dual = run_highs(self.lp)
+        if status == "Optimal":
+            self.apply(col_value, row_dual)
+        print(f"Solution: {status}")
+        return status
+
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        """(component, representative, timestep within period) -> (component, timestep) on the original axis."""
+        return values[:, self.period_cluster, :].reshape(len(values), self.n_periods * self.period_length)
+
+    def apply(self, col_value, row_dual):
+        network = self.network
+        P = self.period_length
+        network.discard_solution()
+
+        network.generator_table.result('outputs')[:] = self.expand(col_value[self.generator_outputs])
+        network.storage_table.result('charge_inflows')[:] = self.expand(col_value[self.charge_inflows])
+        network.storage_table.result('discharge_outflows')[:] = self.expand(col_value[self.discharge_outflows])
+        network.line_table.result('flows')[:] = self.expand(col_value[self.flows])
+
+        # SOC = inter-period SOC at the start of the period + intra-period SOC of its representative
+        intra = col_value[self.intra_socs][:, self.period_cluster, :]
+        inter = col_value[self.inter_socs][:, :-1, None]
+        socs = inter + intra
+        T = self.n_periods * P
+        network.storage_table.result('socs_start_of_ts')[:] = socs[:, :, :P].reshape(len(socs), T)
+        network.storage_table.result('socs_end_of_ts')[:] = socs[:, :, 1:].reshape(len(socs), T)
+
+        # Duals are per weighted representative timestep, so divide out the weight to get a price
+        prices = self.expand(row_dual[self.energy_balance] / self.weights[None, :, None])
+        for bus, bus_prices in zip(network.buses.values(), prices):
+            bus.nodal_prices[:] = bus_prices.tolist()
+
+    def compare(self) -> dict:
+        """Solve the full problem (without writing it into the network) and report the aggregation error."""
+        program = NetworkProgram(self.network).build()
+        status, objective, col_value, row_dual = program.run()
+        if status != "Optimal" or self.objective is None:
+            raise RuntimeError(f"Can not compare, full solve status {status}, aggregated objective {self.objective}")
+
+        full_prices = row_dual[program.energy_balance]
+        prices = np.array([bus.nodal_prices for bus in self.network.buses.values()], dtype=float)
+        full_outputs = col_value[program.generator_outputs]
+        outputs = self.network.generator_table.result('outputs')
+        report = {
+            'compression_ratio': self.compression_ratio,
+            'columns': self.lp.num_col,
+            'full_columns': program.lp.num_col,
+            'objective': self.objective,
+            'full_objective': objective,
+            'objective_error': (self.objective - objective) / objective if objective else self.objective - objective,
+            'price_mae': float(np.abs(prices - full_prices).mean()) if prices.size else 0.0,
+            'generator_output_mae': float(np.abs(outputs - full_outputs).mean()) if outputs.size else 0.0,
+        }
+        for key, value in report.items():
+            print(f"{key}: {value}")
+        return report
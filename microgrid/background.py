@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import Future
+import multiprocessing
+from multiprocessing.connection import wait
+import os
+import signal
+import threading
+from microgrid.results import Solution
+from microgrid.stats import json_records
+
+
+def _solve_worker(connection, network, solve_kwargs):
+    # Own process group, so cancelling can kill the worker together with the CBC process it starts
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    # The summary is emitted once, by the parent, when the result arrives
+    network.stats_hook = None
+    # The parent's snapshot stays with the parent, the solve need not detach it
+    network.solution = None
+    network.solution_views.clear()
+    # Disk-backed tables are shared with the parent after fork, so results are solved into private pages
+    # and only reach the parent's files through SolveFuture._apply
+    for table in network.tables().values():
+        table.copy_on_write()
+    try:
+        status = network.solve(**solve_kwargs)
+        results = {
+            name: {attribute: table.result(attribute) for attribute in table.result_attributes}
+            for name, table in network.tables().items()
+        }
+        prices = {bus.name: list(bus.nodal_prices) for bus in network.buses.values()}
+        connection.send((status, results, prices, network.solve_stats))
+    except BaseException as e:
+        connection.send(e)
+    finally:
+        connection.close()
+
+
+def _kill(process):
+    if not process.is_alive():
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No process groups (Windows) or the worker has not called setsid yet
+        process.kill()
+
+
+class SolveFuture(Future):
+    """
+    A Network.solve running in a worker process (see solve_in_background).
+
+    The future stays pending until the solve has finished, so cancel() works at any point and kills
+    the worker and its solver. A timeout kills them the same way and fails the future with TimeoutError.
+    """
+    def __init__(self, network, timeout: float = None, **solve_kwargs):
+        super().__init__()
+        self.network = network
+        self._connection, worker_connection = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(target=_solve_worker, args=(worker_connection, network, solve_kwargs), daemon=True)
+        self._process.start()
+        worker_connection.close()
+        self.add_done_callback(lambda future: future.cancelled() and _kill(self._process))
+        threading.Thread(target=self._watch, args=(timeout,), daemon=True).start()
+
+    def _watch(self, timeout):
+        ready = wait([self._connection, self._process.sentinel], timeout)
+        try:
+            message = self._connection.recv() if self._connection in ready else None
+        except EOFError:
+            message = None
+        finally:
+            if not ready:
+                _kill(self._process)
+            self._process.join()
+            self._connection.close()
+
+        if not self.set_running_or_notify_cancel():
+            return
+        if not ready:
+            self.set_exception(TimeoutError(f"Solve of {self.network.name} did not finish within {timeout}s"))
+        elif isinstance(message, BaseException):
+            self.set_exception(message)
+        elif message is None:
+            self.set_exception(RuntimeError(f"Solve worker exited with code {self._process.exitcode}"))
+        else:
+            status, results, prices, stats = message
+            self._apply(status, results, prices, stats)
+            self.set_result(status)
+
+    def _apply(self, status, results, prices, stats):
+        network = self.network
+        if status == "Optimal":
+            network.discard_solution()
+            tables = network.tables()
+            for name, arrays in results.items():
+                for attribute, values in arrays.items():
+                    tables[name].result(attribute)[:] = values
+            for bus_name, bus_prices in prices.items():
+                network.buses[bus_name].nodal_prices[:] = bus_prices
+            network.solution = Solution(network, status)
+        hook = network.stats_hook
+        stats.hook = hook if hook is None or callable(hook) else json_records(hook)
+        network.solve_stats = stats
+        stats.emit(dict(event='solve', **stats.to_dict()))
+
+
+def solve_in_background(network, timeout: float = None, **solve_kwargs) -> SolveFuture:
+    """
+    Start network.solve(**solve_kwargs) on a snapshot of the network in a worker process and return a
+    concurrent.futures.Future of its status. Results are written back into the network when the solve
+    finishes with an Optimal status, and not at all if it fails, times out or is cancelled.
+    """
+    return SolveFuture(network, timeout, **solve_kwargs)
+
+
+async def solve_async(network, timeout: float = None, **solve_kwargs) -> str:
+    """
+    Awaitable version of solve_in_background. Cancelling the awaiting task, or the timeout expiring
+    (raising TimeoutError), kills the worker and its solver.
+    """
+    future = solve_in_background(network, **solve_kwargs)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    finally:
+        future.cancel()
@@ -0,0 +1,2 @@
+from microgrid.benchmark.synthetic import synthetic_network
+from microgrid.benchmark.runner import run_benchmarks, benchmark_case, compare
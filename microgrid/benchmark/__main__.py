@@ -0,0 +1,21 @@
+import argparse
+import sys
+from microgrid.benchmark.runner import run_benchmarks, DEFAULT_BASELINE, DEFAULT_TOLERANCE, QUICK_GRID
+
+parser = argparse.ArgumentParser(description=(
+    'Time solving, saving and drawing synthetic networks against a baseline. draw_network times building '
+    'the Graphviz DOT source only, not rendering it.'
+))
+parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file, written if it does not exist')
+parser.add_argument('--update', action='store_true', help='Replace the baseline with this run instead of checking against it')
+parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed slowdown as a fraction of the baseline')
+parser.add_argument('--repeats', type=int, default=3, help='Runs per timing, the fastest is kept')
+parser.add_argument('--method', default='pulp', choices=['pulp', 'highs', 'auto', 'merit_order'],
+                    help='Network.solve method (default pulp, the default solve path)')
+parser.add_argument('--quick', action='store_true', help='Only run the smallest cases')
+parser.add_argument('--output', '-o', help='Also write this run to a results file')
+
+args = parser.parse_args()
+sys.exit(run_benchmarks(
+    QUICK_GRID if args.quick else None, args.baseline, args.tolerance, args.repeats, args.method, args.update, args.output
+))
@@ -0,0 +1,135 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from microgrid.benchmark.synthetic import synthetic_network
+from microgrid.draw import draw_network
+from microgrid.save import save_network_json, save_network_duckdb
+
+# (buses, timesteps, topology) cases
+DEFAULT_GRID = [(b, t, topology) for b in (5, 20, 50) for t in (24, 168) for topology in ("radial", "meshed")]
+QUICK_GRID = [(5, 24, "radial"), (5, 24, "meshed"), (20, 24, "meshed")]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# Slowdowns smaller than this are timer noise rather than regressions
+MIN_REGRESSION_SECONDS = 0.02
+
+
+def case_name(n_buses: int, n_timesteps: int, topology: str) -> str:
+    return f"{topology}_{n_buses}x{n_timesteps}"
+
+
+def best_of(repeats: int, function) -> float:
+    """Fastest of repeats runs of function, in seconds - the least noisy estimate of its cost."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        # Solves and saves print progress, which would bury the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark_case(n_buses: int, n_timesteps: int, topology: str, repeats: int = 3, method: str = "pulp", seed: int = 0) -> dict:
+    def build():
+        return synthetic_network(n_buses, n_timesteps, topology, seed=seed)
+
+    # draw_network is timed building the DOT source, without rendering it (which needs Graphviz installed)
+    network = build()
+    seconds = {'build': best_of(repeats, build)}
+    seconds['solve'] = best_of(repeats, lambda: network.solve(method=method))
+    with tempfile.TemporaryDirectory() as output_dir:
+        json_path = os.path.join(output_dir, "network.json")
+        duckdb_path = os.path.join(output_dir, "network.db")
+        seconds['save_network_json'] = best_of(repeats, lambda: save_network_json(network, json_path))
+        seconds['save_network_duckdb'] = best_of(repeats, lambda: save_network_duckdb(network, duckdb_path))
+    seconds['draw_network'] = best_of(repeats, lambda: draw_network(network, network.timesteps[0]).source)
+    return {
+        'n_buses': n_buses,
+        'n_timesteps': n_timesteps,
+        'topology': topology,
+        'method': network.solve_stats.method,
+        'status': network.solve_stats.status,
+        'model_size': network.solve_stats.totals(),
+        'seconds': seconds,
+    }
+
+
+def run_cases(grid: list = None, repeats: int = 3, method: str = "pulp") -> dict:
+    cases = {}
+    for n_buses, n_timesteps, topology in DEFAULT_GRID if grid is None else grid:
+        name = case_name(n_buses, n_timesteps, topology)
+        print(f"Benchmarking {name}")
+        cases[name] = benchmark_case(n_buses, n_timesteps, topology, repeats, method)
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'cases': cases,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """(case, operation, seconds, baseline seconds) for every timing more than tolerance slower than the baseline."""
+    regressions = []
+    for name, case in results['cases'].items():
+        baseline_case = baseline['cases'].get(name)
+        if baseline_case is None:
+            continue
+        for operation, seconds in case['seconds'].items():
+            baseline_seconds = baseline_case['seconds'].get(operation)
+            if baseline_seconds is None:
+                continue
+            if seconds > baseline_seconds * (1 + tolerance) and seconds - baseline_seconds > MIN_REGRESSION_SECONDS:
+                regressions.append((name, operation, seconds, baseline_seconds))
+    return regressions
+
+
+def print_results(results: dict, baseline: dict = None):
+    for name, case in results['cases'].items():
+        size = case['model_size']
+        print(f"{name} ({case['method']}, {size['variables']} variables, {size['constraints']} constraints, {size['nonzeros']} nonzeros)")
+        baseline_seconds = baseline['cases'].get(name, {}).get('seconds', {}) if baseline else {}
+        for operation, seconds in case['seconds'].items():
+            if operation in baseline_seconds:
+                print(f"  {operation:<20} {seconds:9.4f}s  baseline {baseline_seconds[operation]:9.4f}s  ({seconds / baseline_seconds[operation]:.2f}x)")
+            else:
+                print(f"  {operation:<20} {seconds:9.4f}s")
+
+
+def run_benchmarks(grid: list = None, baseline_path: str = DEFAULT_BASELINE, tolerance: float = DEFAULT_TOLERANCE,
+                   repeats: int = 3, method: str = "pulp", update: bool = False, output_path: str = None) -> int:
+    """
+    Time every case in grid and check it against the baseline file, returning a process exit code:
+    1 if any timing regressed by more than tolerance, otherwise 0. The results replace the baseline
+    when update is set or there is no baseline yet, and are also written to output_path if given.
+    """
+    results = run_cases(grid, repeats, method)
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if update or not os.path.exists(baseline_path):
+        print_results(results)
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote baseline to {baseline_path}")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print_results(results, baseline)
+    regressions = compare(results, baseline, tolerance)
+    for name, operation, seconds, baseline_seconds in regressions:
+        print(f"REGRESSION {name} {operation}: {seconds:.4f}s vs baseline {baseline_seconds:.4f}s")
+    if regressions:
+        print(f"{len(regressions)} timings more than {tolerance:.0%} slower than the baseline")
+        return 1
+    print(f"No timings more than {tolerance:.0%} slower than the baseline")
+    return 0
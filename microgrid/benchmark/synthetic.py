@@ -0,0 +1,140 @@
+import numpy as np
+from microgrid.engine import Network, Bus, Generator, Load, StorageUnit, TransmissionLine, GeneratorType, StorageType
+
+# Relative share of each generator type when picking the generators of a bus
+DEFAULT_GENERATOR_MIX = {
+    GeneratorType.WIND: 3,
+    GeneratorType.SOLAR: 2,
+    GeneratorType.CCGT: 3,
+    GeneratorType.OCGT: 1,
+    GeneratorType.NUCLEAR: 1,
+    GeneratorType.BIOMASS: 1,
+}
+
+# Expected number of storage units of each type per bus
+DEFAULT_STORAGE_DENSITY = {
+    StorageType.BATTERY: 0.5,
+    StorageType.PUMPED_STORAGE: 0.1,
+    StorageType.EV_FLEET: 0.2,
+}
+
+# Typical marginal cost (£/MWh) of each generator type
+GENERATOR_COSTS = {
+    GeneratorType.WIND: 0,
+    GeneratorType.SOLAR: 0,
+    GeneratorType.NUCLEAR: 10,
+    GeneratorType.CCGT: 60,
+    GeneratorType.BIOMASS: 80,
+    GeneratorType.OCGT: 120,
+    GeneratorType.INTERCONNECTOR: 70,
+}
+
+# Every bus can import its peak demand plus storage charging at this price, so any synthetic network is feasible
+BACKSTOP_COST = 1000
+
+
+def daily_shape(hours: np.ndarray, peak_hour: float, width: float) -> np.ndarray:
+    return np.exp(-((hours - peak_hour + 12) % 24 - 12) ** 2 / (2 * width ** 2))
+
+
+def generator_series(generator_type: GeneratorType, rated: float, hours: np.ndarray, rng):
+    """(capacities, costs) series for one generator of a type."""
+    T = len(hours)
+    if generator_type == GeneratorType.WIND:
+        # Smoothed noise, so output drifts over hours rather than jumping every timestep
+        noise = np.convolve(rng.random(T + 11), np.ones(12) / 12, mode='valid')
+        capacities = rated * np.clip(2 * noise - 0.5, 0, 1)
+    elif generator_type == GeneratorType.SOLAR:
+        capacities = rated * np.clip(np.sin((hours - 6) / 12 * np.pi), 0, None) * rng.uniform(0.6, 1.0, T)
+    else:
+        capacities = np.full(T, rated)
+
+    cost = GENERATOR_COSTS[generator_type]
+    if generator_type == GeneratorType.INTERCONNECTOR:
+        costs = cost * (1 + 0.3 * daily_shape(hours, 18, 3)) * rng.uniform(0.9, 1.1, T)
+    else:
+        costs = np.full(T, cost * rng.uniform(0.9, 1.1))
+    return capacities, costs
+
+
+def add_storage(name: str, storage_type: StorageType, bus: Bus, power: float, hours: np.ndarray):
+    T = len(hours)
+    if storage_type == StorageType.EV_FLEET:
+        # Plugged in overnight, driven during the day and needing a charge by the morning
+        plugged_in = (hours < 7) | (hours >= 19)
+        energy = 6 * power
+        consumptions = np.where((hours >= 8) & (hours < 18), 0.05 * energy, 0)
+        # At 7am the fleet needs the charge for that day's driving (as much of it as is inside the horizon)
+        remaining = np.append(np.cumsum(consumptions[::-1])[::-1], 0)
+        mornings = np.flatnonzero(hours == 7)
+        min_socs = np.zeros(T)
+        min_socs[mornings] = remaining[mornings] - remaining[np.minimum(mornings + 11, T)]
+        return StorageUnit(name, bus, energy, power * plugged_in, power * plugged_in, min_socs, consumptions,
+                           storage_type, charge_efficiency=0.9, discharge_efficiency=0.9)
+    duration, efficiency = (8, 0.87) if storage_type == StorageType.PUMPED_STORAGE else (2, 0.95)
+    return StorageUnit(name, bus, duration * power, np.full(T, power), np.full(T, power), np.zeros(T), np.zeros(T),
+                       storage_type, charge_efficiency=efficiency, discharge_efficiency=efficiency)
+
+
+def synthetic_network(
+    n_buses: int = 10,
+    n_timesteps: int = 24,
+    topology: str = "radial",
+    generators_per_bus: int = 2,
+    generator_mix: dict = None,
+    storage_density: dict = None,
+    seed: int = 0,
+    name: str = None,
+) -> Network:
+    """
+    A random but reproducible network of hourly timesteps for benchmarking.
+
+    topology is "radial" (a random spanning tree) or "meshed" (the tree plus about one extra line for
+    every two buses). generator_mix weights the GeneratorType of each of the generators_per_bus
+    generators on a bus, and storage_density is the expected number of units of each StorageType per bus.
+    Every bus also gets an expensive backstop import (see BACKSTOP_COST) so the network is always feasible.
+    """
+    if topology not in ("radial", "meshed"):
+        raise ValueError(f"Unknown topology {topology}")
+    rng = np.random.default_rng(seed)
+    generator_mix = DEFAULT_GENERATOR_MIX if generator_mix is None else generator_mix
+    storage_density = DEFAULT_STORAGE_DENSITY if storage_density is None else storage_density
+    generator_types = list(generator_mix)
+    weights = np.array([generator_mix[t] for t in generator_types], dtype=float)
+
+    hours = np.arange(n_timesteps) % 24
+    n = Network(name or f"Synthetic_{topology}_{n_buses}x{n_timesteps}", [f"t{i}" for i in range(n_timesteps)])
+    buses = [Bus(f"Bus{b}", n) for b in range(n_buses)]
+
+    for b, bus in enumerate(buses):
+        peak = rng.uniform(50, 150)
+        demand = peak * (0.5 + 0.3 * daily_shape(hours, 9, 2) + 0.5 * daily_shape(hours, 18, 2)) / 1.3
+        Load(f"Load{b}", demand * rng.uniform(0.95, 1.05, n_timesteps), bus)
+
+        storage_power = 0.0
+        for storage_type, density in storage_density.items():
+            count = int(density) + (rng.random() < density % 1)
+            for s in range(count):
+                power = 0.2 * peak
+                add_storage(f"{storage_type.name}{b}_{s}", storage_type, bus, power, hours)
+                storage_power += power
+
+        for g, type_index in enumerate(rng.choice(len(generator_types), generators_per_bus, p=weights / weights.sum())):
+            generator_type = generator_types[type_index]
+            capacities, costs = generator_series(generator_type, peak * rng.uniform(0.5, 1.5), hours, rng)
+            Generator(f"{generator_type.name}{b}_{g}", capacities, costs, bus, generator_type)
+        Generator(f"Backstop{b}", np.full(n_timesteps, peak + storage_power), np.full(n_timesteps, BACKSTOP_COST),
+                  bus, GeneratorType.INTERCONNECTOR)
+
+    # Spanning tree, then extra lines between buses not yet connected for a meshed network
+    pairs = [(int(rng.integers(b)), b) for b in range(1, n_buses)]
+    if topology == "meshed":
+        connected = set(pairs)
+        for _ in range(n_buses // 2):
+            start, end = sorted(rng.choice(n_buses, 2, replace=False).tolist())
+            if (start, end) not in connected:
+                connected.add((start, end))
+                pairs.append((start, end))
+    for start, end in pairs:
+        TransmissionLine(buses[start], buses[end], np.full(n_timesteps, rng.uniform(30, 120)), n)
+    return n
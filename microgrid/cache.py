@@ -0,0 +1,123 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+
+DEFAULT_MAX_BYTES = 1 << 30
+# Part of every key, so changing what is hashed or stored invalidates old entries
+CACHE_VERSION = 1
+
+
+def network_key(network, **settings) -> str:
+    """
+    A stable hash of everything a solve depends on: timesteps, topology, every component's parameters
+    and time series, and the solver settings. Identical networks built the same way get the same key.
+    """
+    h = hashlib.sha256()
+
+    def add(*parts):
+        for part in parts:
+            h.update(repr(part).encode())
+            h.update(b'\0')
+
+    add(CACHE_VERSION, list(network.timesteps), sorted(settings.items()))
+    add('buses', list(network.buses))
+    for g in network.generator_table.components:
+        add('generator', g.name, g.bus.name, g.generator_type)
+    for l in network.load_table.components:
+        add('load', l.name, l.bus.name)
+    for s in network.storage_table.components:
+        add('storage', s.name, s.bus.name, s.storage_type, float(s.max_soc_capacity),
+            float(s.charge_efficiency), float(s.discharge_efficiency))
+    for t in network.line_table.components:
+        add('line', t.name, t.start_bus.name, t.end_bus.name, float(t.reactance))
+    for table_name, table in network.tables().items():
+        for attribute in table.attributes:
+            column = np.ascontiguousarray(table.column(attribute), dtype=float)
+            add(table_name, attribute, column.shape)
+            # Hashed straight from the buffer, so memory-mapped series are not copied
+            h.update(column)
+    return h.hexdigest()
+
+
+class SolveCache:
+    """
+    On-disk store of solutions (decision values, nodal prices and status) keyed by network_key.
+    Entries are .npz files in directory; once they take more than max_bytes the least recently used
+    are deleted. Safe to share between processes - entries are written to a temporary file and renamed.
+    """
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, network, key: str):
+        """Fill the network's results from the entry for key and return its status, or None on a miss."""
+        path = self.path(key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+            # The modification time doubles as the last use, for eviction
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        for table_name, table in network.tables().items():
+            for attribute in table.result_attributes:
+                table.result(attribute)[:] = arrays[f"{table_name}.{attribute}"]
+        for bus, prices in zip(network.buses.values(), arrays['nodal_prices']):
+            bus.nodal_prices[:] = [None if np.isnan(p) else p for p in prices.tolist()]
+        return str(arrays['status'])
+
+    def store(self, network, key: str, status: str):
+        arrays = {
+            f"{table_name}.{attribute}": table.result(attribute)
+            for table_name, table in network.tables().items()
+            for attribute in table.result_attributes
+        }
+        arrays['nodal_prices'] = np.array(
+            [[np.nan if p is None else p for p in bus.nodal_prices] for bus in network.buses.values()], dtype=float,
+        ).reshape(len(network.buses), len(network.timesteps))
+        arrays['status'] = np.array(status)
+
+        fd, temporary_path = tempfile.mkstemp(suffix='.npz', dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temporary_path, self.path(key))
+        self.evict()
+
+    def entries(self) -> list:
+        """(last used, size, path) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith('.npz') or name.startswith('tmp'):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+from microgrid.matrix import NetworkProgram, run_highs
+from microgrid.stats import SolveStats
+
+
+def sub_problems(network, block_size: int = None, max_workers: int = None) -> list:
+    """
+    Split a network into independent (buses, start, stop) sub-problems.
+
+    Only storage SOC continuity links timesteps, and only transmission lines link buses, so every island
+    is independent of the others and an island without storage is independent in time as well. Islands
+    with storage are kept whole; storage-free islands are cut into blocks of block_size timesteps
+    (by default about four blocks per worker, to keep the pool busy without tiny sub-problems).
+    """
+    T = len(network.timesteps)
+    if block_size is None:
+        block_size = max(1, math.ceil(T / (4 * (max_workers or os.cpu_count() or 1))))
+    problems = []
+    for buses in network.islands():
+        if any(bus.storage_units for bus in buses):
+            problems.append((buses, 0, T))
+        else:
+            problems.extend((buses, start, min(start + block_size, T)) for start in range(0, T, block_size))
+    return problems
+
+
+def solve_decomposed(network, problems: list, max_workers: int = None, stats: SolveStats = None) -> str:
+    """
+    Solve independent sub-problems (see sub_problems) on a process pool and merge them into the network,
+    only once every one of them is Optimal.
+    """
+    stats = SolveStats(network.name, "highs") if stats is None else stats
+    # Building is vectorised and cheap, so programs are built here and only the solves are farmed out
+    with stats.phase("build"):
+        programs = [NetworkProgram(network, start, stop, buses=buses).build() for buses, start, stop in problems]
+    for program in programs:
+        for component_type, size in program.model_size().items():
+            stats.add_model_size(component_type, **size)
+    print(f"Solving {len(programs)} independent sub-problems")
+
+    with stats.phase("highs"):
+        if max_workers == 1:
+            solutions = list(map(run_highs, (program.lp for program in programs)))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                solutions = list(executor.map(run_highs, (program.lp for program in programs), chunksize=max(1, len(programs) // 64)))
+
+    # One sub-problem failing fails the whole solve, and then nothing is written to the network
+    status = next((sub_status for sub_status, *_ in solutions if sub_status != "Optimal"), "Optimal")
+    if status == "Optimal":
+        with stats.phase("apply"):
+            for program, (_, _, col_value, row_dual) in zip(programs, solutions):
+                program.apply(col_value, row_dual)
+    return status
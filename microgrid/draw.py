@@ -1,35 +1,120 @@
-from graphviz import Digraph
+from concurrent.futures import ProcessPoolExecutor
+import json
+import numpy as np
+from graphviz import Digraph, Source
+from microgrid.results import solution_of
 
 
-def draw_network(network, timestep):
+def draw_network(network, timestep, layout=None):
+    # layout (see network_layout) pins every node to a precomputed position so neato -n only has to draw edges
     timestep_index = network.timestep_index[timestep]
+
+    # One column slice per input attribute for this timestep, indexed by each component's row
+    capacities = network.generator_table.column('capacities')[:, timestep_index]
+    costs = network.generator_table.column('costs')[:, timestep_index]
+    consumptions = network.load_table.column('consumptions')[:, timestep_index]
+    su_consumptions = network.storage_table.column('consumptions')[:, timestep_index]
+    max_charge_capacities = network.storage_table.column('max_charge_capacities')[:, timestep_index]
+    max_discharge_capacities = network.storage_table.column('max_discharge_capacities')[:, timestep_index]
+    line_capacities = network.line_table.column('capacities')[:, timestep_index]
+    # Results for this timestep, from the solution snapshot
+    solution = solution_of(network)
+    outputs = solution.result('outputs')[:, timestep_index]
+    charge_inflows = solution.result('charge_inflows')[:, timestep_index]
+    discharge_outflows = solution.result('discharge_outflows')[:, timestep_index]
+    socs_start_of_ts = solution.result('socs_start_of_ts')[:, timestep_index]
+    socs_end_of_ts = solution.result('socs_end_of_ts')[:, timestep_index]
+    flows = solution.result('flows')[:, timestep_index]
+    prices = solution.nodal_prices[:, timestep_index]
+
     dot = Digraph(comment='Energy Network')
     dot.graph_attr['rankdir'] = 'LR'
-    for b in network.buses.values():
-        total_consumption = sum([l.consumptions[timestep_index] for l in b.loads.values()]) 
-        dot.node(b.name, label=f"{b.name}: {total_consumption: .0f} MW \n {b.nodal_prices[timestep_index]} £/MWh", shape='doubleoctagon')
+    if layout is not None:
+        dot.engine = 'neato'
+
+    def node(name, **attrs):
+        if layout is not None and name in layout:
+            attrs['pos'] = layout[name]
+        dot.node(name, **attrs)
+
+    for i, b in enumerate(network.buses.values()):
+        total_consumption = sum([consumptions[l.index] for l in b.loads.values()])
+        price = None if np.isnan(prices[i]) else float(prices[i])
+        node(b.name, label=f"{b.name}: {total_consumption: .0f} MW \n {price} £/MWh", shape='doubleoctagon')
         # Generators
         for g in b.generators.values():
-            dot.node(g.name, label=f"{g.name}: £{g.costs[timestep_index]}/MWh")
-            dot.edge(g.name, b.name, label=f"{g.outputs[timestep_index].varValue: .0f} / {g.capacities[timestep_index]}")
+            node(g.name, label=f"{g.name}: £{costs[g.index]:g}/MWh")
+            dot.edge(g.name, b.name, label=f"{outputs[g.index]: .0f} / {capacities[g.index]:g}")
 
         # Loads
         for l in b.loads.values():
-            dot.node(l.name, label=f"{l.name}: {l.consumptions[timestep_index]: .0f}MW", shape='house')
+            node(l.name, label=f"{l.name}: {consumptions[l.index]: .0f}MW", shape='house')
             dot.edge(b.name, l.name)
 
         # Storage
         for su in b.storage_units.values():
-            dot.node(su.name, label=f"""{su.name}\nStart SOC: {su.socs_start_of_ts[timestep_index].varValue: .0f} / {su.max_soc_capacity}\nEnd SOC: {su.socs_end_of_ts[timestep_index].varValue: .0f} / {su.max_soc_capacity}\nMWh consumed: {su.consumptions[timestep_index]: .0f}""", shape='cylinder')
-            dot.edge(b.name, su.name, label=f"{su.charge_inflows[timestep_index].varValue: .0f} / {su.max_charge_capacities[timestep_index]}")
-            dot.edge(su.name, b.name, label=f"{su.discharge_outflows[timestep_index].varValue: .0f} / {su.max_discharge_capacities[timestep_index]}")
+            node(su.name, label=f"""{su.name}\nStart SOC: {socs_start_of_ts[su.index]: .0f} / {su.max_soc_capacity}\nEnd SOC: {socs_end_of_ts[su.index]: .0f} / {su.max_soc_capacity}\nMWh consumed: {su_consumptions[su.index]: .0f}""", shape='cylinder')
+            dot.edge(b.name, su.name, label=f"{charge_inflows[su.index]: .0f} / {max_charge_capacities[su.index]:g}")
+            dot.edge(su.name, b.name, label=f"{discharge_outflows[su.index]: .0f} / {max_discharge_capacities[su.index]:g}")
 
-    # Transmission Lines          
+    # Transmission Lines
     for t in network.transmission_lines.values():
-        if t.flows[timestep_index].varValue > 0:
+        if flows[t.index] > 0:
             dot.edge(t.start_bus.name, t.end_bus.name,
-                    label=f"{t.flows[timestep_index].varValue: .0f} / {t.capacities[timestep_index]}", color='blue', fontcolor='blue')
+                    label=f"{flows[t.index]: .0f} / {line_capacities[t.index]:g}", color='blue', fontcolor='blue')
         else:
             dot.edge(t.end_bus.name, t.start_bus.name,
-                    label=f"{-t.flows[timestep_index].varValue: .0f}", color='blue', fontcolor='blue')
-    return dot
\ No newline at end of file
+                    label=f"{-flows[t.index]: .0f}", color='blue', fontcolor='blue')
+    return dot
+
+
+# Below this many frames a process pool costs more than it saves
+POOL_MIN_FRAMES = 16
+
+
+def network_layout(network, timestep=None):
+    """Node positions (in points) from a single dot layout of the network at one timestep."""
+    dot = draw_network(network, network.timesteps[0] if timestep is None else timestep)
+    layout = json.loads(dot.pipe(format='json', encoding='utf-8'))
+    return {obj['name']: obj['pos'] for obj in layout.get('objects', []) if 'pos' in obj}
+
+
+def _render_frame(job):
+    source, filename, format = job
+    # -n: positions are already in points, only edges are routed
+    return Source(source, engine='neato').render(filename, format=format, neato_no_op=True, cleanup=True)
+
+
+def render_frames(network, filename_prefix, timesteps=None, format='png', max_workers=None, animation=None, frame_duration=200):
+    """
+    Render one frame per timestep to {filename_prefix}_{timestep}.{format}, returning the file paths.
+
+    The topology never changes between timesteps, so node positions are laid out once and every frame
+    is rendered with them pinned (neato -n), on a process pool once there are POOL_MIN_FRAMES frames
+    unless max_workers is 1. animation is an optional path for an
+    animated GIF of the frames (format must then be a raster format such as png), each shown for
+    frame_duration milliseconds.
+    """
+    timesteps = network.timesteps if timesteps is None else timesteps
+    layout = network_layout(network)
+    jobs = [(draw_network(network, ts, layout).source, f"{filename_prefix}_{ts}", format) for ts in timesteps]
+
+    if max_workers == 1 or len(jobs) < POOL_MIN_FRAMES:
+        paths = list(map(_render_frame, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            paths = list(executor.map(_render_frame, jobs, chunksize=max(1, len(jobs) // 256)))
+
+    if animation:
+        # Pillow is only needed to build animations
+        from PIL import Image
+        images = [Image.open(path).convert('RGB') for path in paths]
+        # Labels change the drawing size slightly, so frames are padded to a common canvas
+        width, height = max(i.width for i in images), max(i.height for i in images)
+        frames = []
+        for image in images:
+            frame = Image.new('RGB', (width, height), 'white')
+            frame.paste(image, (0, 0))
+            frames.append(frame)
+        frames[0].save(animation, save_all=True, append_images=frames[1:], duration=frame_duration, loop=0)
+    return paths
@@ -1,10 +1,61 @@
 from pulp import LpMinimize, LpProblem, LpVariable, lpSum, LpStatus
 from enum import Enum
+import numpy as np
+from microgrid import matrix, decomposition, merit_order, background, power_flow
+import os
+import weakref
+from microgrid.store import ComponentTable, ResultSeries, MappedSeries
+from microgrid.stats import SolveStats
+from microgrid.cache import network_key
+from microgrid.results import Solution
 
 class TimestepLengthMismatch(Exception):
     """Raised when the length of timesteps does not match other time-dependent data."""
     pass
 
+def as_timeseries(values, n_timesteps: int, description: str, name: str) -> np.ndarray:
+    # Lists, arrays (including np.memmap, read without a copy when float64) or a MappedSeries
+    if isinstance(values, MappedSeries):
+        values = values.load(n_timesteps)
+    values = np.asarray(values, dtype=float)
+    if values.shape != (n_timesteps,):
+        raise TimestepLengthMismatch(f"{description} timesteps do not match network timesteps for {name}")
+    return values
+
+class SeriesAttribute:
+    """
+    A component time series stored as one row of its network-level ComponentTable. It reads as a
+    read-only view of the row; assigning a new series (g.costs = costs) writes the row and marks it dirty.
+    """
+    def __init__(self, description: str):
+        self.description = description
+
+    def __set_name__(self, owner, name):
+        self.attribute = name
+
+    def __get__(self, component, owner=None):
+        if component is None:
+            return self
+        row = component.table.arrays[self.attribute][component.index]
+        # Edits in place would bypass the dirty tracking, so they have to go through __set__
+        row.flags.writeable = False
+        return row
+
+    def __set__(self, component, values):
+        values = as_timeseries(values, component.table.n_timesteps, self.description, component.name)
+        component.table.arrays[self.attribute][component.index] = values
+        component.table.mark_dirty(self.attribute, component.index)
+
+class ResultAttribute:
+    """A component decision variable, solved values stored as one row of its ComponentTable's results."""
+    def __set_name__(self, owner, name):
+        self.attribute = name
+
+    def __get__(self, component, owner=None):
+        if component is None:
+            return self
+        return ResultSeries(component.table, self.attribute, component.index)
+
 class GeneratorType(Enum):
     WIND = "WIND"
     SOLAR = "SOLAR"
@@ -21,129 +72,479 @@ class StorageType(Enum):
     
 
 class Network:
-    def __init__(self, name: str, timesteps: list):
+    def __init__(self, name: str, timesteps: list, series_dir: str = None):
+        # series_dir keeps every (component, timestep) array in memory-mapped files there instead of in memory.
+        # Without it, MappedSeries inputs are copied into the in-memory tables and solution snapshots are copies
         self.name = name
         self.buses = {}  
         self.transmission_lines = {}  
         self.solved = False
         self.timesteps = timesteps
         self.timestep_index = {label: i for i, label in enumerate(self.timesteps)}
-        
-
-    def solve(self):
-        # For now we solve the network for all timesteps as one problem
-        self.model = LpProblem("Energy_Planning", LpMinimize)
+        self.persistent_program = None
+        # (topology, matrix) of the last PTDF computed, see ptdf()
+        self.ptdf_cache = None
+        # Results snapshot of the last solve (see microgrid.results), None once results are written outside solve.
+        # solution_views holds the snapshots still viewing the result files, see discard_solution()
+        self.solution = None
+        self.solution_views = weakref.WeakSet()
+        # SolveStats of the last solve, and an optional hook (or json_records target) streaming them
+        self.solve_stats = None
+        self.stats_hook = None
+
+        # Columnar stores - one (component, timestep) array per time series attribute and per decision variable
+        self.series_dir = series_dir
+
+        def table_dir(table_name):
+            return None if series_dir is None else os.path.join(series_dir, table_name)
+
+        self.generator_table = ComponentTable(['capacities', 'costs'], len(timesteps), ['outputs'], table_dir('generators'))
+        self.load_table = ComponentTable(['consumptions'], len(timesteps), directory=table_dir('loads'))
+        self.storage_table = ComponentTable(
+            ['max_charge_capacities', 'max_discharge_capacities', 'min_soc_requirements_start_of_ts', 'consumptions'],
+            len(timesteps),
+            ['charge_inflows', 'discharge_outflows', 'socs_start_of_ts', 'socs_end_of_ts'],
+            table_dir('storage_units'),
+        )
+        self.line_table = ComponentTable(['capacities'], len(timesteps), ['flows'], table_dir('transmission_lines'))
+
+    def tables(self):
+        return {
+            'generators': self.generator_table,
+            'loads': self.load_table,
+            'storage_units': self.storage_table,
+            'transmission_lines': self.line_table,
+        }
+
+    def islands(self):
+        # Groups of buses connected by transmission lines - nothing couples two different islands
+        parent = {name: name for name in self.buses}
+
+        def find(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        for t in self.line_table.components:
+            parent[find(t.start_bus.name)] = find(t.end_bus.name)
+
+        islands = {}
+        for name, bus in self.buses.items():
+            islands.setdefault(find(name), []).append(bus)
+        return list(islands.values())
+
+    def ptdf(self):
+        # (line, bus) power transfer distribution factors, recomputed only when the buses, lines or reactances change
+        topology = (tuple(self.buses), tuple((t.name, t.start_bus.name, t.end_bus.name, t.reactance) for t in self.line_table.components))
+        if self.ptdf_cache is None or self.ptdf_cache[0] != topology:
+            self.ptdf_cache = (topology, power_flow.ptdf_matrix(self))
+        return self.ptdf_cache[1]
+
+    def check_timesteps(self):
+        # Check every stored series still has one value per network timestep. Series are validated as they
+        # are stored, so this only fails when the timesteps list itself changed after the network was built
+        T = len(self.timesteps)
+        for table_name, table in self.tables().items():
+            for attribute, array in {**table.arrays, **table.results}.items():
+                if table.n_timesteps != T or array.shape[1] != T:
+                    raise TimestepLengthMismatch(f"Timesteps for {table_name} {attribute} do not match network timesteps")
+
+    def solve(self, method: str = "pulp", persistent: bool = False, decompose: bool = False,
+              block_size: int = None, max_workers: int = None, reduce: bool = True, cache=None, ptdf: bool = False):
+        # method="auto" uses merit order dispatch on radial networks without storage, falling back to PuLP
+        # when a line binds. Only ask for it when any valid nodal price will do: where demand exactly uses up
+        # a generator every price between its cost and the next unit's is an LP dual, merit order reports
+        # the marginal unit's cost and CBC may report another. Merit order builds no PuLP model (self.model).
+        # method="merit_order" sorts generators by cost each timestep - radial networks without storage only
+        # method="pulp" builds named PuLP constraints and hands the model to CBC
+        # method="highs" builds sparse coefficient arrays directly and solves in-process with HiGHS
+        # persistent=True (HiGHS only) keeps the model alive and only pushes changed inputs on the next solve
+        # decompose=True (HiGHS only) solves independent islands and storage-free time blocks on a process
+        # pool. Results are only written when every sub-problem is Optimal.
+        # Phase timings and the model size are left in self.solve_stats (see microgrid.stats).
+        # reduce=False (PuLP only) keeps the constraints that duplicate variable bounds (see build_model).
+        # With reduce, what was left out is in self.solve_stats.removed.
+        # ptdf=True (HiGHS only) models DC power flow on line reactances and adds line limits lazily, only
+        # where a solution overloads a line (see microgrid.power_flow).
+        # cache (a microgrid.cache.SolveCache) reuses the solution of an identical earlier solve, and stores
+        # Optimal solutions for the next one.
+        if method not in ("auto", "merit_order", "pulp", "highs"):
+            raise ValueError(f"Unknown solve method {method}")
+        auto = method == "auto"
+        if auto:
+            if ptdf:
+                method = "highs"
+            else:
+                method = "merit_order" if not persistent and not decompose and merit_order.is_radial(self) else "pulp"
+        if persistent and method != "highs":
+            raise ValueError("Persistent solves need method=\"highs\"")
+        if decompose and (method != "highs" or persistent):
+            raise ValueError("Decomposed solves need method=\"highs\" and persistent=False")
+        if ptdf and (method != "highs" or persistent or decompose):
+            raise ValueError("PTDF solves need method=\"highs\", persistent=False and decompose=False")
+        if method == "merit_order" and not merit_order.is_radial(self):
+            raise ValueError("Merit order dispatch needs a network without storage or loops")
+        stats = self.solve_stats = SolveStats(self.name, method, self.stats_hook)
+        self.discard_solution()
+        with stats.phase("check_timesteps"):
+            self.check_timesteps()
+
+        if cache is not None:
+            with stats.phase("cache"):
+                key = network_key(self, method=method, persistent=persistent, decompose=decompose,
+                                  block_size=block_size, reduce=reduce, ptdf=ptdf)
+                status = cache.load(self, key)
+            if status is not None:
+                print("Loaded solution from cache")
+                self.solution = Solution(self, status)
+                stats.finish(status)
+                print(f"Solution: {status}")
+                return status
+
+        if method == "merit_order":
+            with stats.phase("merit_order"):
+                status = merit_order.solve(self)
+            if status is None:
+                if not auto:
+                    raise ValueError("Merit order dispatch can not be used, a transmission line binds")
+                print("Transmission constraints bind, solving the LP")
+                stats.method = "pulp"
+                status = self.solve_window(0, len(self.timesteps), "pulp", stats=stats, reduce=reduce)
+            if cache is not None and status == "Optimal":
+                with stats.phase("cache"):
+                    cache.store(self, key, status)
+            self.solution = Solution(self, status)
+            stats.finish(status)
+            print(f"Solution: {status}")
+            return status
+
+        problems = decomposition.sub_problems(self, block_size, max_workers) if decompose else []
+
+        if ptdf:
+            status = power_flow.solve_ptdf(self, stats)
+        elif len(problems) > 1:
+            status = decomposition.solve_decomposed(self, problems, max_workers, stats)
+        elif persistent:
+            if self.persistent_program is None or not self.persistent_program.matches(self):
+                print("Building persistent model")
+                with stats.phase("build"):
+                    self.persistent_program = matrix.PersistentProgram(self)
+            status = self.persistent_program.solve(stats)
+        else:
+            status = self.solve_window(0, len(self.timesteps), method, stats=stats, reduce=reduce)
+        if cache is not None and status == "Optimal":
+            with stats.phase("cache"):
+                cache.store(self, key, status)
+        self.solution = Solution(self, status)
+        stats.finish(status)
+        print(f"Solution: {status}")
+        return status
+
+    def solve_in_background(self, timeout: float = None, **solve_kwargs):
+        # solve() on a snapshot of the network in a worker process, as a concurrent.futures.Future of the
+        # status. Results are only written back on an Optimal solve (see microgrid.background).
+        return background.solve_in_background(self, timeout, **solve_kwargs)
+
+    def solve_async(self, timeout: float = None, **solve_kwargs):
+        # Awaitable solve_in_background - cancelling it or a timeout kills the worker and its solver
+        return background.solve_async(self, timeout, **solve_kwargs)
+
+    def release_model(self):
+        # Drop the solver models to free their memory - results stay in the tables and self.solution
+        self.model = None
+        self.persistent_program = None
+
+    def __getstate__(self):
+        # Solver handles and hooks stay behind when the network is pickled for a worker process
+        state = dict(self.__dict__)
+        state.pop('model', None)
+        state.update(persistent_program=None, stats_hook=None, solve_stats=None)
+        state['solution_views'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.solution_views = weakref.WeakSet()
+
+    def discard_solution(self):
+        # Called before results are overwritten: snapshots still viewing the result files copy them first
+        for solution in list(self.solution_views):
+            solution.detach()
+        self.solution_views.clear()
+        self.solution = None
+
+    def solve_rolling(self, window: int, overlap: int = 0, method: str = "pulp", reduce: bool = True):
+        # Solve consecutive windows of `window` timesteps. Each window starts from the SOC the previous
+        # window reached at the end of its kept part; the last `overlap` timesteps of every window are a
+        # look-ahead that is re-solved (and overwritten) by the next window.
+        if method not in ("pulp", "highs"):
+            raise ValueError(f"Unknown solve method {method}")
+        if window <= overlap or overlap < 0:
+            raise ValueError(f"Window ({window}) must be longer than the overlap ({overlap})")
+        stats = self.solve_stats = SolveStats(self.name, method, self.stats_hook)
+        with stats.phase("check_timesteps"):
+            self.check_timesteps()
+
+        step = window - overlap
+        initial_socs = None
+        for start in range(0, len(self.timesteps), step):
+            stop = min(start + window, len(self.timesteps))
+            print(f"Solving timesteps {self.timesteps[start]} to {self.timesteps[stop - 1]}")
+            status = self.solve_window(start, stop, method, initial_socs, stats, reduce)
+            if status != "Optimal" or stop == len(self.timesteps):
+                break
+            # Carry the SOC at the end of the kept part into the next window
+            initial_socs = self.storage_table.result('socs_end_of_ts')[:, start + step - 1].copy()
+
+        self.solution = Solution(self, status)
+        stats.finish(status)
+        print(f"Solution: {status}")
+        return status
+
+    def solve_window(self, start: int, stop: int, method: str = "pulp", initial_socs: np.ndarray = None,
+                     stats: SolveStats = None, reduce: bool = True):
+        # Solve timesteps [start, stop) and write the results into the components.
+        # initial_socs (indexed like storage_table) fixes the SOC at the start of the window; otherwise it
+        # is fixed to the minimum requirement. The end of horizon SOC is only fixed when stop is the last timestep.
+        # Phases and model size are added to stats (solve and solve_rolling pass self.solve_stats).
+        stats = SolveStats(self.name, method) if stats is None else stats
+        self.discard_solution()
+        if method == "highs":
+            with stats.phase("build"):
+                program = matrix.NetworkProgram(self, start, stop, initial_socs).build()
+            for component_type, size in program.model_size().items():
+                stats.add_model_size(component_type, **size)
+            with stats.phase("highs"):
+                status, _, col_value, row_dual = program.run()
+            if status == "Optimal":
+                with stats.phase("apply"):
+                    program.apply(col_value, row_dual)
+            return status
+
+        with stats.phase("build"):
+            energy_balance_constraints, sections, variables = self.build_model(start, stop, initial_socs, reduce, stats)
+
+        # Model size, attributing each constraint to the component type whose section added it
+        n_variables = {'generators': set(), 'storage_units': set(), 'transmission_lines': set(), 'buses': set()}
+        for attribute, (table, rows) in variables.items():
+            component_type = next(name for name, t in self.tables().items() if t is table)
+            n_variables[component_type].update(v.name for row in rows for v in row.values())
+        constraints = list(self.model.constraints.values())
+        first = 0
+        for component_type, last in sections:
+            block = constraints[first:last]
+            stats.add_model_size(component_type, len(n_variables[component_type]), len(block), sum(len(c) for c in block))
+            first = last
+
+        socs = (variables['socs_start_of_ts'][1], variables['socs_end_of_ts'][1])
+        if reduce and any(v.lowBound > v.upBound for rows in socs for row in rows for v in row.values()):
+            # A fixed SOC outside its limits - the full model is infeasible, but CBC rejects crossed bounds
+            return LpStatus[-1]
+
+        # Includes PuLP writing the model file CBC reads
+        with stats.phase("cbc"):
+            self.model.solve()
+
+        # Copy the solved values into the tables, after which the variables are only held by self.model
+        with stats.phase("results"):
+            for attribute, (table, rows) in variables.items():
+                values = [[row[i].varValue for i in range(start, stop)] for row in rows]
+                table.result(attribute)[:, start:stop] = np.array(values, dtype=float).reshape(len(rows), stop - start)
 
-        # Check timesteps match accross all components
-        print("Checking timesteps match accross all components")
-
-        for b in self.buses.values():
-            for l in b.loads.values():
-                if len(l.consumptions) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Consumption timesteps do not match network timesteps for {b.name}")
-            for g in b.generators.values():
-                if len(g.capacities) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Generator capacity timesteps do not match network timesteps for {g.name}")
-                if len(g.costs) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Generator cost timesteps do not match network timesteps for {g.name}")
-            for su in b.storage_units.values():
-                if len(su.max_charge_capacities) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Storage unit charge capacity timesteps do not match network timesteps for {su.name}")
-                if len(su.max_discharge_capacities) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Storage unit discharge capacity timesteps do not match network timesteps for {su.name}")
-                if len(su.min_soc_requirements_start_of_ts) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Storage unit minimum SOC requirements timesteps do not match network timesteps for {su.name}")
-                if len(su.consumptions) != len(self.timesteps):
-                    raise TimestepLengthMismatch(f"Storage unit consumption timesteps do not match network timesteps for {su.name}")
-        for tl in self.transmission_lines.values():
-            if len(tl.capacities) != len(self.timesteps):
-                raise TimestepLengthMismatch(f"Transmission line capacity timesteps do not match network timesteps for {tl.name}")
-                
+        # Extract nodal prices
+        with stats.phase("duals"):
+            for i, energy_balance_constraints_ts in energy_balance_constraints.items():
+                for bus, constraint in energy_balance_constraints_ts.items():
+                    bus.nodal_prices[i] = self.model.constraints[constraint.name].pi  # Extract shadow price
+        return LpStatus[self.model.status]
 
+    def lp_variables(self, window: range, initial_socs: np.ndarray = None, reduce: bool = False) -> dict:
+        # PuLP variables are only created when a PuLP model is built, and only for the timesteps in window.
+        # Returns {attribute: (table, [{timestep index: LpVariable} for each table row])}.
+        # With reduce, each storage unit has one SOC variable per timestep boundary, shared by the end of one
+        # timestep and the start of the next, and its bounds carry the SOC limits and fixed start/end values.
+        timesteps = self.timesteps
+        start, stop = window.start, window.stop
+
+        def create(table, label, lower, upper):
+            rows = []
+            for component, lows, ups in zip(table.components, lower[:, start:stop].tolist(), upper[:, start:stop].tolist()):
+                rows.append({i: LpVariable(f"{component.name}_{label}_{timesteps[i]}", low, up) for i, low, up in zip(window, lows, ups)})
+            return table, rows
+
+        generators, storage, lines = self.generator_table, self.storage_table, self.line_table
+        generator_capacities = generators.column('capacities')
+        line_capacities = lines.column('capacities')
+        max_socs = np.array([su.max_soc_capacity for su in storage.components], dtype=float)[:, None]
+        no_storage = np.zeros((len(storage), len(timesteps)))
+        variables = {
+            'outputs': create(generators, 'output', np.zeros_like(generator_capacities), generator_capacities),
+            'charge_inflows': create(storage, 'charge_inflows', no_storage, storage.column('max_charge_capacities')),
+            'discharge_outflows': create(storage, 'discharge_outflows', no_storage, storage.column('max_discharge_capacities')),
+            'flows': create(lines, 'flow', -line_capacities, line_capacities),
+        }
+        if not reduce:
+            variables['socs_start_of_ts'] = create(storage, 'soc_start_of', no_storage, no_storage + max_socs)
+            variables['socs_end_of_ts'] = create(storage, 'soc_end_of', no_storage, no_storage + max_socs)
+            return variables
+
+        # Boundary k is the start of timestep k and the end of timestep k - 1
+        min_socs = storage.column('min_soc_requirements_start_of_ts')
+        lower = np.zeros((len(storage), stop - start + 1))
+        lower[:, 1:-1] = np.maximum(min_socs[:, start + 1:stop], 0)
+        upper = np.broadcast_to(max_socs, lower.shape).copy()
+        # Fixed values become lower = upper bounds, clipped so that an infeasible fixed value stays infeasible
+        initial = min_socs[:, start] if initial_socs is None else np.asarray(initial_socs, dtype=float)
+        lower[:, 0] = np.maximum(initial, np.maximum(min_socs[:, start], 0))
+        upper[:, 0] = np.minimum(initial, max_socs[:, 0])
+        if stop == len(timesteps):
+            lower[:, -1] = np.maximum(min_socs[:, -1], 0)
+            upper[:, -1] = np.minimum(min_socs[:, -1], max_socs[:, 0])
+        else:
+            # The next window must be able to start from this SOC
+            lower[:, -1] = np.maximum(min_socs[:, stop], 0)
+
+        starts, ends = [], []
+        for su, lows, ups in zip(storage.components, lower.tolist(), upper.tolist()):
+            boundaries = [LpVariable(f"{su.name}_soc_start_of_{timesteps[i]}", low, up) for i, low, up in zip(window, lows, ups)]
+            boundaries.append(LpVariable(f"{su.name}_soc_end_of_{timesteps[stop - 1]}", lows[-1], ups[-1]))
+            starts.append({i: boundaries[i - start] for i in window})
+            ends.append({i: boundaries[i - start + 1] for i in window})
+        variables['socs_start_of_ts'] = (storage, starts)
+        variables['socs_end_of_ts'] = (storage, ends)
+        return variables
+
+    def build_model(self, start: int, stop: int, initial_socs: np.ndarray = None, reduce: bool = False,
+                    stats: SolveStats = None):
+        # Build the PuLP model for timesteps [start, stop) into self.model (see solve_window). Returns the
+        # energy balance constraints by timestep and bus, the number of constraints after each section and
+        # the variables (see lp_variables).
+        # reduce leaves out every constraint that only repeats a variable bound, and the SOC continuity
+        # constraints, which the shared boundary SOC variables make redundant. What it leaves out is
+        # counted where it is skipped and added to stats.removed.
+        stats = SolveStats(self.name, "pulp") if stats is None else stats
+        self.model = LpProblem("Energy_Planning", LpMinimize)
+        window = range(start, stop)
+        is_end_of_horizon = stop == len(self.timesteps)
+        sections = []
+        variables = self.lp_variables(window, initial_socs, reduce)
+        outputs, flows = variables['outputs'][1], variables['flows'][1]
+        charge_inflows, discharge_outflows = variables['charge_inflows'][1], variables['discharge_outflows'][1]
+        socs_start_of_ts, socs_end_of_ts = variables['socs_start_of_ts'][1], variables['socs_end_of_ts'][1]
 
         # Generator capacity constraints
-        for bus in self.buses.values():
+        if reduce:
+            stats.add_removed('generators', 0, len(window) * len(self.generator_table), len(window) * len(self.generator_table))
+        for bus in self.buses.values() if not reduce else ():
             for generator in bus.generators.values():
-                for i, ts in enumerate(self.timesteps):
-                    self.model += generator.outputs[i] <= generator.capacities[i], f"Generator_Capacity_{generator.name}_{ts}"
+                capacities = generator.capacities.tolist()
+                for i in window:
+                    ts = self.timesteps[i]
+                    self.model += outputs[generator.index][i] <= capacities[i], f"Generator_Capacity_{generator.name}_{ts}"
+        sections.append(('generators', len(self.model.constraints)))
 
 
         # Storage Unit Constraints
         for bus in self.buses.values():
             
             for su in bus.storage_units.values():
-                self.model += su.socs_start_of_ts[0] == su.min_soc_requirements_start_of_ts[0], f"{su.__class__.__name__}_SOC_Start_{su.name}" # Storage SOC at start is zero - only needs doing once
-                self.model += su.socs_end_of_ts[-1] == su.min_soc_requirements_start_of_ts[-1], f"{su.__class__.__name__}_SOC_End_{su.name}" # Storage SOC at end is zero - only needs doing once
-
-                for i, ts in enumerate(self.timesteps):
+                if reduce:
+                    # Left out: the start and end rows, six bound rows per timestep and a continuity row
+                    # (two nonzeros) between timesteps, and the second SOC variable at each inner boundary
+                    W = len(window)
+                    stats.add_removed('storage_units', W - 1, 2 + 6 * W + (W - 1), 2 + 6 * W + 2 * (W - 1))
+                    consumptions = su.consumptions.tolist()
+                    for i in window:
+                        self.model += socs_end_of_ts[su.index][i] == socs_start_of_ts[su.index][i]\
+                                                + su.charge_efficiency * charge_inflows[su.index][i]\
+                                                - (1 / su.discharge_efficiency) * discharge_outflows[su.index][i]\
+                                                - consumptions[i],\
+                                                f"{su.__class__.__name__}_SOC_charge_balance_{su.name}_{self.timesteps[i]}"
+                    continue
+
+                max_charge_capacities = su.max_charge_capacities.tolist()
+                max_discharge_capacities = su.max_discharge_capacities.tolist()
+                min_soc_requirements = su.min_soc_requirements_start_of_ts.tolist()
+                consumptions = su.consumptions.tolist()
+                initial_soc = min_soc_requirements[start] if initial_socs is None else float(initial_socs[su.index])
+
+                self.model += socs_start_of_ts[su.index][start] == initial_soc, f"{su.__class__.__name__}_SOC_Start_{su.name}" # Storage SOC at start is zero - only needs doing once
+                if is_end_of_horizon:
+                    self.model += socs_end_of_ts[su.index][stop - 1] == min_soc_requirements[-1], f"{su.__class__.__name__}_SOC_End_{su.name}" # Storage SOC at end is zero - only needs doing once
+                else:
+                    # The next window must be able to start from this SOC
+                    self.model += socs_end_of_ts[su.index][stop - 1] >= min_soc_requirements[stop], f"{su.__class__.__name__}_SOC_Window_End_{su.name}"
+
+                for i in window:
+                    ts = self.timesteps[i]
                     # Storage unit can't inflow or outflow more than it's max charge/discharge capacity
-                    self.model += su.charge_inflows[i] <= su.max_charge_capacities[i], f"{su.__class__.__name__}_charge_inflows_Max_{su.name}_{ts}"
-                    self.model += su.discharge_outflows[i] <= su.max_discharge_capacities[i], f"{su.__class__.__name__}_discharge_outflows_Min_{su.name}_{ts}"
+                    self.model += charge_inflows[su.index][i] <= max_charge_capacities[i], f"{su.__class__.__name__}_charge_inflows_Max_{su.name}_{ts}"
+                    self.model += discharge_outflows[su.index][i] <= max_discharge_capacities[i], f"{su.__class__.__name__}_discharge_outflows_Min_{su.name}_{ts}"
 
                     # Storage unit SOC can't be more than max capacity or less than zero
-                    self.model += su.socs_start_of_ts[i] <= su.max_soc_capacity, f"{su.__class__.__name__}_SOC_Max_{su.name}_start_of_{ts}"
-                    self.model += su.socs_start_of_ts[i] >= su.min_soc_requirements_start_of_ts[i], f"Storage_SOC_Min_{su.name}_start_of_{ts}" # Storage SOC must be above min requirements
-                    self.model += su.socs_end_of_ts[i] <= su.max_soc_capacity, f"{su.__class__.__name__}_SOC_Max_{su.name}_end_of_{ts}"
-                    self.model += su.socs_end_of_ts[i] >= 0, f"{su.__class__.__name__}_SOC_Min_{su.name}_end_of_{ts}" # Storage SOC must be above zero
+                    self.model += socs_start_of_ts[su.index][i] <= su.max_soc_capacity, f"{su.__class__.__name__}_SOC_Max_{su.name}_start_of_{ts}"
+                    self.model += socs_start_of_ts[su.index][i] >= min_soc_requirements[i], f"Storage_SOC_Min_{su.name}_start_of_{ts}" # Storage SOC must be above min requirements
+                    self.model += socs_end_of_ts[su.index][i] <= su.max_soc_capacity, f"{su.__class__.__name__}_SOC_Max_{su.name}_end_of_{ts}"
+                    self.model += socs_end_of_ts[su.index][i] >= 0, f"{su.__class__.__name__}_SOC_Min_{su.name}_end_of_{ts}" # Storage SOC must be above zero
 
                     # SOC and charge/discharge balance
-                    self.model += su.socs_end_of_ts[i] == su.socs_start_of_ts[i]\
-                                            + su.charge_efficiency * su.charge_inflows[i]\
-                                            - (1 / su.discharge_efficiency) * su.discharge_outflows[i]\
-                                            - su.consumptions[i],\
+                    self.model += socs_end_of_ts[su.index][i] == socs_start_of_ts[su.index][i]\
+                                            + su.charge_efficiency * charge_inflows[su.index][i]\
+                                            - (1 / su.discharge_efficiency) * discharge_outflows[su.index][i]\
+                                            - consumptions[i],\
                                             f"{su.__class__.__name__}_SOC_charge_balance_{su.name}_{ts}"
                     
                     # Continuity of SOC
-                    if i < len(self.timesteps) - 1:
-                        self.model += su.socs_start_of_ts[i+1] == su.socs_end_of_ts[i], f"{su.__class__.__name__}_SOC_continuity_{su.name}_{ts}"
+                    if i < stop - 1:
+                        self.model += socs_start_of_ts[su.index][i+1] == socs_end_of_ts[su.index][i], f"{su.__class__.__name__}_SOC_continuity_{su.name}_{ts}"
+        sections.append(('storage_units', len(self.model.constraints)))
 
 
         # Transmission Line Constraints
-        for line in self.transmission_lines.values():
-            for i, ts in enumerate(self.timesteps):
-                self.model += line.flows[i] <= line.capacities[i], f"Transmission_Line_Capacity_Max_{line.name}_{ts}"
-                self.model += line.flows[i] >= -line.capacities[i], f"Transmission_Line_Capacity_Min_{line.name}_{ts}"
+        if reduce:
+            stats.add_removed('transmission_lines', 0, 2 * len(window) * len(self.line_table), 2 * len(window) * len(self.line_table))
+        for line in self.transmission_lines.values() if not reduce else ():
+            capacities = line.capacities.tolist()
+            for i in window:
+                ts = self.timesteps[i]
+                self.model += flows[line.index][i] <= capacities[i], f"Transmission_Line_Capacity_Max_{line.name}_{ts}"
+                self.model += flows[line.index][i] >= -capacities[i], f"Transmission_Line_Capacity_Min_{line.name}_{ts}"
+        sections.append(('transmission_lines', len(self.model.constraints)))
 
                     
 
         # Energy Balance: Generation + Imports = Demand + Exports
-        energy_balance_constraints = []
-        for i, ts in enumerate(self.timesteps):
+        demands = {bus: sum((l.consumptions for l in bus.loads.values()), np.zeros(len(self.timesteps))).tolist() for bus in self.buses.values()}
+        energy_balance_constraints = {}
+        for i in window:
+            ts = self.timesteps[i]
             energy_balance_constraints_ts = {}
             for bus in self.buses.values():
                 constraint = (
                     # Flows into node
-                    lpSum(g.outputs[i] for g in bus.generators.values())
-                    + lpSum([t.flows[i] for t in bus.get_lines_flowing_in()])
-                    + lpSum(su.discharge_outflows[i] for su in bus.storage_units.values())
+                    lpSum(outputs[g.index][i] for g in bus.generators.values())
+                    + lpSum([flows[t.index][i] for t in bus.get_lines_flowing_in()])
+                    + lpSum(discharge_outflows[su.index][i] for su in bus.storage_units.values())
                     == 
                     # Flows out of node
-                    lpSum(l.consumptions[i] for l in bus.loads.values()) 
-                    + lpSum(su.charge_inflows[i] for su in bus.storage_units.values())
-                    + lpSum([t.flows[i] for t in bus.get_lines_flowing_out()])
+                    demands[bus][i]
+                    + lpSum(charge_inflows[su.index][i] for su in bus.storage_units.values())
+                    + lpSum([flows[t.index][i] for t in bus.get_lines_flowing_out()])
                 )
                 self.model += constraint, f"Energy_Balance_{bus.name}_{ts}"
                 energy_balance_constraints_ts[bus] = constraint
-            energy_balance_constraints.append(energy_balance_constraints_ts)
+            energy_balance_constraints[i] = energy_balance_constraints_ts
+        sections.append(('buses', len(self.model.constraints)))
 
         # --- Define Objective Function ---
         self.model += lpSum(
-            g.costs[i] * g.outputs[i]
-            for i, t in enumerate(self.timesteps)
+            cost * outputs[g.index][i]
             for b in self.buses.values()
             for g in b.generators.values()
+            for i, cost in zip(window, g.costs[start:stop].tolist())
         ), "Total_Cost"
-
-        # Solve the model
-        self.model.solve()
-
-        # Extract nodal prices
-        for i, ts in enumerate(self.timesteps):
-            energy_balance_constraints_ts = energy_balance_constraints[i]
-            for bus, constraint in energy_balance_constraints_ts.items():
-                bus.nodal_prices[i] = self.model.constraints[constraint.name].pi  # Extract shadow price
-        print(f"Solution: {LpStatus[self.model.status]}")
-        return LpStatus[self.model.status]
+        return energy_balance_constraints, sections, variables
 
 class Bus:
     def __init__(self, name, network: Network):
@@ -162,25 +563,36 @@ class Bus:
         return [line for line in self.network.transmission_lines.values() if line.start_bus == self]
 
 class TransmissionLine:
-    def __init__(self,start_bus, end_bus, capacities: list, network: Network):
+    __slots__ = ('name', 'start_bus', 'end_bus', 'network', 'reactance', 'table', 'index')
+
+    capacities = SeriesAttribute("Transmission line capacity")
+    flows = ResultAttribute()
+
+    def __init__(self,start_bus, end_bus, capacities: list, network: Network, reactance: float = 1.0):
         self.name = f"{start_bus.name}_to_{end_bus.name}"
         self.start_bus = start_bus
         self.end_bus = end_bus
-        self.capacities = capacities
         self.network = network
+        self.reactance = reactance  # Per unit, only used by PTDF solves
+        self.table = self.network.line_table
+        self.index = self.table.add(
+            self,
+            capacities=as_timeseries(capacities, self.table.n_timesteps, "Transmission line capacity", self.name),
+        )
         self.network.transmission_lines[self.name] = self  
 
-        #Initialise decision variables
-        self.flows = []
-        for ts, capacity in zip(self.network.timesteps, self.capacities):
-            self.flows.append(LpVariable(f"{self.name}_flow_{ts}", -capacity, capacity))
-
     
     def __repr__(self):
         flow_info = [f"{flow.varValue if flow else 'None'}" for flow in self.flows]
         return f"{self.name} - Start: {self.start_bus.name} - End: {self.end_bus.name} - Capacities: {self.capacities} - Flows: {flow_info}"
 
 class Generator:
+    __slots__ = ('name', 'bus', 'generator_type', 'table', 'index')
+
+    capacities = SeriesAttribute("Generator capacity")
+    costs = SeriesAttribute("Generator cost")
+    outputs = ResultAttribute()
+
     def __init__(
         self, 
         name, 
@@ -190,34 +602,55 @@ class Generator:
         generator_type: GeneratorType = None
         ):
         self.name = name
-        self.capacities = capacities
-        self.costs = costs
         self.bus = bus
+        self.table = self.bus.network.generator_table
+        self.index = self.table.add(
+            self,
+            capacities=as_timeseries(capacities, self.table.n_timesteps, "Generator capacity", name),
+            costs=as_timeseries(costs, self.table.n_timesteps, "Generator cost", name),
+        )
         self.bus.generators[self.name] = self
         self.generator_type = generator_type
 
-        # Initialise variables
-        self.outputs = []
-        for ts, capacity in zip(self.bus.network.timesteps, self.capacities):
-            self.outputs.append(LpVariable(f"{self.name}_output_{ts}", 0, capacity))
-
     def __repr__(self):
         output_info = [f"{output.varValue if output else 'None'}" for output in self.outputs]
         return f"{self.name} - Capacities: {self.capacities} - Costs: {self.costs} - Outputs: {output_info}"
 
 class Load:
+    __slots__ = ('name', 'bus', 'table', 'index')
+
+    consumptions = SeriesAttribute("Consumption")
+
     def __init__(self, name, consumptions: list, bus: Bus):
         self.name = name
-        self.consumptions = consumptions
         self.bus = bus
+        self.table = self.bus.network.load_table
+        self.index = self.table.add(
+            self,
+            consumptions=as_timeseries(consumptions, self.table.n_timesteps, "Consumption", name),
+        )
         self.bus.loads[self.name] = self
 
     def __repr__(self):
-        output_info = [f"{output.varValue if output else 'None'}" for output in self.outputs]
-        return f"{self.name} - Capacities: {self.capacities} - Costs: {self.costs} - Outputs: {output_info}"
+        return f"{self.name} - Consumptions: {self.consumptions}"
 
 
 class StorageUnit:
+    __slots__ = (
+        'name', 'max_soc_capacity', 'charge_efficiency', 'discharge_efficiency', 'bus', 'storage_type', 'table', 'index',
+    )
+
+    max_charge_capacities = SeriesAttribute("Storage unit charge capacity")
+    max_discharge_capacities = SeriesAttribute("Storage unit discharge capacity")
+    min_soc_requirements_start_of_ts = SeriesAttribute("Storage unit minimum SOC requirements") #The minimum SOC the storage needs at the start of the timestep
+    consumptions = SeriesAttribute("Storage unit consumption")
+
+    # Decision variables
+    charge_inflows = ResultAttribute() #Always positive
+    discharge_outflows = ResultAttribute() #Always positive
+    socs_start_of_ts = ResultAttribute()
+    socs_end_of_ts = ResultAttribute()
+
     def __init__(
         self,
         name: str,
@@ -233,28 +666,22 @@ class StorageUnit:
     ):
         self.name = name
         self.max_soc_capacity = max_soc_capacity
-        self.max_charge_capacities = max_charge_capacities
-        self.max_discharge_capacities = max_discharge_capacities
-        self.min_soc_requirements_start_of_ts = min_soc_requirements_start_of_ts #The minimum SOC the storage needs at the start of the timestep
-        self.consumptions = consumptions
+        self.bus = bus
+        self.table = self.bus.network.storage_table
+        n_timesteps = self.table.n_timesteps
+        self.index = self.table.add(
+            self,
+            max_charge_capacities=as_timeseries(max_charge_capacities, n_timesteps, "Storage unit charge capacity", name),
+            max_discharge_capacities=as_timeseries(max_discharge_capacities, n_timesteps, "Storage unit discharge capacity", name),
+            min_soc_requirements_start_of_ts=as_timeseries(min_soc_requirements_start_of_ts, n_timesteps, "Storage unit minimum SOC requirements", name),
+            consumptions=as_timeseries(consumptions, n_timesteps, "Storage unit consumption", name),
+        )
 
         self.charge_efficiency = charge_efficiency #This is defined as energy stored / energy imported from grid 
         self.discharge_efficiency = discharge_efficiency #This is defined as energy exported / energy stored
-        self.bus = bus
         self.bus.storage_units[self.name] = self
         self.storage_type = storage_type
 
-        # Initialise decision variables
-        self.charge_inflows = [] #Always positive
-        self.discharge_outflows = [] #Always positive
-        self.socs_start_of_ts = []
-        self.socs_end_of_ts = []
-        for i, ts in enumerate(self.bus.network.timesteps):
-            self.charge_inflows.append(LpVariable(f"{self.name}_charge_inflows_{ts}", 0, self.max_charge_capacities[i]))
-            self.discharge_outflows.append(LpVariable(f"{self.name}_discharge_outflows_{ts}", 0, self.max_discharge_capacities[i]))
-            self.socs_start_of_ts.append(LpVariable(f"{self.name}_soc_start_of_{ts}", 0, self.max_soc_capacity))
-            self.socs_end_of_ts.append(LpVariable(f"{self.name}_soc_end_of_{ts}", 0, self.max_soc_capacity))
-
     
     def __repr__(self):
         return f"{self.name} - Max SOC Capacity: {self.max_soc_capacity} - Max Charge Capacities: {self.max_charge_capacities} - Max Discharge Capacities: {self.max_discharge_capacities}"
@@ -0,0 +1,456 @@
+import highspy
+import numpy as np
+from microgrid.stats import SolveStats
+
+HIGHS_STATUS = {
+    highspy.HighsModelStatus.kOptimal: "Optimal",
+    highspy.HighsModelStatus.kInfeasible: "Infeasible",
+    highspy.HighsModelStatus.kUnboundedOrInfeasible: "Infeasible",
+    highspy.HighsModelStatus.kUnbounded: "Unbounded",
+    highspy.HighsModelStatus.kNotset: "Not Solved",
+    highspy.HighsModelStatus.kTimeLimit: "Not Solved",
+    highspy.HighsModelStatus.kIterationLimit: "Not Solved",
+    highspy.HighsModelStatus.kInterrupt: "Not Solved",
+}
+
+
+class LinearProgram:
+    """
+    A network LP held as flat bound/cost vectors and COO coefficient triplets:
+
+        min c.x  subject to  row_lower <= A x <= row_upper,  col_lower <= x <= col_upper
+
+    Variables and constraints are added in blocks shaped (component, timestep) and the
+    index arrays returned by add_variables / add_constraints keep that shape, so results
+    can be read back with plain numpy indexing.
+    """
+    def __init__(self):
+        self.num_col = 0
+        self.num_row = 0
+        self.col_cost = []
+        self.col_lower = []
+        self.col_upper = []
+        self.row_lower = []
+        self.row_upper = []
+        self.coefficient_rows = []
+        self.coefficient_cols = []
+        self.coefficient_values = []
+
+    def add_variables(self, lower, upper, cost=0.0):
+        lower, upper, cost = np.broadcast_arrays(
+            np.asarray(lower, dtype=float), np.asarray(upper, dtype=float), np.asarray(cost, dtype=float)
+        )
+        index = np.arange(self.num_col, self.num_col + lower.size).reshape(lower.shape)
+        self.num_col += lower.size
+        self.col_lower.append(lower.ravel())
+        self.col_upper.append(upper.ravel())
+        self.col_cost.append(cost.ravel())
+        return index
+
+    def add_constraints(self, lower, upper):
+        lower, upper = np.broadcast_arrays(np.asarray(lower, dtype=float), np.asarray(upper, dtype=float))
+        index = np.arange(self.num_row, self.num_row + lower.size).reshape(lower.shape)
+        self.num_row += lower.size
+        self.row_lower.append(lower.ravel())
+        self.row_upper.append(upper.ravel())
+        return index
+
+    def add_coefficients(self, rows, cols, values=1.0):
+        rows, cols, values = np.broadcast_arrays(rows, cols, np.asarray(values, dtype=float))
+        self.coefficient_rows.append(rows.ravel())
+        self.coefficient_cols.append(cols.ravel())
+        self.coefficient_values.append(values.ravel())
+
+    def set_vectors(self, col_cost, col_lower, col_upper, row_lower, row_upper):
+        self.col_cost = [col_cost]
+        self.col_lower = [col_lower]
+        self.col_upper = [col_upper]
+        self.row_lower = [row_lower]
+        self.row_upper = [row_upper]
+
+    @property
+    def num_nz(self):
+        return sum(len(v) for v in self.coefficient_values)
+
+    def csc(self):
+        """Compress the COO triplets into column-wise (start, index, value) arrays, summing duplicates."""
+        rows = np.concatenate(self.coefficient_rows) if self.coefficient_rows else np.empty(0, dtype=int)
+        cols = np.concatenate(self.coefficient_cols) if self.coefficient_cols else np.empty(0, dtype=int)
+        values = np.concatenate(self.coefficient_values) if self.coefficient_values else np.empty(0)
+
+        keys = cols.astype(np.int64) * max(self.num_row, 1) + rows
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        summed = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+        unique_cols, unique_rows = np.divmod(unique_keys, max(self.num_row, 1))
+
+        start = np.zeros(self.num_col + 1, dtype=np.int32)
+        np.cumsum(np.bincount(unique_cols, minlength=self.num_col), out=start[1:])
+        return start, unique_rows.astype(np.int32), summed
+
+    def to_highs(self):
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.num_col
+        lp.num_row_ = self.num_row
+        lp.col_cost_ = np.concatenate(self.col_cost) if self.col_cost else np.empty(0)
+        lp.col_lower_ = np.concatenate(self.col_lower) if self.col_lower else np.empty(0)
+        lp.col_upper_ = np.concatenate(self.col_upper) if self.col_upper else np.empty(0)
+        lp.row_lower_ = np.concatenate(self.row_lower) if self.row_lower else np.empty(0)
+        lp.row_upper_ = np.concatenate(self.row_upper) if self.row_upper else np.empty(0)
+        start, index, value = self.csc()
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.num_col_ = self.num_col
+        lp.a_matrix_.num_row_ = self.num_row
+        lp.a_matrix_.start_ = start
+        lp.a_matrix_.index_ = index
+        lp.a_matrix_.value_ = value
+        return lp
+
+
+def run_highs(lp: LinearProgram):
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.passModel(lp.to_highs())
+    h.run()
+    status = HIGHS_STATUS.get(h.getModelStatus(), "Undefined")
+    if status != "Optimal":
+        return status, None, None, None
+    solution = h.getSolution()
+    return status, h.getInfo().objective_function_value, np.asarray(solution.col_value), np.asarray(solution.row_dual)
+
+
+def add_energy_balance(lp: LinearProgram, program, generator_outputs, charge_inflows, discharge_outflows, flows, consumptions=None):
+    """
+    Energy Balance: Generation + Imports + Discharge - Charge - Exports = Demand
+
+    program lists the buses, generators, loads, storage_units and lines being modelled. Variable blocks
+    are shaped (component, ...) in that order, where the trailing time axes are shared by all blocks and
+    by the (load, ...) consumptions that make up the demand. Returns the (bus, ...) balance rows and the
+    bus index of every load.
+    """
+    buses = program.buses
+    bus_index = {bus.name: i for i, bus in enumerate(buses)}
+    load_bus = np.array([bus_index[l.bus.name] for l in program.loads], dtype=int)
+    demand = np.zeros((len(buses),) + generator_outputs.shape[1:])
+    if consumptions is not None:
+        np.add.at(demand, load_bus, consumptions)
+    energy_balance = lp.add_constraints(demand, demand)
+
+    generator_bus = np.array([bus_index[g.bus.name] for g in program.generators], dtype=int)
+    lp.add_coefficients(energy_balance[generator_bus], generator_outputs, 1.0)
+
+    storage_bus = np.array([bus_index[su.bus.name] for su in program.storage_units], dtype=int)
+    lp.add_coefficients(energy_balance[storage_bus], discharge_outflows, 1.0)
+    lp.add_coefficients(energy_balance[storage_bus], charge_inflows, -1.0)
+
+    lines = program.lines
+    start_bus = np.array([bus_index[t.start_bus.name] for t in lines], dtype=int)
+    end_bus = np.array([bus_index[t.end_bus.name] for t in lines], dtype=int)
+    lp.add_coefficients(energy_balance[end_bus], flows, 1.0)
+    lp.add_coefficients(energy_balance[start_bus], flows, -1.0)
+    return energy_balance, load_bus
+
+
+def storage_efficiencies(storage_units):
+    charge_efficiency = np.array([su.charge_efficiency for su in storage_units], dtype=float)[:, None]
+    discharge_efficiency = np.array([su.discharge_efficiency for su in storage_units], dtype=float)[:, None]
+    return charge_efficiency, discharge_efficiency
+
+
+class NetworkProgram:
+    """
+    The LP for timesteps [start, stop) of a network together with the index arrays needed to map a
+    solution back onto its components. initial_socs (indexed like the storage table) fixes the SOC at
+    the start of the window, otherwise it is fixed to the minimum requirement. The SOC at the end is
+    only fixed when the window reaches the end of the horizon.
+
+    buses restricts the program to part of the network, which must not be connected to the rest by any
+    transmission line (see Network.islands).
+    """
+    def __init__(self, network, start: int = 0, stop: int = None, initial_socs: np.ndarray = None, buses: list = None):
+        self.network = network
+        self.lp = LinearProgram()
+        self.buses = list(network.buses.values()) if buses is None else list(buses)
+        if buses is None:
+            self.generators = network.generator_table.components
+            self.loads = network.load_table.components
+            self.storage_units = network.storage_table.components
+            self.lines = network.line_table.components
+        else:
+            names = {bus.name for bus in self.buses}
+            self.generators = [g for g in network.generator_table.components if g.bus.name in names]
+            self.loads = [l for l in network.load_table.components if l.bus.name in names]
+            self.storage_units = [su for su in network.storage_table.components if su.bus.name in names]
+            self.lines = [t for t in network.line_table.components if t.start_bus.name in names]
+        # Rows of each table that belong to the program, None when it covers the whole table
+        self.rows = None if buses is None else {
+            'generators': np.array([g.index for g in self.generators], dtype=int),
+            'loads': np.array([l.index for l in self.loads], dtype=int),
+            'storage_units': np.array([su.index for su in self.storage_units], dtype=int),
+            'transmission_lines': np.array([t.index for t in self.lines], dtype=int),
+        }
+        self.start = start
+        self.stop = len(network.timesteps) if stop is None else stop
+        self.n_timesteps = self.stop - self.start
+        self.initial_socs = initial_socs
+
+    def column(self, table_name, attribute, start=None, stop=None):
+        values = self.network.tables()[table_name].column(attribute)
+        if self.rows is not None:
+            values = values[self.rows[table_name]]
+        return values[:, self.start if start is None else start:self.stop if stop is None else stop]
+
+    def inputs(self) -> dict:
+        """The input series for the window, read from the network's columnar tables."""
+        return {
+            'generator_capacities': self.column('generators', 'capacities'),
+            'generator_costs': self.column('generators', 'costs'),
+            'load_consumptions': self.column('loads', 'consumptions'),
+            'storage_max_charge_capacities': self.column('storage_units', 'max_charge_capacities'),
+            'storage_max_discharge_capacities': self.column('storage_units', 'max_discharge_capacities'),
+            'storage_min_soc_requirements': self.column('storage_units', 'min_soc_requirements_start_of_ts'),
+            'storage_consumptions': self.column('storage_units', 'consumptions'),
+            'line_capacities': self.column('transmission_lines', 'capacities'),
+        }
+
+    def build(self):
+        # The constraint structure (which variables appear in which rows) depends only on the topology,
+        # so it is built with placeholder bounds and the input dependent vectors are filled in afterwards
+        lp = self.lp
+        T = self.n_timesteps
+        G, S, L = len(self.generators), len(self.storage_units), len(self.lines)
+
+        # Variables - bounds carry the generator, storage and line capacity limits
+        self.generator_outputs = lp.add_variables(np.zeros((G, T)), 0)
+        self.charge_inflows = lp.add_variables(np.zeros((S, T)), 0)
+        self.discharge_outflows = lp.add_variables(np.zeros((S, T)), 0)
+        self.socs_start_of_ts = lp.add_variables(np.zeros((S, T)), 0)
+        self.socs_end_of_ts = lp.add_variables(np.zeros((S, T)), 0)
+        self.flows = lp.add_variables(np.zeros((L, T)), 0)
+
+        self.energy_balance, self.load_bus = add_energy_balance(
+            lp, self, self.generator_outputs, self.charge_inflows, self.discharge_outflows, self.flows
+        )
+
+        # SOC and charge/discharge balance
+        charge_efficiency, discharge_efficiency = storage_efficiencies(self.storage_units)
+        self.soc_balance = lp.add_constraints(np.zeros((S, T)), 0)
+        lp.add_coefficients(self.soc_balance, self.socs_end_of_ts, 1.0)
+        lp.add_coefficients(self.soc_balance, self.socs_start_of_ts, -1.0)
+        lp.add_coefficients(self.soc_balance, self.charge_inflows, -charge_efficiency)
+        lp.add_coefficients(self.soc_balance, self.discharge_outflows, 1 / discharge_efficiency)
+
+        # Continuity of SOC
+        self.soc_continuity = lp.add_constraints(np.zeros((S, T - 1)), 0)
+        lp.add_coefficients(self.soc_continuity, self.socs_start_of_ts[:, 1:], 1.0)
+        lp.add_coefficients(self.soc_continuity, self.socs_end_of_ts[:, :-1], -1.0)
+
+        lp.set_vectors(*self.vectors(self.inputs()))
+        return self
+
+    def vectors(self, inputs: dict):
+        """Cost, column bound and row bound vectors for one set of input series (see inputs)."""
+        lp = self.lp
+        col_cost = np.zeros(lp.num_col)
+        col_lower = np.zeros(lp.num_col)
+        col_upper = np.zeros(lp.num_col)
+        row_lower = np.zeros(lp.num_row)
+        row_upper = np.zeros(lp.num_row)
+
+        col_upper[self.generator_outputs] = inputs['generator_capacities']
+        col_cost[self.generator_outputs] = inputs['generator_costs']
+        col_upper[self.charge_inflows] = inputs['storage_max_charge_capacities']
+        col_upper[self.discharge_outflows] = inputs['storage_max_discharge_capacities']
+        col_lower[self.flows] = -inputs['line_capacities']
+        col_upper[self.flows] = inputs['line_capacities']
+
+        # Storage SOC must stay between the minimum requirement (zero at the end of a timestep) and max capacity
+        min_socs = inputs['storage_min_soc_requirements']
+        max_soc = np.array([su.max_soc_capacity for su in self.storage_units], dtype=float)[:, None]
+        soc_start_lower = min_socs.copy()
+        soc_start_upper = np.broadcast_to(max_soc, min_socs.shape).copy()
+        soc_end_lower = np.zeros_like(min_socs)
+        soc_end_upper = soc_start_upper.copy()
+        # Storage SOC at the start of the window is fixed, at the end of the horizon it returns to the minimum requirement
+        if self.initial_socs is None:
+            initial_socs = min_socs[:, 0]
+        else:
+            initial_socs = self.initial_socs if self.rows is None else self.initial_socs[self.rows['storage_units']]
+        # Clipped like the PuLP bounds, so a start below the requirement or above capacity stays infeasible
+        soc_start_lower[:, 0] = np.maximum(initial_socs, min_socs[:, 0])
+        soc_start_upper[:, 0] = np.minimum(initial_socs, max_soc[:, 0])
+        if self.stop == len(self.network.timesteps):
+            soc_end_upper[:, -1] = soc_end_lower[:, -1] = min_socs[:, -1]
+        else:
+            # The next window must be able to start from this SOC
+            soc_end_lower[:, -1] = self.column('storage_units', 'min_soc_requirements_start_of_ts', self.stop, self.stop + 1)[:, 0]
+        col_lower[self.socs_start_of_ts] = soc_start_lower
+        col_upper[self.socs_start_of_ts] = soc_start_upper
+        col_lower[self.socs_end_of_ts] = soc_end_lower
+        col_upper[self.socs_end_of_ts] = soc_end_upper
+
+        demand = np.zeros(self.energy_balance.shape)
+        np.add.at(demand, self.load_bus, inputs['load_consumptions'])
+        row_lower[self.energy_balance] = row_upper[self.energy_balance] = demand
+        row_lower[self.soc_balance] = row_upper[self.soc_balance] = -inputs['storage_consumptions']
+        return col_cost, col_lower, col_upper, row_lower, row_upper
+
+    def model_size(self) -> dict:
+        """Variables, constraints and nonzeros of the LP, by the component type they belong to."""
+        lp = self.lp
+        rows = np.concatenate(lp.coefficient_rows) if lp.coefficient_rows else np.empty(0, dtype=int)
+        row_nonzeros = np.bincount(rows, minlength=lp.num_row)
+        blocks = {
+            'generators': ([self.generator_outputs], []),
+            'storage_units': ([self.charge_inflows, self.discharge_outflows, self.socs_start_of_ts, self.socs_end_of_ts],
+                              [self.soc_balance, self.soc_continuity]),
+            'transmission_lines': ([self.flows], []),
+            'buses': ([], [self.energy_balance]),
+        }
+        return {
+            component_type: {
+                'variables': sum(v.size for v in variables),
+                'constraints': sum(c.size for c in constraints),
+                'nonzeros': int(sum(row_nonzeros[c].sum() for c in constraints)),
+            }
+            for component_type, (variables, constraints) in blocks.items()
+        }
+
+    def run(self):
+        """Solve without touching the network, returning (status, objective, col_value, row_dual)."""
+        return run_highs(self.lp)
+
+    def solve(self):
+        status, _, col_value, row_dual = self.run()
+        if status == "Optimal":
+            self.apply(col_value, row_dual)
+        return status
+
+    def rows_of(self, table_name):
+        return slice(None) if self.rows is None else self.rows[table_name]
+
+    def line_flows(self, col_value) -> np.ndarray:
+        """(line, timestep) flows of a solution."""
+        return col_value[self.flows]
+
+    def apply(self, col_value, row_dual):
+        """Write the solution into the network's result arrays, which the PuLP path fills too."""
+        network = self.network
+
+        def assign(table_name, table, attribute, index):
+            table.result(attribute)[self.rows_of(table_name), self.start:self.stop] = col_value[index]
+
+        assign('generators', network.generator_table, 'outputs', self.generator_outputs)
+        assign('storage_units', network.storage_table, 'charge_inflows', self.charge_inflows)
+        assign('storage_units', network.storage_table, 'discharge_outflows', self.discharge_outflows)
+        assign('storage_units', network.storage_table, 'socs_start_of_ts', self.socs_start_of_ts)
+        assign('storage_units', network.storage_table, 'socs_end_of_ts', self.socs_end_of_ts)
+        rows = self.rows_of('transmission_lines')
+        network.line_table.result('flows')[rows, self.start:self.stop] = self.line_flows(col_value)
+
+        for bus, prices in zip(self.buses, row_dual[self.energy_balance]):
+            bus.nodal_prices[self.start:self.stop] = prices.tolist()
+
+
+class PersistentProgram:
+    """
+    A full-horizon NetworkProgram kept alive in one HiGHS instance between solves.
+
+    Reassigning Generator.costs, Generator.capacities, Load.consumptions or TransmissionLine.capacities
+    marks that row dirty in its ComponentTable. Before the next solve only the dirty rows are read, and
+    only their entries that changed are pushed into the live model, which then warm starts from the
+    previous basis, so the update costs as much as the edit rather than the network. Any other change -
+    topology, storage parameters or series - means the model is rebuilt. Component series are read-only
+    views, so every edit goes through the setters; writes straight into ComponentTable.column are not seen.
+    """
+    def __init__(self, network):
+        self.network = network
+        self.fingerprint = self.fingerprint_of(network)
+        # Everything dirty so far is in the model being built
+        for table in network.tables().values():
+            for attribute in table.attributes:
+                table.take_dirty(attribute)
+        self.program = NetworkProgram(network).build()
+        self.inputs = {key: values.copy() for key, values in self.program.inputs().items()}
+        self.row_bounds = self.program.lp.row_lower[0].copy()
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.highs.passModel(self.program.lp.to_highs())
+
+    @staticmethod
+    def fingerprint_of(network) -> tuple:
+        # Everything the model's structure and fixed coefficients depend on
+        return (
+            tuple(network.timesteps),
+            tuple(network.buses),
+            tuple((g.name, g.bus.name) for g in network.generator_table.components),
+            tuple((l.name, l.bus.name) for l in network.load_table.components),
+            tuple((s.name, s.bus.name, float(s.max_soc_capacity), float(s.charge_efficiency), float(s.discharge_efficiency))
+                  for s in network.storage_table.components),
+            tuple((t.name, t.start_bus.name, t.end_bus.name) for t in network.line_table.components),
+        )
+
+    def matches(self, network) -> bool:
+        return (
+            network is self.network
+            and self.fingerprint_of(network) == self.fingerprint
+            and not any(network.storage_table.dirty.values())
+        )
+
+    def update(self) -> int:
+        """Push changed entries of dirty rows into the live model, returning how many were changed."""
+        network, program, h = self.network, self.program, self.highs
+        n_changes = 0
+
+        for key, table, attribute, index in (
+            ('generator_costs', network.generator_table, 'costs', program.generator_outputs),
+            ('generator_capacities', network.generator_table, 'capacities', program.generator_outputs),
+            ('line_capacities', network.line_table, 'capacities', program.flows),
+        ):
+            rows = table.take_dirty(attribute)
+            if not len(rows):
+                continue
+            new = table.column(attribute)[rows]
+            changed = new != self.inputs[key][rows]
+            if not changed.any():
+                continue
+            self.inputs[key][rows] = new
+            cols = index[rows][changed].astype(np.int32)
+            values = new[changed]
+            if key == 'generator_costs':
+                h.changeColsCost(len(cols), cols, values)
+            elif key == 'generator_capacities':
+                h.changeColsBounds(len(cols), cols, np.zeros(len(cols)), values)
+            else:
+                h.changeColsBounds(len(cols), cols, -values, values)
+            n_changes += len(cols)
+
+        # Load changes move the energy balance RHS of their bus by the change in consumption
+        rows = network.load_table.take_dirty('consumptions')
+        if len(rows):
+            new = network.load_table.column('consumptions')[rows]
+            delta = new - self.inputs['load_consumptions'][rows]
+            if delta.any():
+                self.inputs['load_consumptions'][rows] = new
+                load_i, ts_i = np.nonzero(delta)
+                balance_rows = program.energy_balance[program.load_bus[rows[load_i]], ts_i]
+                np.add.at(self.row_bounds, balance_rows, delta[load_i, ts_i])
+                balance_rows = np.unique(balance_rows).astype(np.int32)
+                h.changeRowsBounds(len(balance_rows), balance_rows, self.row_bounds[balance_rows], self.row_bounds[balance_rows])
+                n_changes += len(balance_rows)
+        return n_changes
+
+    def solve(self, stats: SolveStats = None):
+        stats = SolveStats(self.network.name, "highs") if stats is None else stats
+        with stats.phase("update"):
+            n_changes = self.update()
+        print(f"Updated {n_changes} entries of the persistent model")
+        for component_type, size in self.program.model_size().items():
+            stats.add_model_size(component_type, **size)
+        with stats.phase("highs"):
+            self.highs.run()
+        status = HIGHS_STATUS.get(self.highs.getModelStatus(), "Undefined")
+        if status == "Optimal":
+            with stats.phase("apply"):
+                solution = self.highs.getSolution()
+                self.program.apply(np.asarray(solution.col_value), np.asarray(solution.row_dual))
+        return status
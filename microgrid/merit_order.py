@@ -0,0 +1,112 @@
+import numpy as np
+
+# Lines loaded to within this of their capacity count as binding
+BINDING_TOLERANCE = 1e-9
+
+
+def dispatch(capacities: np.ndarray, costs: np.ndarray, demand: np.ndarray):
+    """
+    Economic dispatch of (generator, timestep) capacities and costs against a (timestep,) demand on a
+    single copper-plate bus: every timestep, fill demand from the cheapest generators up. Returns the
+    (generator, timestep) outputs, the clearing price (the marginal unit's cost) and whether demand was met.
+    """
+    G, T = capacities.shape
+    if G == 0:
+        return np.zeros((0, T)), np.zeros(T), demand <= BINDING_TOLERANCE
+
+    order = np.argsort(costs, axis=0, kind='stable')
+    sorted_capacities = np.take_along_axis(capacities, order, axis=0)
+    sorted_costs = np.take_along_axis(costs, order, axis=0)
+    cumulative = np.cumsum(sorted_capacities, axis=0)
+
+    # Each unit takes whatever demand is left after the cheaper units, up to its capacity
+    sorted_outputs = np.clip(demand - (cumulative - sorted_capacities), 0, sorted_capacities)
+    outputs = np.empty_like(sorted_outputs)
+    np.put_along_axis(outputs, order, sorted_outputs, axis=0)
+
+    # The marginal unit is the first whose cumulative capacity covers demand
+    marginal = (cumulative < demand - BINDING_TOLERANCE).sum(axis=0)
+    feasible = marginal < G
+    prices = np.take_along_axis(sorted_costs, np.minimum(marginal, G - 1)[None, :], axis=0)[0]
+    return outputs, prices, feasible
+
+
+def is_radial(network) -> bool:
+    """No storage and no loops, so dispatch per island is a sort and the line flows follow from it."""
+    n_islands = len(network.islands())
+    return not len(network.storage_table) and len(network.line_table) == len(network.buses) - n_islands
+
+
+def tree_flows(buses: list, lines: list, injections: np.ndarray) -> np.ndarray:
+    """
+    Line flows of a tree of buses for (bus, timestep) net injections that sum to zero. Each line carries
+    the total injection of the subtree on its far side.
+    """
+    bus_index = {bus.name: i for i, bus in enumerate(buses)}
+    neighbours = {i: [] for i in range(len(buses))}
+    for line_i, t in enumerate(lines):
+        neighbours[bus_index[t.start_bus.name]].append((line_i, bus_index[t.end_bus.name]))
+        neighbours[bus_index[t.end_bus.name]].append((line_i, bus_index[t.start_bus.name]))
+
+    # Walk out from the first bus, remembering the line each bus was reached by
+    order, parent_line, seen = [0], {0: None}, {0}
+    for bus_i in order:
+        for line_i, other in neighbours[bus_i]:
+            if other not in seen:
+                seen.add(other)
+                parent_line[other] = line_i
+                order.append(other)
+
+    subtree = injections.copy()
+    flows = np.zeros((len(lines), injections.shape[1]))
+    for bus_i in reversed(order[1:]):
+        line_i = parent_line[bus_i]
+        t = lines[line_i]
+        # Flows are positive from start_bus to end_bus
+        flows[line_i] = subtree[bus_i] if bus_index[t.start_bus.name] == bus_i else -subtree[bus_i]
+        parent = bus_index[t.end_bus.name] if bus_index[t.start_bus.name] == bus_i else bus_index[t.start_bus.name]
+        subtree[parent] += subtree[bus_i]
+    return flows
+
+
+def solve(network):
+    """
+    Merit-order dispatch of a radial network (see is_radial), one copper-plate market per island.
+    Returns the status, or None without touching the network if a line would bind, in which case
+    prices separate between buses and the LP is needed.
+    """
+    capacities = network.generator_table.column('capacities')
+    costs = network.generator_table.column('costs')
+    consumptions = network.load_table.column('consumptions')
+    line_capacities = network.line_table.column('capacities')
+    T = len(network.timesteps)
+
+    results = []
+    for buses in network.islands():
+        bus_index = {bus.name: i for i, bus in enumerate(buses)}
+        generators = [g for g in network.generator_table.components if g.bus.name in bus_index]
+        loads = [l for l in network.load_table.components if l.bus.name in bus_index]
+        lines = [t for t in network.line_table.components if t.start_bus.name in bus_index]
+        generator_rows = np.array([g.index for g in generators], dtype=int)
+        load_rows = np.array([l.index for l in loads], dtype=int)
+
+        bus_demand = np.zeros((len(buses), T))
+        np.add.at(bus_demand, np.array([bus_index[l.bus.name] for l in loads], dtype=int), consumptions[load_rows])
+        outputs, prices, feasible = dispatch(capacities[generator_rows], costs[generator_rows], bus_demand.sum(axis=0))
+        if not feasible.all():
+            return "Infeasible"
+
+        injections = -bus_demand
+        np.add.at(injections, np.array([bus_index[g.bus.name] for g in generators], dtype=int), outputs)
+        flows = tree_flows(buses, lines, injections)
+        limits = line_capacities[np.array([t.index for t in lines], dtype=int)]
+        if (np.abs(flows) >= limits - BINDING_TOLERANCE).any():
+            return None
+        results.append((buses, generators, outputs, lines, flows, prices))
+
+    for buses, generators, outputs, lines, flows, prices in results:
+        network.generator_table.result('outputs')[[g.index for g in generators]] = outputs
+        network.line_table.result('flows')[[t.index for t in lines]] = flows
+        for bus in buses:
+            bus.nodal_prices[:] = prices.tolist()
+    return "Optimal"
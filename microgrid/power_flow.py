@@ -0,0 +1,145 @@
+import highspy
+import numpy as np
+from microgrid.matrix import NetworkProgram, HIGHS_STATUS
+from microgrid.stats import SolveStats
+
+# Flows within this of a line's capacity do not need a constraint
+LINE_TOLERANCE = 1e-6
+
+
+def ptdf_matrix(network) -> np.ndarray:
+    """
+    DC power transfer distribution factors: the (line, bus) flow, from start to end bus, caused by
+    injecting 1 MW at a bus and taking it out at the first bus of its island. Lines and buses are in
+    line table and network order. Use Network.ptdf(), which caches the matrix.
+    """
+    bus_index = {name: i for i, name in enumerate(network.buses)}
+    lines = network.line_table.components
+    incidence = np.zeros((len(lines), len(bus_index)))
+    for l, t in enumerate(lines):
+        incidence[l, bus_index[t.start_bus.name]] += 1.0
+        incidence[l, bus_index[t.end_bus.name]] -= 1.0
+    susceptance = 1.0 / np.array([t.reactance for t in lines], dtype=float)
+    weighted = susceptance[:, None] * incidence
+    bus_susceptance = incidence.T @ weighted
+
+    ptdf = np.zeros((len(lines), len(bus_index)))
+    for buses in network.islands():
+        # The first bus is the island's slack, so its column stays zero
+        others = np.array([bus_index[bus.name] for bus in buses[1:]], dtype=int)
+        if not len(others):
+            continue
+        island_lines = np.flatnonzero(np.abs(incidence[:, others]).sum(axis=1))
+        # Angles are B^-1 p with the slack angle at zero, and flows are susceptance times angle difference
+        angles = np.linalg.inv(bus_susceptance[np.ix_(others, others)])
+        ptdf[np.ix_(island_lines, others)] = weighted[np.ix_(island_lines, others)] @ angles
+    return ptdf
+
+
+class PTDFProgram(NetworkProgram):
+    """
+    The network LP with DC power flow physics. Each bus gets a free net injection variable instead of
+    the lines getting flow variables, one row per island and timestep keeps injections summed to zero,
+    and line flows are the PTDF times the injections.
+
+    Line limits start out of the model: run() solves, adds rows only for the (line, timestep) flows
+    that exceed their capacity and re-solves from the previous basis until no line is overloaded.
+    """
+    def __init__(self, network, ptdf: np.ndarray):
+        super().__init__(network)
+        self.ptdf = ptdf
+        self.ptdf_lines = self.lines
+        # Lines get no variables, only the lazy limit rows
+        self.lines = []
+        self.injections = None
+        self.rounds = 0
+        self.line_rows = 0
+        self.line_nonzeros = 0
+
+    def build(self):
+        super().build()
+        lp = self.lp
+        B, T = len(self.buses), self.n_timesteps
+        self.injections = lp.add_variables(np.zeros((B, T)), 0)
+        lp.add_coefficients(self.energy_balance, self.injections, -1.0)
+
+        island_of = {bus.name: i for i, buses in enumerate(self.network.islands()) for bus in buses}
+        self.island_balance = lp.add_constraints(np.zeros((len(set(island_of.values())), T)), 0)
+        lp.add_coefficients(self.island_balance[[island_of[bus.name] for bus in self.buses]], self.injections, 1.0)
+
+        lp.set_vectors(*self.vectors(self.inputs()))
+        return self
+
+    def inputs(self) -> dict:
+        inputs = super().inputs()
+        inputs['line_capacities'] = inputs['line_capacities'][:0]
+        return inputs
+
+    def vectors(self, inputs: dict):
+        col_cost, col_lower, col_upper, row_lower, row_upper = super().vectors(inputs)
+        if self.injections is not None:
+            col_lower[self.injections] = -np.inf
+            col_upper[self.injections] = np.inf
+        return col_cost, col_lower, col_upper, row_lower, row_upper
+
+    def model_size(self) -> dict:
+        sizes = super().model_size()
+        rows = np.concatenate(self.lp.coefficient_rows)
+        sizes['buses']['variables'] += self.injections.size
+        sizes['buses']['constraints'] += self.island_balance.size
+        sizes['buses']['nonzeros'] += int(np.isin(rows, self.island_balance).sum())
+        sizes['transmission_lines']['constraints'] += self.line_rows
+        sizes['transmission_lines']['nonzeros'] += self.line_nonzeros
+        return sizes
+
+    def line_flows(self, col_value) -> np.ndarray:
+        return self.ptdf @ col_value[self.injections]
+
+    def run(self):
+        """Solve, adding violated line limits until there are none (see the class docstring)."""
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", False)
+        h.passModel(self.lp.to_highs())
+        capacities = self.column('transmission_lines', 'capacities')
+        added = np.zeros(capacities.shape, dtype=bool)
+        while True:
+            h.run()
+            self.rounds += 1
+            status = HIGHS_STATUS.get(h.getModelStatus(), "Undefined")
+            if status != "Optimal":
+                return status, None, None, None
+            col_value = np.asarray(h.getSolution().col_value)
+            violated = (np.abs(self.line_flows(col_value)) > capacities + LINE_TOLERANCE) & ~added
+            if not violated.any():
+                solution = h.getSolution()
+                return status, h.getInfo().objective_function_value, col_value, np.asarray(solution.row_dual)
+
+            added |= violated
+            lines, timesteps = np.nonzero(violated)
+            starts, indices, values = [], [], []
+            for l, t in zip(lines, timesteps):
+                buses = np.flatnonzero(self.ptdf[l])
+                starts.append(len(indices))
+                indices.extend(self.injections[buses, t])
+                values.extend(self.ptdf[l, buses])
+            limits = capacities[lines, timesteps]
+            h.addRows(len(lines), -limits, limits, len(indices), np.array(starts, dtype=np.int32),
+                      np.array(indices, dtype=np.int32), np.array(values, dtype=float))
+            self.line_rows += len(lines)
+            self.line_nonzeros += len(indices)
+
+
+def solve_ptdf(network, stats: SolveStats = None) -> str:
+    """Solve the whole horizon with PTDF line flows and lazy line limits (see PTDFProgram)."""
+    stats = SolveStats(network.name, "highs") if stats is None else stats
+    with stats.phase("build"):
+        program = PTDFProgram(network, network.ptdf()).build()
+    with stats.phase("highs"):
+        status, _, col_value, row_dual = program.run()
+    for component_type, size in program.model_size().items():
+        stats.add_model_size(component_type, **size)
+    print(f"Added {program.line_rows} of {len(program.ptdf_lines) * program.n_timesteps} line constraints in {program.rounds} rounds")
+    if status == "Optimal":
+        with stats.phase("apply"):
+            program.apply(col_value, row_dual)
+    return status
@@ -0,0 +1,69 @@
+import json
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from microgrid.save import PARQUET_TABLES
+
+
+def read_network_info(output_dir) -> dict:
+    """Name, timestep labels, buses and storage capacities of a network written by save_network_parquet."""
+    with open(os.path.join(output_dir, 'network.json')) as f:
+        return json.load(f)
+
+
+def row_groups(parquet_file: pq.ParquetFile, components: list = None, start: int = None, stop: int = None) -> list:
+    """Indices of the row groups whose component and timestep statistics overlap the selection."""
+    metadata = parquet_file.metadata
+    names = metadata.schema.names
+    component_column, timestep_column = names.index('component'), names.index('timestep_index')
+    selected = []
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        component_stats = row_group.column(component_column).statistics
+        timestep_stats = row_group.column(timestep_column).statistics
+        if components is not None and component_stats is not None and component_stats.has_min_max:
+            if not any(component_stats.min <= name <= component_stats.max for name in components):
+                continue
+        if timestep_stats is not None and timestep_stats.has_min_max:
+            if start is not None and timestep_stats.max < start:
+                continue
+            if stop is not None and timestep_stats.min >= stop:
+                continue
+        selected.append(i)
+    return selected
+
+
+def read_series(output_dir, table: str, components: list = None, start: int = None, stop: int = None, columns: list = None):
+    """
+    Read part of a table written by save_network_parquet as a pandas DataFrame, ordered by component
+    name then timestep.
+
+    Only the row groups that hold the components (names) and [start, stop) (timestep indices) are
+    decoded (see row_groups). columns limits which series are read.
+    """
+    if table not in PARQUET_TABLES:
+        raise ValueError(f"Unknown table {table}")
+    if columns is not None:
+        columns = ['component', 'timestep_index'] + [c for c in columns if c not in ('component', 'timestep_index')]
+
+    parquet_file = pq.ParquetFile(os.path.join(output_dir, f"{table}.parquet"))
+    data = parquet_file.read_row_groups(row_groups(parquet_file, components, start, stop), columns=columns)
+
+    # Row groups also hold rows either side of the selection
+    names = data['component'].cast(pa.string())
+    mask = None
+    if components is not None:
+        mask = pc.is_in(names, value_set=pa.array(list(components), pa.string()))
+    for condition in (
+        None if start is None else pc.greater_equal(data['timestep_index'], start),
+        None if stop is None else pc.less(data['timestep_index'], stop),
+    ):
+        if condition is not None:
+            mask = condition if mask is None else pc.and_(mask, condition)
+    # Time blocks are separate row groups, so put each component's timesteps back together
+    order = pc.sort_indices(pa.table({'component': names, 'timestep_index': data['timestep_index']}),
+                            sort_keys=[('component', 'ascending'), ('timestep_index', 'ascending')])
+    if mask is not None:
+        order = pc.filter(order, pc.take(mask, order))
+    return data.take(order).to_pandas()
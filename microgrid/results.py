@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class Solution:
+    """
+    A compact copy of a network's results, taken in one pass: every decision variable as a
+    (component, timestep) array in table row order and nodal_prices as a (bus, timestep) array,
+    NaN where nothing was solved. It does not reference the solver model, so it stays valid after
+    Network.release_model() and is what save and draw read.
+
+    For a disk-backed network (Network(series_dir=...)) the result arrays are views of the memory-mapped
+    result files, so a snapshot costs no memory; the network detaches them (copies them into memory) before
+    anything it runs overwrites those results. Without a series_dir they are copied into memory up front.
+    Nodal prices are always copied.
+    """
+    def __init__(self, network, status: str = None, copy: bool = None):
+        # copy=False reads the result arrays as views even for an in-memory network, for a one-off read
+        if copy is None:
+            copy = network.series_dir is None
+        self.status = status
+        self.timesteps = list(network.timesteps)
+        self.bus_index = {name: i for i, name in enumerate(network.buses)}
+        self.results = {
+            attribute: table.result(attribute).copy() if copy else table.result(attribute)
+            for table in network.tables().values()
+            for attribute in table.result_attributes
+        }
+        self.nodal_prices = np.array(
+            [[np.nan if p is None else p for p in bus.nodal_prices] for bus in network.buses.values()], dtype=float,
+        ).reshape(len(network.buses), len(network.timesteps))
+        if not copy:
+            network.solution_views.add(self)
+        # Generation cost is the whole objective
+        self.objective = float(np.nansum(network.generator_table.column('costs') * self.results['outputs']))
+
+    def detach(self):
+        """Copy result arrays that are still views of the network's tables into memory."""
+        self.results = {attribute: np.array(values) for attribute, values in self.results.items()}
+
+    def result(self, attribute: str) -> np.ndarray:
+        """(component, timestep) values of one decision variable, e.g. 'outputs' or 'flows'."""
+        return self.results[attribute]
+
+    def prices(self, bus_name: str) -> list:
+        """One bus's nodal prices as a list, None where unsolved (the form Bus.nodal_prices takes)."""
+        return [None if np.isnan(p) else p for p in self.nodal_prices[self.bus_index[bus_name]].tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return self.nodal_prices.nbytes + sum(array.nbytes for array in self.results.values())
+
+
+def solution_of(network) -> Solution:
+    """The network's last solution snapshot, or a fresh one when results were written since it was taken."""
+    return network.solution if network.solution is not None else Solution(network, copy=False)
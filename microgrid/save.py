@@ -1,13 +1,18 @@
 import json
+import datetime
 import duckdb
 import os
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from microgrid.results import solution_of
 
-def unpack_lp_var_list(var_list):
-    return [v.varValue for v in var_list]
+def unpack_lp_var_list(values):
+    # Solved values as floats, None where nothing has been solved
+    return [None if np.isnan(v) else v for v in values.tolist()]
 
 def save_network_json(n, output_path):
+    solution = solution_of(n)
     network_output = {'network': {
         'name': n.name,
         'timesteps': [(i, ts) for i, ts in enumerate(n.timesteps)],
@@ -15,43 +20,43 @@ def save_network_json(n, output_path):
             bus.name: {
                 'generators': {
                     gen.name: {
-                        'capacities': gen.capacities,
-                        'costs': gen.costs,
-                        'outputs': unpack_lp_var_list(gen.outputs),
+                        'capacities': gen.capacities.tolist(),
+                        'costs': gen.costs.tolist(),
+                        'outputs': unpack_lp_var_list(solution.result('outputs')[gen.index]),
                         'generator_type': gen.generator_type.value if gen.generator_type else None,
                     }
                     for gen in bus.generators.values()
                 },
                 'loads': {
                     load.name: {
-                        'consumptions': load.consumptions
+                        'consumptions': load.consumptions.tolist()
                     }
                     for load in bus.loads.values()
                 },
                 'storage_units': {
                     su.name: {
                         'max_soc_capacity': su.max_soc_capacity,
-                        'max_charge_capacities': su.max_charge_capacities,
-                        'max_discharge_capacities': su.max_discharge_capacities,
-                        'min_soc_requirements': su.min_soc_requirements_start_of_ts,
-                        'consumptions': su.consumptions,
-                        'charge_inflows': unpack_lp_var_list(su.charge_inflows),
-                        'discharge_outflows': unpack_lp_var_list(su.discharge_outflows),
-                        'soc_start_of_ts':unpack_lp_var_list(su.socs_start_of_ts),
-                        'soc_end_of_ts': unpack_lp_var_list(su.socs_end_of_ts),
+                        'max_charge_capacities': su.max_charge_capacities.tolist(),
+                        'max_discharge_capacities': su.max_discharge_capacities.tolist(),
+                        'min_soc_requirements': su.min_soc_requirements_start_of_ts.tolist(),
+                        'consumptions': su.consumptions.tolist(),
+                        'charge_inflows': unpack_lp_var_list(solution.result('charge_inflows')[su.index]),
+                        'discharge_outflows': unpack_lp_var_list(solution.result('discharge_outflows')[su.index]),
+                        'soc_start_of_ts':unpack_lp_var_list(solution.result('socs_start_of_ts')[su.index]),
+                        'soc_end_of_ts': unpack_lp_var_list(solution.result('socs_end_of_ts')[su.index]),
                         'storage_type': su.storage_type.value if su.storage_type else None,
                         
                     }
                     for su in bus.storage_units.values()
                 },
-                'nodal_prices': bus.nodal_prices
+                'nodal_prices': solution.prices(bus.name)
             }
             for bus in n.buses.values()
         },
         'transmission_lines': {
             line.name: {
-                'capacities': line.capacities,
-                'flows': unpack_lp_var_list(line.flows),
+                'capacities': line.capacities.tolist(),
+                'flows': unpack_lp_var_list(solution.result('flows')[line.index]),
                 'start_bus': line.start_bus.name,
                 'end_bus': line.end_bus.name
             }
@@ -62,194 +67,411 @@ def save_network_json(n, output_path):
     with open(output_path, 'w') as f:
         json.dump(network_output, f, indent=4)
 
-def save_network_duckdb(n, output_path):
-
-    # Test if timesteps is list of tuples if so unpack and join with '-'
-    if isinstance(n.timesteps[0], tuple) or isinstance(n.timesteps[0], list):
-        timesteps = [f"{ts[0]}_{ts[1]}" for ts in n.timesteps]
-    else:
-        timesteps = n.timesteps
-
-
-    bus_prices = []
-
-    ## Write Nodal prices
-    for bus_name, bus in n.buses.items():
-        nodal_prices = bus.nodal_prices
-        price_series = pd.Series(nodal_prices, name=f'price_{bus_name.replace(' ', '-')}')
-        bus_prices.append(price_series)
-    
-    price_df = pd.concat(bus_prices, axis=1)
-    
-    price_df['timestep'] = timesteps
-    
-    with duckdb.connect(output_path) as conn:
-        # Nodal prices
-        conn.sql("DROP TABLE IF EXISTS nodal_prices")
-        conn.sql("CREATE TABLE nodal_prices AS SELECT * FROM price_df")
-
-
-    # Write generator outputs
-    generator_outputs = []
-
-    for bus_name, bus in n.buses.items():
-        for generator_name, generator in bus.generators.items():
-            generator_df = pd.DataFrame(
-                data={
-                    'output': [o.varValue for o in generator.outputs],
-                    'capacity': generator.capacities,
-                    'costs': generator.costs,
-                    'timestep': timesteps
-                }
-            )
-            generator_df['bus'] = bus_name
-            generator_df['generator'] = generator_name
-            generator_df['generator_type'] = generator.generator_type.value if generator.generator_type else 'Unclassified'
-            generator_outputs.append(generator_df)
-
-    if generator_outputs:
-        generator_outputs_df = pd.concat(generator_outputs, axis=0)
-        with duckdb.connect(output_path) as conn:
-            # Generator outputs
-            conn.sql("DROP TABLE IF EXISTS generator_outputs")
-            conn.sql("CREATE TABLE generator_outputs AS SELECT * FROM generator_outputs_df")
-
-    
-    # Write storage unit inputs outputs and SOC
-    
-    storage_unit_outputs = []
-    
-    for bus_name, bus in n.buses.items():
-        for storage_unit_name, storage_unit in bus.storage_units.items():
-            storage_unit_df = pd.DataFrame(
-                data={
-                    'charge_inflow': [o.varValue for o in storage_unit.charge_inflows],
-                    'discharge_outflow': [o.varValue for o in storage_unit.discharge_outflows],
-                    'soc_start_of_ts': [o.varValue for o in storage_unit.socs_start_of_ts],
-                    'soc_end_of_ts': [o.varValue for o in storage_unit.socs_end_of_ts],
-                    'consumptions': storage_unit.consumptions,
-                    'max_charge_capacity': storage_unit.max_charge_capacities,
-                    'max_discharge_capacity': storage_unit.max_discharge_capacities,
-                    'min_soc_requirements': storage_unit.min_soc_requirements_start_of_ts,
-                    'timestep': timesteps
-                }
-            )
-            storage_unit_df['bus'] = bus_name
-            storage_unit_df['storage_unit'] = storage_unit_name
-            storage_unit_df['storage_type'] = storage_unit.storage_type.value if storage_unit.storage_type else 'Unclassified'
-            storage_unit_df['max_soc_capacity'] = storage_unit.max_soc_capacity
-
-            storage_unit_outputs.append(storage_unit_df)
-
-    if storage_unit_outputs:
-        storage_unit_outputs_df = pd.concat(storage_unit_outputs, axis=0)
-        with duckdb.connect(output_path) as conn:
-            # Storage unit outputs
-            conn.sql("DROP TABLE IF EXISTS storage_unit_outputs")
-            conn.sql("CREATE TABLE storage_unit_outputs AS SELECT * FROM storage_unit_outputs_df")
-
-
-    # Nodal flows by bus
-    nodal_flows = []
-    for bus_name, bus in n.buses.items():
-        for generator in bus.generators.values():
-            flow = pd.DataFrame(
-                data = {
-                    'flow_in_amount': [max(o.varValue, 0) for o in generator.outputs],
-                    'flow_out_amount': [- min(o.varValue, 0) for o in generator.outputs],
-                }
-                )
-            flow['flow_type'] = 'generator'
-            flow['item_name'] = generator.name
-            flow['subtype'] = generator.generator_type.value if generator.generator_type else 'Unclassified'
-            flow['bus'] = bus_name
-            flow['timestep'] = timesteps
-            flow['net_flow'] = flow['flow_in_amount'] - flow['flow_out_amount']
-            nodal_flows.append(flow)
-        
-        for storage_unit in bus.storage_units.values():
-            flow = pd.DataFrame(
-                data = {
-                    'flow_in_amount': [o.varValue for o in storage_unit.discharge_outflows],
-                    'flow_out_amount': [o.varValue for o in storage_unit.charge_inflows],
-                }
-                )
-            flow['flow_type'] = 'storage_unit'
-            flow['item_name'] = storage_unit.name
-            flow['subtype'] = storage_unit.storage_type.value if storage_unit.storage_type else 'Unclassified'
-            flow['bus'] = bus_name
-            flow['timestep'] = timesteps
-            flow['net_flow'] = flow['flow_in_amount'] - flow['flow_out_amount']
-            nodal_flows.append(flow)
-
-        for load_name, load in bus.loads.items():
-            flow = pd.DataFrame(
-                data = {
-                    'flow_out_amount': [max(o, 0) for o in load.consumptions],
-                    'flow_in_amount': [- min(o,0) for o in load.consumptions],
-                }
-                )
-            flow['flow_type'] = 'load'
-            flow['item_name'] = load_name
-            flow['bus'] = bus_name
-            flow['timestep'] = timesteps
-            flow['net_flow'] = flow['flow_in_amount'] - flow['flow_out_amount']
-            nodal_flows.append(flow)
-
-    for transmission_line_name, transmission_line in n.transmission_lines.items():
-        start_bus = transmission_line.start_bus.name
-        end_bus = transmission_line.end_bus.name
-
-    # The tranmission line flow is recorded twice in the table, once for the start bus and once for the end bus
-        start_bus_flow = pd.DataFrame(
-            data = {
-                'flow_out_amount': [max(o.varValue, 0) for o in transmission_line.flows],
-                'flow_in_amount': [- min(o.varValue, 0) for o in transmission_line.flows],
-                'timestep': timesteps
-            }
-            )
-        start_bus_flow['flow_type'] = 'transmission_line'
-        start_bus_flow['item_name'] = transmission_line_name
-        start_bus_flow['subtype'] = 'transmission_line'
-        start_bus_flow['bus'] = start_bus
-        start_bus_flow['net_flow'] = start_bus_flow['flow_in_amount'] - start_bus_flow['flow_out_amount']
-
-        nodal_flows.append(start_bus_flow)
-
-        
-        end_bus_flow = pd.DataFrame(
-            data = {
-                'flow_in_amount': [max(o.varValue, 0) for o in transmission_line.flows],
-                'flow_out_amount': [- min(o.varValue,0) for o in transmission_line.flows],
-                'timestep': timesteps
+def timestep_labels(timesteps):
+    # Test if timesteps is list of tuples if so unpack and join with '_'
+    if isinstance(timesteps[0], tuple) or isinstance(timesteps[0], list):
+        return [f"{ts[0]}_{ts[1]}" for ts in timesteps]
+    return list(timesteps)
+
+def var_values(solution, components, attribute, start, stop):
+    # (component, timestep) array of solved values for timesteps [start, stop), NaN where unsolved
+    if not components:
+        return np.empty((0, stop - start))
+    return solution.result(attribute)[[c.index for c in components], start:stop]
+
+def type_names(components, attribute):
+    return [getattr(c, attribute).value if getattr(c, attribute) else 'Unclassified' for c in components]
+
+def timestep_times(timesteps, timestamps=None):
+    # datetime64 of every timestep, from timestamps or else the labels (the first element of tuple labels),
+    # None when the labels are not dates. Only strings and dates are parsed, numbers are not epoch offsets
+    if timestamps is None:
+        timestamps = [ts[0] if isinstance(ts, (tuple, list)) else ts for ts in timesteps]
+    if not all(isinstance(t, (str, datetime.date, np.datetime64)) for t in timestamps):
+        return None
+    try:
+        return np.array(timestamps, dtype='datetime64[m]')
+    except (ValueError, TypeError):
+        return None
+
+def sum_by(values, groups, n_groups):
+    # Sum the rows of a (row, ...) array into n_groups by each row's group number
+    sums = np.zeros((n_groups,) + values.shape[1:])
+    np.add.at(sums, groups, values)
+    return sums
+
+def label_columns(labels, n_rows):
+    # The same value in every row, one column per label
+    return {key: pa.array([value] * n_rows) for key, value in labels.items()}
+
+# Summary table: columns it is sorted and indexed on
+SUMMARY_INDEXES = {
+    'energy_daily': ['bus', 'day'],
+    'energy_monthly': ['bus', 'month'],
+    'price_duration_curves': ['bus', 'rank'],
+    'line_utilisation': ['start_bus', 'end_bus'],
+    'storage_cycles': ['bus', 'storage_unit'],
+}
+
+
+class DuckDBWriter:
+    """
+    Writes network results to a DuckDB database over one open connection.
+
+    Each table is filled from contiguous column arrays handed to DuckDB as an Arrow table, so no
+    per-component frames are built. The first write to a table replaces it, later writes append, which
+    lets results be streamed in chunks (e.g. one write_network per rolling window or per scenario).
+    With append=True even the first write appends to whatever is already in the database.
+    """
+    def __init__(self, output_path, append: bool = False):
+        self.conn = duckdb.connect(output_path)
+        self.append = append
+        self.written = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def write(self, table_name: str, columns: dict):
+        chunk = pa.table(columns)
+        self.conn.register('chunk', chunk)
+        try:
+            if table_name in self.written:
+                self.add_missing_columns(table_name)
+                self.conn.execute(f'INSERT INTO "{table_name}" BY NAME SELECT * FROM chunk')
+            elif self.append:
+                self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" AS SELECT * FROM chunk LIMIT 0')
+                self.add_missing_columns(table_name)
+                self.conn.execute(f'INSERT INTO "{table_name}" BY NAME SELECT * FROM chunk')
+            else:
+                self.conn.execute(f'CREATE OR REPLACE TABLE "{table_name}" AS SELECT * FROM chunk')
+        finally:
+            self.conn.unregister('chunk')
+        self.written.add(table_name)
+
+    def add_missing_columns(self, table_name: str):
+        # A table appended to may have been written without some of the chunk's columns (labels, or dates),
+        # which INSERT BY NAME does not add. Rows already in the table get NULL for them
+        existing = {name for (name,) in self.conn.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = ?", [table_name]
+        ).fetchall()}
+        for name, column_type, *_ in self.conn.execute('DESCRIBE chunk').fetchall():
+            if name not in existing:
+                self.conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{name}" {column_type}')
+
+    def write_network(self, n, start: int = 0, stop: int = None, **labels):
+        """
+        Write inputs and results for timesteps [start, stop). labels are added to every row as constant
+        columns, e.g. scenario="high_demand" to tell apart chunks appended to the same tables.
+        """
+        stop = len(n.timesteps) if stop is None else stop
+        solution = solution_of(n)
+        timesteps = np.array(timestep_labels(n.timesteps[start:stop]))
+        n_timesteps = len(timesteps)
+
+        def component_columns(components, names, types, type_column):
+            return {
+                'timestep': np.tile(timesteps, len(components)),
+                'bus': np.repeat([c.bus.name for c in components], n_timesteps),
+                names: np.repeat([c.name for c in components], n_timesteps),
+                type_column: np.repeat(types, n_timesteps),
             }
-        )
-        end_bus_flow['flow_type'] = 'transmission_line'
-        end_bus_flow['item_name'] =  transmission_line_name
-        end_bus_flow['subtype'] = 'transmission_line'
-        end_bus_flow['bus'] = end_bus
-        end_bus_flow['net_flow'] = end_bus_flow['flow_in_amount'] - end_bus_flow['flow_out_amount']
-
-        nodal_flows.append(end_bus_flow)
-
-    if nodal_flows:
-        nodal_flows_df = pd.concat(nodal_flows, axis=0)
-        with duckdb.connect(output_path) as conn:
-            # Nodal flows
-            conn.sql("DROP TABLE IF EXISTS nodal_flows")
-            conn.sql("CREATE TABLE nodal_flows AS SELECT * FROM nodal_flows_df")
- 
-
 
+        ## Write Nodal prices
+        prices = {
+            f"price_{bus_name.replace(' ', '-')}": solution.nodal_prices[i, start:stop]
+            for i, bus_name in enumerate(n.buses)
+        }
+        self.write('nodal_prices', {**prices, 'timestep': timesteps, **label_columns(labels, n_timesteps)})
+
+        # Write generator outputs
+        # Input series are read straight from the network's columnar tables, one array per attribute
+        generator_table = n.generator_table
+        generators = generator_table.components
+        if generators:
+            outputs = var_values(solution, generators, 'outputs', start, stop)
+            self.write('generator_outputs', {
+                'output': outputs.ravel(),
+                'capacity': generator_table.column('capacities')[:, start:stop].ravel(),
+                'costs': generator_table.column('costs')[:, start:stop].ravel(),
+                **component_columns(generators, 'generator', type_names(generators, 'generator_type'), 'generator_type'),
+                **label_columns(labels, outputs.size),
+            })
+
+        # Write storage unit inputs outputs and SOC
+        storage_table = n.storage_table
+        storage_units = storage_table.components
+        if storage_units:
+            charge_inflows = var_values(solution, storage_units, 'charge_inflows', start, stop)
+            discharge_outflows = var_values(solution, storage_units, 'discharge_outflows', start, stop)
+            self.write('storage_unit_outputs', {
+                'charge_inflow': charge_inflows.ravel(),
+                'discharge_outflow': discharge_outflows.ravel(),
+                'soc_start_of_ts': var_values(solution, storage_units, 'socs_start_of_ts', start, stop).ravel(),
+                'soc_end_of_ts': var_values(solution, storage_units, 'socs_end_of_ts', start, stop).ravel(),
+                'consumptions': storage_table.column('consumptions')[:, start:stop].ravel(),
+                'max_charge_capacity': storage_table.column('max_charge_capacities')[:, start:stop].ravel(),
+                'max_discharge_capacity': storage_table.column('max_discharge_capacities')[:, start:stop].ravel(),
+                'min_soc_requirements': storage_table.column('min_soc_requirements_start_of_ts')[:, start:stop].ravel(),
+                **component_columns(storage_units, 'storage_unit', type_names(storage_units, 'storage_type'), 'storage_type'),
+                'max_soc_capacity': np.repeat([su.max_soc_capacity for su in storage_units], n_timesteps),
+                **label_columns(labels, charge_inflows.size),
+            })
+
+        # Nodal flows by bus, one append per kind of component
+        def write_flows(flow_in_amount, flow_out_amount, flow_type, item_names, subtypes, buses):
+            self.write('nodal_flows', {
+                'flow_in_amount': flow_in_amount.ravel(),
+                'flow_out_amount': flow_out_amount.ravel(),
+                'flow_type': pa.array([flow_type] * flow_in_amount.size, type=pa.string()),
+                'item_name': np.repeat(item_names, n_timesteps),
+                'subtype': pa.array(np.repeat(np.array(subtypes, dtype=object), n_timesteps), type=pa.string()),
+                'bus': np.repeat(buses, n_timesteps),
+                'timestep': np.tile(timesteps, len(item_names)),
+                'net_flow': (flow_in_amount - flow_out_amount).ravel(),
+                **label_columns(labels, flow_in_amount.size),
+            })
+
+        if generators:
+            write_flows(
+                np.maximum(outputs, 0), np.maximum(-outputs, 0), 'generator',
+                [g.name for g in generators], type_names(generators, 'generator_type'), [g.bus.name for g in generators],
+            )
 
+        if storage_units:
+            write_flows(
+                discharge_outflows, charge_inflows, 'storage_unit',
+                [su.name for su in storage_units], type_names(storage_units, 'storage_type'), [su.bus.name for su in storage_units],
+            )
 
-    
+        loads = n.load_table.components
+        if loads:
+            consumptions = n.load_table.column('consumptions')[:, start:stop]
+            write_flows(
+                np.maximum(-consumptions, 0), np.maximum(consumptions, 0), 'load',
+                [l.name for l in loads], [None] * len(loads), [l.bus.name for l in loads],
+            )
 
+        # The tranmission line flow is recorded twice in the table, once for the start bus and once for the end bus
+        lines = n.line_table.components
+        if lines:
+            flows = var_values(solution, lines, 'flows', start, stop)
+            line_names = [t.name for t in lines]
+            write_flows(
+                np.maximum(-flows, 0), np.maximum(flows, 0), 'transmission_line',
+                line_names, ['transmission_line'] * len(lines), [t.start_bus.name for t in lines],
+            )
+            write_flows(
+                np.maximum(flows, 0), np.maximum(-flows, 0), 'transmission_line',
+                line_names, ['transmission_line'] * len(lines), [t.end_bus.name for t in lines],
+            )
 
 
-        
-def save_network(n, json_output_path, duckdb_output_path):
+    def write_summary(self, table_name: str, columns: dict, labels: dict):
+        # Rows sorted on the table's index columns, so DuckDB's zone maps skip most of the table too
+        order = np.lexsort([np.asarray(columns[key]) for key in reversed(SUMMARY_INDEXES[table_name])])
+        columns = {key: np.asarray(values)[order] for key, values in columns.items()}
+        self.write(table_name, {**columns, **label_columns(labels, len(order))})
+
+    def write_summaries(self, n, timestamps=None, **labels):
+        """
+        Write small pre-aggregated tables next to the raw ones, each sorted and indexed on its SUMMARY_INDEXES:
+
+            energy_daily / energy_monthly   generator energy by bus, generator type and day / month
+            price_duration_curves           every bus's prices sorted from highest, with the share of time at or above each
+            line_utilisation                mean and max |flow| / capacity, congested timesteps and energy moved per line
+            storage_cycles                  energy charged and discharged and equivalent full cycles per storage unit
+
+        Days and months come from timestamps (one datetime per timestep) or, failing that, from timestep
+        labels that are dates; without either the energy tables are skipped. Energies are sums of
+        per-timestep values, the same MWh-per-timestep reading the rest of the model uses.
+        """
+        solution = solution_of(n)
+        T = len(n.timesteps)
+        times = timestep_times(n.timesteps, timestamps)
+
+        generators = n.generator_table.components
+        if times is None:
+            print("Timesteps are not dates, skipping the daily and monthly energy tables")
+        elif generators:
+            groups, group_of = np.unique(
+                np.array([(g.bus.name, t) for g, t in zip(generators, type_names(generators, 'generator_type'))]),
+                axis=0, return_inverse=True,
+            )
+            energy = sum_by(solution.result('outputs'), group_of.ravel(), len(groups))
+            for table_name, period_column, unit in (('energy_daily', 'day', 'D'), ('energy_monthly', 'month', 'M')):
+                periods, period_of = np.unique(times.astype(f'datetime64[{unit}]'), return_inverse=True)
+                period_energy = sum_by(energy.T, period_of, len(periods)).T
+                self.write_summary(table_name, {
+                    'bus': np.repeat(groups[:, 0], len(periods)),
+                    period_column: np.tile(periods.astype('datetime64[D]'), len(groups)),
+                    'generator_type': np.repeat(groups[:, 1], len(periods)),
+                    'energy': period_energy.ravel(),
+                }, labels)
+
+        buses = list(n.buses)
+        if buses and T:
+            # NaN (unsolved) prices sort last
+            prices = -np.sort(-solution.nodal_prices, axis=1)
+            rank = np.arange(1, T + 1)
+            self.write_summary('price_duration_curves', {
+                'bus': np.repeat(buses, T),
+                'rank': np.tile(rank, len(buses)),
+                'duration': np.tile(rank / T, len(buses)),
+                'price': prices.ravel(),
+            }, labels)
+
+        lines = n.line_table.components
+        if lines:
+            flows = np.abs(solution.result('flows'))
+            capacities = n.line_table.column('capacities')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                utilisation = np.where(capacities > 0, flows / capacities, np.nan)
+            self.write_summary('line_utilisation', {
+                'start_bus': [t.start_bus.name for t in lines],
+                'end_bus': [t.end_bus.name for t in lines],
+                'transmission_line': [t.name for t in lines],
+                'mean_utilisation': np.nanmean(utilisation, axis=1) if T else np.full(len(lines), np.nan),
+                'max_utilisation': np.nanmax(utilisation, axis=1, initial=0.0),
+                # A 0 MW line carries nothing, it is not congested
+                'congested_timesteps': ((capacities > 0) & (flows >= capacities - 1e-6)).sum(axis=1),
+                'energy_transferred': flows.sum(axis=1),
+            }, labels)
+
+        storage_units = n.storage_table.components
+        if storage_units:
+            charge_efficiency = np.array([su.charge_efficiency for su in storage_units], dtype=float)
+            max_soc = np.array([su.max_soc_capacity for su in storage_units], dtype=float)
+            charged = solution.result('charge_inflows').sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Energy stored after charging losses, in multiples of the capacity
+                cycles = np.where(max_soc > 0, charged * charge_efficiency / max_soc, np.nan)
+            self.write_summary('storage_cycles', {
+                'bus': [su.bus.name for su in storage_units],
+                'storage_unit': [su.name for su in storage_units],
+                'storage_type': type_names(storage_units, 'storage_type'),
+                'energy_charged': charged,
+                'energy_discharged': solution.result('discharge_outflows').sum(axis=1),
+                'equivalent_full_cycles': cycles,
+            }, labels)
+
+        for table_name, columns in SUMMARY_INDEXES.items():
+            if table_name in self.written:
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{table_name}_index" ON "{table_name}" ({", ".join(columns)})')
+
+
+def save_network_duckdb(n, output_path, append: bool = False, summaries: bool = False, timestamps=None):
+    # summaries=True also writes the pre-aggregated tables of DuckDBWriter.write_summaries
+    with DuckDBWriter(output_path, append) as writer:
+        writer.write_network(n)
+        if summaries:
+            writer.write_summaries(n, timestamps)
+
+
+# Tables written by save_network_parquet, one file each
+PARQUET_TABLES = ['generators', 'loads', 'storage_units', 'transmission_lines', 'nodal_prices']
+
+def dictionary_column(values, n_timesteps):
+    # One dictionary entry per distinct value, repeated over each component's timesteps
+    dictionary, indices = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return pa.DictionaryArray.from_arrays(pa.array(np.repeat(indices, n_timesteps).astype(np.int32)), pa.array(dictionary))
+
+def save_network_parquet(n, output_dir, row_group_components: int = 64, row_group_timesteps: int = 168):
+    """
+    Write the network as one long Parquet file per component type plus a small network.json.
+
+    Names are dictionary encoded, and every column is dictionary encoded with run-length encoded
+    indices, so constant or repeated series (flat capacities and costs) shrink to a few bytes. Each row
+    group holds row_group_timesteps consecutive timesteps of up to row_group_components components, in
+    component name order, so every row group covers one timestep range and one name range and read.py
+    only decodes the row groups a component or time range falls in.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    solution = solution_of(n)
+    T = len(n.timesteps)
+    timestep_index = np.arange(T, dtype=np.int32)
+    row_group_components, row_group_timesteps = max(1, row_group_components), max(1, row_group_timesteps)
+
+    def write(table_name, components, labels, series):
+        # labels are per component name lists, series (component, timestep) arrays
+        table = pa.table({
+            'component': dictionary_column([c.name for c in components], T),
+            **{key: dictionary_column(values, T) for key, values in labels.items()},
+            'timestep_index': np.tile(timestep_index, len(components)),
+            **{key: values.ravel() for key, values in series.items()},
+        })
+        by_name = np.argsort(np.array([c.name for c in components], dtype=str), kind='stable')
+        with pq.ParquetWriter(
+            os.path.join(output_dir, f"{table_name}.parquet"), table.schema, compression='zstd', use_dictionary=True,
+        ) as writer:
+            for first_timestep in range(0, T, row_group_timesteps):
+                timesteps = timestep_index[first_timestep:first_timestep + row_group_timesteps]
+                for first in range(0, len(components), row_group_components):
+                    rows = (by_name[first:first + row_group_components, None] * T + timesteps).ravel()
+                    writer.write_table(table.take(rows), row_group_size=len(rows))
+
+    generators = n.generator_table.components
+    write('generators', generators, {
+        'bus': [g.bus.name for g in generators],
+        'generator_type': type_names(generators, 'generator_type'),
+    }, {
+        'capacity': n.generator_table.column('capacities'),
+        'cost': n.generator_table.column('costs'),
+        'output': var_values(solution, generators, 'outputs', 0, T),
+    })
+
+    loads = n.load_table.components
+    write('loads', loads, {'bus': [l.bus.name for l in loads]}, {
+        'consumption': n.load_table.column('consumptions'),
+    })
+
+    storage_units = n.storage_table.components
+    write('storage_units', storage_units, {
+        'bus': [su.bus.name for su in storage_units],
+        'storage_type': type_names(storage_units, 'storage_type'),
+    }, {
+        'max_charge_capacity': n.storage_table.column('max_charge_capacities'),
+        'max_discharge_capacity': n.storage_table.column('max_discharge_capacities'),
+        'min_soc_requirement': n.storage_table.column('min_soc_requirements_start_of_ts'),
+        'consumption': n.storage_table.column('consumptions'),
+        'charge_inflow': var_values(solution, storage_units, 'charge_inflows', 0, T),
+        'discharge_outflow': var_values(solution, storage_units, 'discharge_outflows', 0, T),
+        'soc_start_of_ts': var_values(solution, storage_units, 'socs_start_of_ts', 0, T),
+        'soc_end_of_ts': var_values(solution, storage_units, 'socs_end_of_ts', 0, T),
+    })
+
+    lines = n.line_table.components
+    write('transmission_lines', lines, {
+        'start_bus': [t.start_bus.name for t in lines],
+        'end_bus': [t.end_bus.name for t in lines],
+    }, {
+        'capacity': n.line_table.column('capacities'),
+        'flow': var_values(solution, lines, 'flows', 0, T),
+    })
+
+    buses = list(n.buses.values())
+    write('nodal_prices', buses, {}, {
+        'price': solution.nodal_prices,
+    })
+
+    # Everything that is not a time series is small enough for plain JSON
+    with open(os.path.join(output_dir, 'network.json'), 'w') as f:
+        json.dump({
+            'name': n.name,
+            'timesteps': timestep_labels(n.timesteps) if T else [],
+            'buses': [bus.name for bus in buses],
+            'max_soc_capacities': {su.name: su.max_soc_capacity for su in storage_units},
+        }, f, indent=4)
+
+def save_network(n, json_output_path, duckdb_output_path, parquet_output_dir=None):
     save_network_json(n, json_output_path)
     save_network_duckdb(n, duckdb_output_path)
+    if parquet_output_dir is not None:
+        save_network_parquet(n, parquet_output_dir)
 
 
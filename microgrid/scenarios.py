@@ -0,0 +1,185 @@
+from concurrent.futures import ProcessPoolExecutor
+import highspy
+import numpy as np
+from microgrid.engine import Network, TimestepLengthMismatch
+from microgrid.matrix import NetworkProgram, HIGHS_STATUS
+
+# Which table each scenario input is drawn from, used to resolve overrides given by component name
+INPUT_TABLES = {
+    'generator_capacities': 'generators',
+    'generator_costs': 'generators',
+    'load_consumptions': 'loads',
+    'storage_max_charge_capacities': 'storage_units',
+    'storage_max_discharge_capacities': 'storage_units',
+    'storage_min_soc_requirements': 'storage_units',
+    'storage_consumptions': 'storage_units',
+    'line_capacities': 'transmission_lines',
+}
+
+# Each worker process holds one ScenarioModel with the shared constraint structure
+_worker_model = None
+
+
+def _scenario_changes(base, vectors):
+    # Indices and values where one scenario's cost, column bound and row bound vectors differ from the base
+    col_cost, col_lower, col_upper, row_lower, row_upper = vectors
+    base_cost, base_lower, base_upper, base_row_lower, base_row_upper = base
+    cost = np.flatnonzero(col_cost != base_cost)
+    cols = np.flatnonzero((col_lower != base_lower) | (col_upper != base_upper))
+    rows = np.flatnonzero((row_lower != base_row_lower) | (row_upper != base_row_upper))
+    return (cost, col_cost[cost]), (cols, col_lower[cols], col_upper[cols]), (rows, row_lower[rows], row_upper[rows])
+
+
+def _with_reset(index, previous, base, values):
+    # index plus the previous scenario's indices, which go back to their base values
+    merged = np.union1d(index, previous).astype(np.int32)
+    position = np.searchsorted(merged, index)
+    arrays = []
+    for base_values, scenario_values in zip(base, values):
+        array = base_values[merged]
+        array[position] = scenario_values
+        arrays.append(array)
+    return merged, arrays
+
+
+class ScenarioModel:
+    """
+    One HiGHS model of the base scenario. Each scenario only pushes the entries of the vectors its
+    overrides change, and puts back the ones the scenario solved before it changed. The matrix is
+    never touched, so every solve warm starts from the basis of the last one.
+    """
+    def __init__(self, linear_program, base_vectors):
+        self.h = highspy.Highs()
+        self.h.setOptionValue("output_flag", False)
+        self.h.passModel(linear_program.to_highs())
+        self.base = base_vectors
+        self.changed = (np.empty(0, dtype=int),) * 3
+
+    def solve(self, changes):
+        (cost, cost_values), (cols, col_lower, col_upper), (rows, row_lower, row_upper) = changes
+        previous_cost, previous_cols, previous_rows = self.changed
+        base_cost, base_lower, base_upper, base_row_lower, base_row_upper = self.base
+        h = self.h
+
+        index, (values,) = _with_reset(cost, previous_cost, (base_cost,), (cost_values,))
+        if len(index):
+            h.changeColsCost(len(index), index, values)
+        index, (lower, upper) = _with_reset(cols, previous_cols, (base_lower, base_upper), (col_lower, col_upper))
+        if len(index):
+            h.changeColsBounds(len(index), index, lower, upper)
+        index, (lower, upper) = _with_reset(rows, previous_rows, (base_row_lower, base_row_upper), (row_lower, row_upper))
+        if len(index):
+            h.changeRowsBounds(len(index), index, lower, upper)
+        self.changed = (cost, cols, rows)
+
+        h.run()
+        status = HIGHS_STATUS.get(h.getModelStatus(), "Undefined")
+        if status != "Optimal":
+            return status, None, None, None
+        solution = h.getSolution()
+        return status, h.getInfo().objective_function_value, np.asarray(solution.col_value), np.asarray(solution.row_dual)
+
+
+def _init_worker(linear_program, base_vectors):
+    # HighsLp does not pickle, so the structure is shipped to each worker once as plain arrays
+    global _worker_model
+    _worker_model = ScenarioModel(linear_program, base_vectors)
+
+
+def _solve_scenario(changes):
+    return _worker_model.solve(changes)
+
+
+class ScenarioResults:
+    """Results for every scenario stacked along the first axis, e.g. generator_outputs[scenario, generator, timestep]."""
+    def __init__(self, names, program):
+        S, T = len(names), program.n_timesteps
+        self.names = list(names)
+        self.scenario_index = {name: i for i, name in enumerate(self.names)}
+        self.generators = [g.name for g in program.generators]
+        self.storage_units = [su.name for su in program.storage_units]
+        self.transmission_lines = [t.name for t in program.lines]
+        self.buses = [b.name for b in program.buses]
+        self.status = [None] * S
+        self.objective = np.full(S, np.nan)
+        self.generator_outputs = np.full((S, len(self.generators), T), np.nan)
+        self.charge_inflows = np.full((S, len(self.storage_units), T), np.nan)
+        self.discharge_outflows = np.full((S, len(self.storage_units), T), np.nan)
+        self.socs_start_of_ts = np.full((S, len(self.storage_units), T), np.nan)
+        self.socs_end_of_ts = np.full((S, len(self.storage_units), T), np.nan)
+        self.flows = np.full((S, len(self.transmission_lines), T), np.nan)
+        self.nodal_prices = np.full((S, len(self.buses), T), np.nan)
+
+    def record(self, i, program, status, objective, col_value, row_dual):
+        self.status[i] = status
+        if status != "Optimal":
+            return
+        self.objective[i] = objective
+        self.generator_outputs[i] = col_value[program.generator_outputs]
+        self.charge_inflows[i] = col_value[program.charge_inflows]
+        self.discharge_outflows[i] = col_value[program.discharge_outflows]
+        self.socs_start_of_ts[i] = col_value[program.socs_start_of_ts]
+        self.socs_end_of_ts[i] = col_value[program.socs_end_of_ts]
+        self.flows[i] = col_value[program.flows]
+        self.nodal_prices[i] = row_dual[program.energy_balance]
+
+
+class ScenarioSet:
+    """
+    Many variants of one network that share its topology. The constraint structure is compiled once
+    from the base network; each scenario only replaces input series (see INPUT_TABLES), given either as
+    {component name: series} or as a full (component, timestep) array in table order.
+    """
+    def __init__(self, network: Network):
+        network.check_timesteps()
+        self.network = network
+        self.program = NetworkProgram(network).build()
+        # Copies, so later edits to the network do not change the scenarios' baseline
+        self.base_inputs = {key: values.copy() for key, values in self.program.inputs().items()}
+        self.base_vectors = self.program.vectors(self.base_inputs)
+        self.scenarios = {}
+
+    def add(self, name: str, **overrides):
+        inputs = dict(self.base_inputs)
+        for key, values in overrides.items():
+            if key not in INPUT_TABLES:
+                raise ValueError(f"Unknown scenario input {key}")
+            base = self.base_inputs[key]
+            if isinstance(values, dict):
+                table = self.network.tables()[INPUT_TABLES[key]]
+                component_index = {c.name: i for i, c in enumerate(table.components)}
+                replaced = base.copy()
+                for component_name, series in values.items():
+                    series = np.asarray(series, dtype=float)
+                    if series.shape != (base.shape[1],):
+                        raise TimestepLengthMismatch(f"Scenario {key} timesteps do not match network timesteps for {component_name}")
+                    replaced[component_index[component_name]] = series
+            else:
+                replaced = np.asarray(values, dtype=float)
+                if replaced.shape != base.shape:
+                    raise TimestepLengthMismatch(f"Scenario {key} has shape {replaced.shape}, expected {base.shape}")
+            inputs[key] = replaced
+        self.scenarios[name] = inputs
+
+    def solve(self, max_workers: int = None) -> ScenarioResults:
+        names = list(self.scenarios)
+        changes = (_scenario_changes(self.base_vectors, self.program.vectors(self.scenarios[name])) for name in names)
+        results = ScenarioResults(names, self.program)
+        print(f"Solving {len(names)} scenarios")
+
+        if max_workers == 1:
+            # Solved in this process on a model local to the call, not the worker global
+            model = ScenarioModel(self.program.lp, self.base_vectors)
+            solutions = (model.solve(c) for c in changes)
+        else:
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                           initargs=(self.program.lp, self.base_vectors))
+            solutions = executor.map(_solve_scenario, changes)
+
+        try:
+            for i, solution in enumerate(solutions):
+                results.record(i, self.program, *solution)
+        finally:
+            if max_workers != 1:
+                executor.shutdown()
+        return results
@@ -0,0 +1,75 @@
+import highspy
+import numpy as np
+from microgrid.matrix import NetworkProgram, HIGHS_STATUS
+
+
+def _finite(values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return np.where(np.abs(values) >= highspy.kHighsInf, np.copysign(np.inf, values), values)
+
+
+class PriceSensitivity:
+    """
+    How the optimum responds to demand at each bus, from one solve. Arrays are indexed [bus, timestep]
+    over timesteps [start, stop).
+
+    nodal_prices is the change in objective per MWh of extra demand. The optimal basis, and with it every
+    nodal price and the dispatch pattern, stays the same while one bus's demand moves within
+    [demand_lower, demand_upper]; over that range the objective changes linearly, reaching
+    objective_lower and objective_upper at the ends. Outside it the prices jump and a re-solve is needed.
+    """
+    def __init__(self, program: NetworkProgram, objective: float, row_dual, ranging):
+        rows = program.energy_balance
+        self.buses = [bus.name for bus in program.buses]
+        self.bus_index = {name: i for i, name in enumerate(self.buses)}
+        self.timesteps = program.network.timesteps[program.start:program.stop]
+        self.objective = objective
+        self.nodal_prices = np.asarray(row_dual)[rows]
+        self.demand = np.concatenate(program.lp.row_lower)[rows]
+        self.demand_lower = _finite(ranging.row_bound_dn.value_)[rows]
+        self.demand_upper = _finite(ranging.row_bound_up.value_)[rows]
+        self.objective_lower = _finite(ranging.row_bound_dn.objective_)[rows]
+        self.objective_upper = _finite(ranging.row_bound_up.objective_)[rows]
+
+    def objective_change(self, extra_demand: np.ndarray) -> np.ndarray:
+        """
+        Objective change for extra demand at each (bus, timestep) on its own, NaN where that would leave
+        the range the nodal price is valid over.
+        """
+        extra_demand = np.broadcast_to(np.asarray(extra_demand, dtype=float), self.nodal_prices.shape)
+        demand = self.demand + extra_demand
+        valid = (demand >= self.demand_lower - 1e-9) & (demand <= self.demand_upper + 1e-9)
+        return np.where(valid, self.nodal_prices * extra_demand, np.nan)
+
+    def to_dict(self, bus: str) -> dict:
+        i = self.bus_index[bus]
+        return {
+            'timestep': list(self.timesteps),
+            'nodal_price': self.nodal_prices[i].tolist(),
+            'demand': self.demand[i].tolist(),
+            'demand_lower': self.demand_lower[i].tolist(),
+            'demand_upper': self.demand_upper[i].tolist(),
+            'objective_lower': self.objective_lower[i].tolist(),
+            'objective_upper': self.objective_upper[i].tolist(),
+        }
+
+
+def price_sensitivity(network, start: int = 0, stop: int = None, initial_socs: np.ndarray = None) -> PriceSensitivity:
+    """
+    Solve timesteps [start, stop) of network with HiGHS and range every energy balance right hand side
+    on the optimal basis, instead of re-solving once per perturbed bus and timestep. The network's own
+    results are not changed.
+    """
+    network.check_timesteps()
+    program = NetworkProgram(network, start, stop, initial_socs).build()
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.passModel(program.lp.to_highs())
+    h.run()
+    status = HIGHS_STATUS.get(h.getModelStatus(), "Undefined")
+    if status != "Optimal":
+        raise ValueError(f"Nodal price sensitivity needs an optimal solve, HiGHS returned {status}")
+    ranging_status, ranging = h.getRanging()
+    if ranging_status != highspy.HighsStatus.kOk:
+        raise ValueError("HiGHS could not range the solution")
+    return PriceSensitivity(program, h.getInfo().objective_function_value, h.getSolution().row_dual, ranging)
@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+import json
+import logging
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _peak_rss_kb():
+    # Peak RSS of the process since it started, None where it can not be read (no resource module on Windows)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def json_records(target):
+    """
+    A stats hook writing every record as one JSON line to target: a file path (appended to, so batch
+    workers can share one file), an open text stream, a logging.Logger or a logging.Handler.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        def hook(record):
+            with open(target, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+    elif isinstance(target, logging.Logger):
+        def hook(record):
+            target.info(json.dumps(record))
+    elif isinstance(target, logging.Handler):
+        def hook(record):
+            target.handle(logging.makeLogRecord({
+                'name': 'microgrid.stats', 'levelno': logging.INFO, 'levelname': 'INFO', 'msg': json.dumps(record),
+            }))
+    elif hasattr(target, 'write'):
+        def hook(record):
+            target.write(json.dumps(record) + '\n')
+            target.flush()
+    else:
+        raise ValueError(f"Can not write solve stats to {target!r}")
+    return hook
+
+
+class SolveStats:
+    """
+    Wall time and peak RSS growth of each phase of one solve, and the model size by component type, with
+    what model reduction left out of it in removed.
+
+    Phases are timed with the phase() context manager. Time spent in a nested phase is only counted
+    against the inner phase, and a phase entered more than once (e.g. one per rolling window) accumulates.
+    The process peak RSS can only be read, not reset, so a phase reports how far it raised that peak
+    (0 when it stayed below an earlier peak, nested phases included), or None where it can not be read.
+    hook is called with a dict for every finished phase and once for the whole solve; anything that is
+    not callable is treated as a json_records target.
+    """
+    def __init__(self, network_name: str, method: str, hook=None):
+        self.network_name = network_name
+        self.method = method
+        self.status = None
+        self.phases = {}
+        self.model_size = {}
+        # What model reduction left out of the model, by component type
+        self.removed = {}
+        self.hook = hook if hook is None or callable(hook) else json_records(hook)
+        self._stack = []
+        self._started = time.perf_counter()
+        self.wall_seconds = None
+        self.peak_rss_kb = None
+
+    @contextmanager
+    def phase(self, name: str):
+        frame = {'nested_seconds': 0.0}
+        self._stack.append(frame)
+        peak_before = _peak_rss_kb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak_after = _peak_rss_kb()
+            growth_mb = None if peak_before is None else (peak_after - peak_before) / 1024
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]['nested_seconds'] += elapsed
+
+            phase = self.phases.setdefault(name, {'seconds': 0.0, 'peak_rss_growth_mb': 0.0, 'calls': 0})
+            phase['seconds'] += elapsed - frame['nested_seconds']
+            if growth_mb is None or phase['peak_rss_growth_mb'] is None:
+                phase['peak_rss_growth_mb'] = None
+            else:
+                phase['peak_rss_growth_mb'] += growth_mb
+            phase['calls'] += 1
+            self.emit({
+                'event': 'phase', 'network': self.network_name, 'method': self.method, 'phase': name,
+                'seconds': elapsed - frame['nested_seconds'], 'peak_rss_growth_mb': growth_mb,
+            })
+
+    @staticmethod
+    def _add(sizes: dict, component_type: str, variables: int, constraints: int, nonzeros: int):
+        size = sizes.setdefault(component_type, {'variables': 0, 'constraints': 0, 'nonzeros': 0})
+        size['variables'] += int(variables)
+        size['constraints'] += int(constraints)
+        size['nonzeros'] += int(nonzeros)
+
+    def add_model_size(self, component_type: str, variables: int = 0, constraints: int = 0, nonzeros: int = 0):
+        self._add(self.model_size, component_type, variables, constraints, nonzeros)
+
+    def add_removed(self, component_type: str, variables: int = 0, constraints: int = 0, nonzeros: int = 0):
+        self._add(self.removed, component_type, variables, constraints, nonzeros)
+
+    @staticmethod
+    def _totals(sizes: dict) -> dict:
+        return {key: sum(size[key] for size in sizes.values()) for key in ('variables', 'constraints', 'nonzeros')}
+
+    def totals(self) -> dict:
+        return self._totals(self.model_size)
+
+    def removed_totals(self) -> dict:
+        return self._totals(self.removed)
+
+    def finish(self, status: str):
+        self.status = status
+        self.wall_seconds = time.perf_counter() - self._started
+        # The process peak when the solve finished, which may have been reached before it started
+        self.peak_rss_kb = _peak_rss_kb()
+        self.emit(dict(event='solve', **self.to_dict()))
+        return self
+
+    def emit(self, record: dict):
+        if self.hook is not None:
+            self.hook(record)
+
+    def to_dict(self) -> dict:
+        return {
+            'network': self.network_name,
+            'method': self.method,
+            'status': self.status,
+            'wall_seconds': self.wall_seconds,
+            'peak_rss_mb': None if self.peak_rss_kb is None else self.peak_rss_kb / 1024,
+            'phases': {name: dict(phase) for name, phase in self.phases.items()},
+            'model_size': {name: dict(size) for name, size in self.model_size.items()},
+            'totals': self.totals(),
+            'removed': {name: dict(size) for name, size in self.removed.items()},
+        }
+
+    def __repr__(self):
+        phases = ", ".join(f"{name} {phase['seconds']:.3f}s" for name, phase in self.phases.items())
+        totals = self.totals()
+        return (f"SolveStats({self.method}, {self.status}, {phases}; {totals['variables']} variables, "
+                f"{totals['constraints']} constraints, {totals['nonzeros']} nonzeros)")
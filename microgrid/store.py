@@ -0,0 +1,183 @@
+from collections.abc import Sequence
+import os
+import numpy as np
+import pyarrow as pa
+
+
+class MappedSeries:
+    """
+    A time series read from a file instead of passed in memory: a 1-D or (row, timestep) 2-D .npy file,
+    or a column of an Arrow IPC (.arrow / .feather) file. offset is the position of the first timestep,
+    so many components and windows can share one file. The file is memory-mapped and only the series'
+    own slice is read. It is copied into the component's table: the table's own file with
+    Network(series_dir=...), memory without one.
+    """
+    def __init__(self, path: str, offset: int = 0, row: int = None, column: str = None):
+        self.path = path
+        self.offset = offset
+        self.row = row
+        self.column = column
+
+    def load(self, n_timesteps: int) -> np.ndarray:
+        if self.column is not None:
+            table = pa.ipc.open_file(pa.memory_map(self.path)).read_all()
+            values = table.column(self.column)
+            if values.num_chunks == 1 and values.null_count == 0:
+                # Zero copy view of the mapped file
+                values = values.chunk(0).to_numpy(zero_copy_only=True)
+            else:
+                values = values.to_numpy()
+        else:
+            values = np.load(self.path, mmap_mode='r')
+            if self.row is not None:
+                values = values[self.row]
+        return values[self.offset:self.offset + n_timesteps]
+
+    def __repr__(self):
+        return f"MappedSeries({self.path!r}, offset={self.offset}, row={self.row}, column={self.column!r})"
+
+
+class ComponentTable:
+    """
+    Columnar storage for one component type. Each time series attribute is a single
+    (component, timestep) float array owned by the network; components only hold their row index.
+    Solved decision variables are kept the same way in results, NaN until a solve fills them in.
+
+    With a directory the arrays are memory-mapped files in it rather than held in memory, so the
+    operating system pages in only the parts being read.
+
+    dirty holds, per attribute, the rows whose series were reassigned since a persistent model last
+    read them (see microgrid.matrix.PersistentProgram).
+    """
+    def __init__(self, attributes: list, n_timesteps: int, results: list = (), directory: str = None):
+        self.attributes = list(attributes)
+        self.result_attributes = list(results)
+        self.n_timesteps = n_timesteps
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.components = []
+        self.dirty = {a: set() for a in self.attributes}
+        self.arrays = {a: self.allocate(f"input_{a}", None, 0) for a in self.attributes}
+        self.results = {a: self.allocate(f"result_{a}", None, 0) for a in self.result_attributes}
+
+    def __len__(self):
+        return len(self.components)
+
+    def allocate(self, name: str, array, capacity: int) -> np.ndarray:
+        """array grown to capacity rows, new rows NaN."""
+        rows = 0 if array is None else len(array)
+        if self.directory is None or capacity * self.n_timesteps == 0:
+            grown = np.full((capacity, self.n_timesteps), np.nan)
+            if rows:
+                grown[:rows] = array
+            return grown
+        # Rows are contiguous in the file, so growing only extends it
+        path = os.path.join(self.directory, f"{name}.f8")
+        if isinstance(array, np.memmap):
+            array.flush()
+        with open(path, 'r+b' if rows else 'w+b') as f:
+            f.truncate(capacity * self.n_timesteps * 8)
+        grown = np.memmap(path, dtype=float, mode='r+', shape=(capacity, self.n_timesteps))
+        grown[rows:] = np.nan
+        return grown
+
+    def copy_on_write(self):
+        """
+        Remap memory-mapped arrays copy-on-write and stop growing into the directory, so this process
+        (a forked solve worker) reads the shared files but its writes stay private.
+        """
+        for arrays in (self.arrays, self.results):
+            for attribute, array in arrays.items():
+                if isinstance(array, np.memmap):
+                    arrays[attribute] = np.memmap(array.filename, dtype=array.dtype, mode='c', shape=array.shape)
+        self.directory = None
+
+    def add(self, component, **series) -> int:
+        index = len(self.components)
+        if index == len(self.arrays[self.attributes[0]]):
+            # Grow geometrically so adding components is amortised O(1)
+            capacity = max(16, 2 * index)
+            for prefix, arrays in (("input", self.arrays), ("result", self.results)):
+                for attribute, array in arrays.items():
+                    arrays[attribute] = self.allocate(f"{prefix}_{attribute}", array[:index], capacity)
+        for attribute in self.attributes:
+            self.arrays[attribute][index] = series[attribute]
+        self.components.append(component)
+        return index
+
+    def column(self, attribute: str) -> np.ndarray:
+        """The (component, timestep) array for one attribute, as a view."""
+        return self.arrays[attribute][:len(self.components)]
+
+    def result(self, attribute: str) -> np.ndarray:
+        """The (component, timestep) solved values of one decision variable, as a view."""
+        return self.results[attribute][:len(self.components)]
+
+    def mark_dirty(self, attribute: str, index: int):
+        self.dirty[attribute].add(index)
+
+    def take_dirty(self, attribute: str) -> np.ndarray:
+        """Sorted dirty rows for an attribute, clearing them."""
+        rows = np.array(sorted(self.dirty[attribute]), dtype=int)
+        self.dirty[attribute].clear()
+        return rows
+
+
+class ResultValue(float):
+    """
+    One timestep of a component's solved values, taken when it is read. A float (NaN where nothing was
+    solved) that also reads like an LpVariable through varValue, so it compares, hashes and subtracts
+    as its value.
+    """
+    __slots__ = ('attribute', 'timestep')
+
+    def __new__(cls, value: float, attribute: str, timestep: int):
+        self = super().__new__(cls, value)
+        object.__setattr__(self, 'attribute', attribute)
+        object.__setattr__(self, 'timestep', timestep)
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def varValue(self):
+        return None if np.isnan(self) else float(self)
+
+    def value(self):
+        return self.varValue
+
+    def __repr__(self):
+        return f"{self.attribute}[{self.timestep}]={self.varValue}"
+
+
+class ResultSeries(Sequence):
+    """A component's solved values for one decision variable, indexed by timestep (see ResultValue)."""
+    __slots__ = ('table', 'attribute', 'index')
+
+    def __init__(self, table: ComponentTable, attribute: str, index: int):
+        self.table = table
+        self.attribute = attribute
+        self.index = index
+
+    def __len__(self):
+        return self.table.n_timesteps
+
+    def __getitem__(self, timestep):
+        if isinstance(timestep, slice):
+            return [self[i] for i in range(*timestep.indices(len(self)))]
+        if timestep < 0:
+            timestep += len(self)
+        if not 0 <= timestep < len(self):
+            raise IndexError(f"Timestep {timestep} out of range")
+        return ResultValue(self.values[timestep], self.attribute, timestep)
+
+    @property
+    def values(self) -> np.ndarray:
+        """The solved values as a view of the table row."""
+        return self.table.results[self.attribute][self.index]
+
+    def tolist(self) -> list:
+        """Solved values as floats, None where nothing has been solved."""
+        return [None if np.isnan(v) else v for v in self.values.tolist()]
@@ -1,8 +1,36 @@
 import unittest
-from microgrid.engine import Network, Bus, Generator, Load, TransmissionLine, StorageUnit, StorageType, GeneratorType  # replace with your actual module name
-from microgrid.draw import draw_network
-from microgrid.save import save_network
+from unittest import mock
+from microgrid.engine import Network, Bus, Generator, Load, TransmissionLine, StorageUnit, StorageType, GeneratorType, TimestepLengthMismatch  # replace with your actual module name
+from microgrid.draw import draw_network, render_frames
+from microgrid.save import save_network, save_network_json, save_network_parquet, save_network_duckdb, DuckDBWriter, timestep_times
+from microgrid.read import read_series, read_network_info, row_groups
+from microgrid.visualise import visualise, write_chunked_data, downsample, downsample_indices, MAX_CHART_POINTS, precompress, StoppableHTTPServer
+from microgrid.scenarios import ScenarioSet
+import microgrid.scenarios
+from microgrid.aggregation import TimeAggregation
+from microgrid.matrix import NetworkProgram
+from microgrid.benchmark import synthetic_network, benchmark_case, compare
+from microgrid.cache import SolveCache, network_key
+from microgrid.store import MappedSeries
+from microgrid.sensitivity import price_sensitivity
+from microgrid.stats import SolveStats
 import os
+import duckdb
+import pyarrow.parquet as pq
+import json
+import shutil
+import logging.handlers
+import asyncio
+import time
+import tempfile
+import weakref
+import gc
+import gzip
+import socket
+import urllib.request
+import urllib.error
+import numpy as np
+import pyarrow as pa
 
 output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../test_outputs/")
 
@@ -12,9 +40,7 @@ def save_network_outputs(n):
     duckdb_path = os.path.join(output_dir,n.name.replace(' ', '-'), f"{n.name.replace(' ', '-')}.db")
     save_network(n, json_path, duckdb_path)
 
-    for ts in n.timesteps:
-        dot = draw_network(n, ts)
-        dot.render(os.path.join(output_dir,n.name.replace(' ', '-'), f"{n.name.replace(' ', '-')}_{ts}"), format='png')
+    render_frames(n, os.path.join(output_dir,n.name.replace(' ', '-'), n.name.replace(' ', '-')), format='png')
 
 class OptimalDispatchSingleNode(unittest.TestCase):
 
@@ -197,6 +223,1372 @@ class AllElements(unittest.TestCase):
         self.assertEqual(status, "Optimal")
 
 
+class SparseHighsSolve(unittest.TestCase):
+
+    def test_nodal_prices(self):
+        timesteps = ['t0', 't1']
+        n = Network("Simple2NodeHighs", timesteps)
+
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10, 15], costs=[0, 0], bus=bus1)
+        Load("Load1", consumptions=[10, 10], bus=bus1)
+
+        bus2 = Bus("Bus2", n)
+        Generator("Gen2", capacities=[10, 5], costs=[5, 5], bus=bus2)
+        Load("Load2", consumptions=[10, 10], bus=bus2)
+
+        TransmissionLine(start_bus=bus1, end_bus=bus2, capacities=[5, 5], network=n)
+
+        status = n.solve(method="highs")
+        save_network_outputs(n)
+
+        self.assertEqual(status, "Optimal")
+        self.assertAlmostEqual(n.buses["Bus1"].nodal_prices[0], 5.0)
+        self.assertAlmostEqual(n.buses["Bus1"].nodal_prices[1], 0.0)
+        self.assertAlmostEqual(n.buses["Bus2"].nodal_prices[0], 5.0)
+        self.assertAlmostEqual(n.buses["Bus2"].nodal_prices[1], 5.0)
+        self.assertAlmostEqual(n.transmission_lines["Bus1_to_Bus2"].flows[1].varValue, 5.0)
+
+    def test_storage(self):
+        timesteps = ['t0', 't1', 't3']
+        n = Network("SimpleStorageHighs", timesteps)
+
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[30, 30, 30], costs=[5, 100, 100], bus=bus1)
+        Load("Load1", consumptions=[10, 10, 10], bus=bus1)
+        StorageUnit("Storage1", bus=bus1, max_soc_capacity=100, max_charge_capacities=[20, 20, 20],
+                    max_discharge_capacities=[10, 10, 10], min_soc_requirements_start_of_ts=[0, 0, 0], consumptions=[0, 0, 0],
+                    charge_efficiency=1, discharge_efficiency=1)
+
+        status = n.solve(method="highs")
+        save_network_outputs(n)
+
+        self.assertEqual(status, "Optimal")
+        self.assertAlmostEqual(bus1.generators["Gen1"].outputs[0].varValue, 30.0)
+        self.assertAlmostEqual(bus1.generators["Gen1"].outputs[1].varValue, 0.0)
+        self.assertAlmostEqual(bus1.storage_units["Storage1"].charge_inflows[0].varValue, 20.0)
+        self.assertAlmostEqual(bus1.storage_units["Storage1"].discharge_outflows[1].varValue, 10.0)
+        self.assertAlmostEqual(bus1.storage_units["Storage1"].socs_start_of_ts[1].varValue, 20.0)
+        self.assertAlmostEqual(bus1.storage_units["Storage1"].socs_end_of_ts[2].varValue, 0.0)
+
+class ColumnarStore(unittest.TestCase):
+
+    def test_components_are_views_into_network_arrays(self):
+        timesteps = ['t0', 't1']
+        n = Network("Columnar", timesteps)
+
+        bus = Bus("Bus1", n)
+        gen1 = Generator("Gen1", capacities=[10, 10], costs=[5, 10], bus=bus)
+        gen2 = Generator("Gen2", capacities=[10, 10], costs=[7, 7], bus=bus)
+
+        self.assertEqual(n.generator_table.column('costs').shape, (2, 2))
+        gen2.costs = [1, 2]
+        self.assertEqual(n.generator_table.column('costs')[1].tolist(), [1.0, 2.0])
+        self.assertEqual(gen1.costs.tolist(), [5.0, 10.0])
+
+        with self.assertRaises(TimestepLengthMismatch):
+            Generator("Gen3", capacities=[10], costs=[5, 5], bus=bus)
+        with self.assertRaises(TimestepLengthMismatch):
+            gen1.capacities = [1, 2, 3]
+        self.assertEqual(len(n.generator_table), 2)
+        self.assertNotIn("Gen3", bus.generators)
+
+        # Timesteps added after the series were stored
+        n.timesteps.append('t2')
+        with self.assertRaises(TimestepLengthMismatch):
+            n.solve()
+
+    def test_result_values_hash_as_their_value(self):
+        n = Network("ResultValues", ['t0', 't1'])
+        bus = Bus("Bus1", n)
+        gen = Generator("Gen1", capacities=[10, 10], costs=[5, 5], bus=bus)
+        Load("Load1", consumptions=[3, 3], bus=bus)
+        self.assertIsNone(gen.outputs[0].varValue)
+        n.solve()
+
+        first, second = gen.outputs[0], gen.outputs[1]
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second, 3.0}), 1)
+        self.assertEqual({first: 'a'}[3.0], 'a')
+        with self.assertRaises(AttributeError):
+            first.timestep = 1
+
+class RollingHorizon(unittest.TestCase):
+
+    def build_network(self, name):
+        timesteps = ['t0', 't1', 't2', 't3', 't4', 't5']
+        n = Network(name, timesteps)
+
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[30] * 6, costs=[5, 100, 5, 100, 5, 100], bus=bus1)
+        Load("Load1", consumptions=[10] * 6, bus=bus1)
+        StorageUnit("Storage1", bus=bus1, max_soc_capacity=100, max_charge_capacities=[20] * 6,
+                    max_discharge_capacities=[10] * 6, min_soc_requirements_start_of_ts=[0] * 6, consumptions=[0] * 6,
+                    charge_efficiency=1, discharge_efficiency=1)
+        return n
+
+    def test_matches_monolithic_solve(self):
+        for method in ("pulp", "highs"):
+            full = self.build_network("RollingFull")
+            full.solve(method=method)
+
+            rolling = self.build_network("Rolling")
+            status = rolling.solve_rolling(window=4, overlap=2, method=method)
+            save_network_outputs(rolling)
+
+            self.assertEqual(status, "Optimal")
+            for i in range(len(rolling.timesteps)):
+                self.assertAlmostEqual(rolling.buses["Bus1"].generators["Gen1"].outputs[i].varValue,
+                                       full.buses["Bus1"].generators["Gen1"].outputs[i].varValue)
+                self.assertAlmostEqual(rolling.buses["Bus1"].storage_units["Storage1"].socs_end_of_ts[i].varValue,
+                                       full.buses["Bus1"].storage_units["Storage1"].socs_end_of_ts[i].varValue)
+            self.assertAlmostEqual(rolling.buses["Bus1"].storage_units["Storage1"].socs_end_of_ts[5].varValue, 0.0)
+            self.assertIsNotNone(rolling.buses["Bus1"].nodal_prices[5])
+
+    def test_window_must_exceed_overlap(self):
+        with self.assertRaises(ValueError):
+            self.build_network("RollingInvalid").solve_rolling(window=2, overlap=2)
+
+class ScenarioBatch(unittest.TestCase):
+
+    def test_scenarios(self):
+        timesteps = ['t0', 't1']
+        n = Network("Scenarios", timesteps)
+
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10, 15], costs=[0, 0], bus=bus1)
+        Load("Load1", consumptions=[10, 10], bus=bus1)
+
+        bus2 = Bus("Bus2", n)
+        Generator("Gen2", capacities=[10, 5], costs=[5, 5], bus=bus2)
+        Load("Load2", consumptions=[10, 10], bus=bus2)
+
+        TransmissionLine(start_bus=bus1, end_bus=bus2, capacities=[5, 5], network=n)
+
+        scenarios = ScenarioSet(n)
+        scenarios.add("base")
+        scenarios.add("expensive_gas", generator_costs={"Gen2": [50, 60]})
+        scenarios.add("more_wind", generator_capacities={"Gen1": [20, 20]}, load_consumptions={"Load2": [8, 8]})
+        # Solved after the others on the same model, so whatever they changed must have been put back
+        scenarios.add("base_again")
+
+        # Edits after the set is built do not reach its baseline
+        n.buses['Bus2'].generators['Gen2'].costs = [100, 100]
+
+        for max_workers in (1, 2):
+            results = scenarios.solve(max_workers=max_workers)
+
+            self.assertEqual(results.status, ["Optimal"] * 4)
+            self.assertEqual(results.nodal_prices.shape, (4, 2, 2))
+            self.assertAlmostEqual(results.objective[0], 75.0)
+            self.assertAlmostEqual(results.nodal_prices[1, 1, 0], 50.0)
+            self.assertAlmostEqual(results.nodal_prices[1, 1, 1], 60.0)
+            self.assertAlmostEqual(results.generator_outputs[2, 0, 0], 15.0)
+            self.assertAlmostEqual(results.flows[2, 0, 0], 5.0)
+            self.assertAlmostEqual(results.objective[2], 5 * 3 + 5 * 3)
+            self.assertAlmostEqual(results.objective[3], 75.0)
+            np.testing.assert_allclose(results.nodal_prices[3], results.nodal_prices[0])
+            # The serial path must not leave a model behind for later calls to reuse
+            self.assertIsNone(microgrid.scenarios._worker_model)
+
+    def test_scenarios_push_only_what_they_change(self):
+        n = synthetic_network(3, 6, "radial")
+        scenarios = ScenarioSet(n)
+        generator = n.generator_table.components[0]
+        scenarios.add("base")
+        scenarios.add("costs", generator_costs={generator.name: [99] * 6})
+        base, costs = (
+            microgrid.scenarios._scenario_changes(scenarios.base_vectors, scenarios.program.vectors(scenarios.scenarios[name]))
+            for name in ("base", "costs")
+        )
+        self.assertEqual([len(index) for index, *_ in base], [0, 0, 0])
+        (cost, values), (cols, *_), (rows, *_) = costs
+        np.testing.assert_array_equal(cost, scenarios.program.generator_outputs[generator.index])
+        np.testing.assert_array_equal(values, [99] * 6)
+        self.assertEqual((len(cols), len(rows)), (0, 0))
+
+        with self.assertRaises(TimestepLengthMismatch):
+            scenarios.add("bad", generator_costs={"Gen1": [1, 2, 3]})
+
+class PersistentResolve(unittest.TestCase):
+
+    def test_resolve_after_edits(self):
+        timesteps = ['t0', 't1']
+        n = Network("Persistent", timesteps)
+
+        bus1 = Bus("Bus1", n)
+        gen1 = Generator("Gen1", capacities=[10, 15], costs=[0, 0], bus=bus1)
+        Load("Load1", consumptions=[10, 10], bus=bus1)
+
+        bus2 = Bus("Bus2", n)
+        gen2 = Generator("Gen2", capacities=[10, 5], costs=[5, 5], bus=bus2)
+        load2 = Load("Load2", consumptions=[10, 10], bus=bus2)
+
+        line = TransmissionLine(start_bus=bus1, end_bus=bus2, capacities=[5, 5], network=n)
+
+        self.assertEqual(n.solve(method="highs", persistent=True), "Optimal")
+        program = n.persistent_program
+        self.assertAlmostEqual(bus2.nodal_prices[0], 5.0)
+
+        gen2.costs = [8, 5]
+        load2.consumptions = [10, 8]
+        line.capacities = [5, 3]
+        # Only the reassigned rows are read
+        self.assertEqual(n.generator_table.dirty['costs'], {gen2.index})
+        self.assertEqual(program.update(), 3)
+        self.assertEqual(n.generator_table.dirty['costs'], set())
+
+        gen1.capacities = [10, 20]
+        self.assertEqual(n.solve(method="highs", persistent=True), "Optimal")
+        self.assertIs(n.persistent_program, program)
+        self.assertAlmostEqual(bus2.nodal_prices[0], 8.0)
+        self.assertAlmostEqual(line.flows[1].varValue, 3.0)
+        self.assertAlmostEqual(gen2.outputs[1].varValue, 5.0)
+
+        # A fresh solve of the edited network agrees with the incremental one
+        n.solve(method="highs")
+        self.assertAlmostEqual(bus2.nodal_prices[0], 8.0)
+        self.assertAlmostEqual(gen2.outputs[1].varValue, 5.0)
+
+        # Series are read-only views, so an edit in place can not go unnoticed
+        with self.assertRaises(ValueError):
+            gen2.costs[0] = 3
+        gen2.costs = [3, 5]
+        self.assertEqual(n.solve(method="highs", persistent=True), "Optimal")
+        self.assertIs(n.persistent_program, program)
+        self.assertAlmostEqual(bus2.nodal_prices[0], 3.0)
+
+        # Adding a component changes the structure, so the model is rebuilt
+        Generator("Gen3", capacities=[5, 5], costs=[1, 1], bus=bus2)
+        n.solve(method="highs", persistent=True)
+        self.assertIsNot(n.persistent_program, program)
+
+    def test_storage_changes_rebuild(self):
+        n = Network("PersistentStorage", ['t0', 't1'])
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10, 10], costs=[1, 10], bus=bus)
+        Load("Load1", consumptions=[0, 5], bus=bus)
+        battery = StorageUnit("Battery", bus=bus, max_soc_capacity=2, max_charge_capacities=[10] * 2,
+                              max_discharge_capacities=[10] * 2, min_soc_requirements_start_of_ts=[0] * 2,
+                              consumptions=[0] * 2, charge_efficiency=1, discharge_efficiency=1)
+        n.solve(method="highs", persistent=True)
+        program = n.persistent_program
+        self.assertAlmostEqual(battery.discharge_outflows[1].varValue, 2.0)
+
+        # Static parameters and storage series are not pushed, so changing them forces a rebuild
+        battery.max_soc_capacity = 4
+        n.solve(method="highs", persistent=True)
+        self.assertIsNot(n.persistent_program, program)
+        self.assertAlmostEqual(battery.discharge_outflows[1].varValue, 4.0)
+
+        program = n.persistent_program
+        battery.max_discharge_capacities = [10, 3]
+        n.solve(method="highs", persistent=True)
+        self.assertIsNot(n.persistent_program, program)
+        self.assertAlmostEqual(battery.discharge_outflows[1].varValue, 3.0)
+
+
+class RepresentativePeriods(unittest.TestCase):
+
+    def test_repeated_days_aggregate_exactly(self):
+        # Four days of two timesteps, made of two distinct day types: sunny and dull
+        timesteps = [f"d{d}t{t}" for d in range(4) for t in range(2)]
+        n = Network("Aggregated", timesteps)
+        bus = Bus("Bus1", n)
+        Generator("Solar", capacities=[20, 0, 20, 0, 5, 0, 5, 0], costs=[0] * 8, bus=bus)
+        gas = Generator("Gas", capacities=[20] * 8, costs=[10] * 8, bus=bus)
+        Load("Load1", consumptions=[5] * 8, bus=bus)
+        battery = StorageUnit("Battery", bus=bus, max_soc_capacity=10,
+                              max_charge_capacities=[10] * 8, max_discharge_capacities=[10] * 8,
+                              min_soc_requirements_start_of_ts=[0] * 8, consumptions=[0] * 8)
+
+        aggregation = TimeAggregation(n, period_length=2, n_representatives=2)
+        self.assertEqual(aggregation.compression_ratio, 2.0)
+        self.assertEqual(sorted(aggregation.weights), [2.0, 2.0])
+        self.assertEqual(aggregation.solve(), "Optimal")
+
+        # Results are written back onto every original timestep
+        self.assertAlmostEqual(gas.outputs[0].varValue, 0.0)
+        for soc in battery.socs_end_of_ts:
+            self.assertTrue(-1e-9 <= soc.varValue <= 10 + 1e-9)
+        self.assertAlmostEqual(bus.nodal_prices[7], 10.0)
+
+        report = aggregation.compare()
+        self.assertAlmostEqual(report['objective'], report['full_objective'])
+
+    def test_period_length_must_divide_horizon(self):
+        n = Network("Uneven", ['t0', 't1', 't2'])
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 3, costs=[1] * 3, bus=bus)
+        with self.assertRaises(ValueError):
+            TimeAggregation(n, period_length=2, n_representatives=1)
+
+
+class DecomposedSolve(unittest.TestCase):
+
+    def test_islands_and_blocks_match_single_solve(self):
+        timesteps = ['t0', 't1', 't2', 't3']
+        n = Network("Decomposed", timesteps)
+
+        # Island 1 has storage, so it is solved over the whole horizon
+        bus1 = Bus("Bus1", n)
+        gen1 = Generator("Gen1", capacities=[20, 0, 20, 0], costs=[1, 1, 1, 1], bus=bus1)
+        Generator("Gen1Peak", capacities=[20] * 4, costs=[50] * 4, bus=bus1)
+        Load("Load1", consumptions=[5] * 4, bus=bus1)
+        StorageUnit("Battery", bus=bus1, max_soc_capacity=10,
+                    max_charge_capacities=[10] * 4, max_discharge_capacities=[10] * 4,
+                    min_soc_requirements_start_of_ts=[0] * 4, consumptions=[0] * 4)
+
+        # Island 2 has no storage, so every timestep is independent
+        bus2 = Bus("Bus2", n)
+        bus3 = Bus("Bus3", n)
+        gen2 = Generator("Gen2", capacities=[10, 20, 30, 40], costs=[5, 6, 7, 8], bus=bus2)
+        Generator("Gen3", capacities=[40] * 4, costs=[20] * 4, bus=bus3)
+        Load("Load3", consumptions=[25] * 4, bus=bus3)
+        line = TransmissionLine(start_bus=bus2, end_bus=bus3, capacities=[15] * 4, network=n)
+
+        self.assertEqual(sorted(len(island) for island in n.islands()), [1, 2])
+
+        self.assertEqual(n.solve(), "Optimal")
+        expected_outputs = [[o.varValue for o in g.outputs] for g in (gen1, gen2)]
+        expected_flows = [f.varValue for f in line.flows]
+        expected_prices = [list(b.nodal_prices) for b in (bus1, bus2, bus3)]
+
+        self.assertEqual(n.solve(method="highs", decompose=True, block_size=1, max_workers=2), "Optimal")
+        for g, expected in zip((gen1, gen2), expected_outputs):
+            for output, value in zip(g.outputs, expected):
+                self.assertAlmostEqual(output.varValue, value, places=4)
+        for flow, value in zip(line.flows, expected_flows):
+            self.assertAlmostEqual(flow.varValue, value, places=4)
+        for b, expected in zip((bus1, bus2, bus3), expected_prices):
+            for price, value in zip(b.nodal_prices, expected):
+                self.assertAlmostEqual(price, value, places=4)
+
+    def test_failed_block_writes_nothing(self):
+        n = Network("DecomposedInfeasible", ['t0', 't1', 't2', 't3'])
+        bus = Bus("Bus1", n)
+        gen = Generator("Gen1", capacities=[10] * 4, costs=[1] * 4, bus=bus)
+        Load("Load1", consumptions=[5, 5, 5, 50], bus=bus)
+        self.assertEqual(n.solve(method="highs", decompose=True, block_size=1, max_workers=1), "Infeasible")
+        self.assertTrue(np.isnan(gen.outputs.values).all())
+        self.assertEqual(bus.nodal_prices, [None] * 4)
+
+    def test_decompose_is_opt_in(self):
+        n = Network("NotDecomposed", [f"t{i}" for i in range(96)])
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 96, costs=[1] * 96, bus=bus)
+        Load("Load1", consumptions=[5] * 96, bus=bus)
+        with mock.patch('microgrid.decomposition.solve_decomposed') as solve_decomposed:
+            self.assertEqual(n.solve(method="highs"), "Optimal")
+        solve_decomposed.assert_not_called()
+
+    def test_decompose_needs_highs(self):
+        n = Network("Decomposed", ['t0'])
+        with self.assertRaises(ValueError):
+            n.solve(decompose=True)
+
+
+class MeritOrderDispatch(unittest.TestCase):
+
+    def build(self, line_capacity):
+        n = Network("MeritOrder", ['t0', 't1', 't2'])
+        bus1 = Bus("Bus1", n)
+        bus2 = Bus("Bus2", n)
+        bus3 = Bus("Bus3", n)
+        Generator("Cheap", capacities=[10, 10, 10], costs=[5, 5, 20], bus=bus1)
+        Generator("Mid", capacities=[10, 10, 10], costs=[10, 10, 10], bus=bus2)
+        Generator("Peak", capacities=[20, 20, 20], costs=[30, 30, 30], bus=bus3)
+        Load("Load2", consumptions=[5, 15, 15], bus=bus2)
+        Load("Load3", consumptions=[5, 10, 20], bus=bus3)
+        TransmissionLine(start_bus=bus1, end_bus=bus2, capacities=[line_capacity] * 3, network=n)
+        TransmissionLine(start_bus=bus3, end_bus=bus2, capacities=[line_capacity] * 3, network=n)
+        return n
+
+    def results(self, n):
+        outputs = [[o.varValue for o in g.outputs] for g in n.generator_table.components]
+        flows = [[f.varValue for f in t.flows] for t in n.line_table.components]
+        prices = [list(b.nodal_prices) for b in n.buses.values()]
+        return outputs, flows, prices
+
+    def test_matches_lp(self):
+        lp = self.build(100)
+        # Demand at t0 exactly uses up Cheap, so any price from 5 to 10 is a valid dual; the unreduced
+        # model is the one CBC resolves to the merit order price
+        self.assertEqual(lp.solve(method="pulp", reduce=False), "Optimal")
+        n = self.build(100)
+        self.assertEqual(n.solve(method="merit_order"), "Optimal")
+        for merit_order_values, lp_values in zip(self.results(n), self.results(lp)):
+            for row, expected_row in zip(merit_order_values, lp_values):
+                for value, expected in zip(row, expected_row):
+                    self.assertAlmostEqual(value, expected, places=4)
+        self.assertAlmostEqual(n.buses["Bus3"].nodal_prices[2], 30.0)
+        self.assertAlmostEqual(n.line_table.components[1].flows[2].varValue, -5.0)
+
+    def test_lp_is_the_default(self):
+        n = self.build(100)
+        self.assertEqual(n.solve(), "Optimal")
+        self.assertEqual(n.solve_stats.method, "pulp")
+        self.assertIsNotNone(n.model)
+        n.solve(method="auto")
+        self.assertEqual(n.solve_stats.method, "merit_order")
+
+    def test_binding_line_falls_back_to_lp(self):
+        n = self.build(6)
+        with self.assertRaises(ValueError):
+            n.solve(method="merit_order")
+        self.assertEqual(n.solve(method="auto"), "Optimal")
+        self.assertEqual(n.solve_stats.method, "pulp")
+        self.assertAlmostEqual(n.buses["Bus1"].nodal_prices[1], 5.0)
+        self.assertAlmostEqual(n.buses["Bus2"].nodal_prices[1], 30.0)
+
+
+class DuckDBStreaming(unittest.TestCase):
+
+    def test_chunked_and_appended_writes(self):
+        timesteps = ['t0', 't1', 't2', 't3']
+        n = Network("Streaming", timesteps)
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 4, costs=[1, 2, 3, 4], bus=bus1)
+        Load("Load1", consumptions=[5, 6, 7, 8], bus=bus1)
+        bus2 = Bus("Bus2", n)
+        Generator("Gen2", capacities=[10] * 4, costs=[5] * 4, bus=bus2)
+        Load("Load2", consumptions=[1] * 4, bus=bus2)
+        TransmissionLine(start_bus=bus1, end_bus=bus2, capacities=[5] * 4, network=n)
+        n.solve()
+
+        os.makedirs(os.path.join(output_dir, n.name), exist_ok=True)
+        path = os.path.join(output_dir, n.name, f"{n.name}.db")
+        # Two windows written through one connection make up the whole horizon
+        with DuckDBWriter(path) as writer:
+            writer.write_network(n, 0, 2)
+            writer.write_network(n, 2, 4)
+        with duckdb.connect(path) as conn:
+            self.assertEqual(conn.sql("SELECT count(*) FROM generator_outputs").fetchone()[0], 8)
+            self.assertEqual(conn.sql("SELECT count(*) FROM nodal_flows").fetchone()[0], 24)
+            self.assertEqual(conn.sql("SELECT sum(output) FROM generator_outputs").fetchone()[0], 30.0)
+            self.assertEqual(conn.sql("SELECT price_Bus2 FROM nodal_prices WHERE timestep = 't3'").fetchone()[0], 4.0)
+
+        # A new writer replaces tables unless it appends
+        with DuckDBWriter(path) as writer:
+            writer.write_network(n)
+        with DuckDBWriter(path, append=True) as writer:
+            writer.write_network(n)
+        with duckdb.connect(path) as conn:
+            self.assertEqual(conn.sql("SELECT count(*) FROM generator_outputs").fetchone()[0], 16)
+
+
+class ParquetExport(unittest.TestCase):
+
+    def test_round_trip_component_and_time_range(self):
+        timesteps = ['t0', 't1', 't2', 't3']
+        n = Network("Parquet", timesteps)
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 4, costs=[1, 2, 3, 4], bus=bus1, generator_type=GeneratorType.CCGT)
+        Generator("Gen2", capacities=[10] * 4, costs=[5] * 4, bus=bus1)
+        Load("Load1", consumptions=[5, 12, 7, 15], bus=bus1)
+        StorageUnit("Battery", bus=bus1, max_soc_capacity=10,
+                    max_charge_capacities=[5] * 4, max_discharge_capacities=[5] * 4,
+                    min_soc_requirements_start_of_ts=[0] * 4, consumptions=[0] * 4)
+        n.solve()
+
+        path = os.path.join(output_dir, n.name)
+        save_network_parquet(n, path)
+
+        info = read_network_info(path)
+        self.assertEqual(info['timesteps'], timesteps)
+        self.assertEqual(info['max_soc_capacities'], {'Battery': 10})
+
+        gen2 = read_series(path, 'generators', components=['Gen2'], start=1, stop=3)
+        self.assertEqual(list(gen2['component']), ['Gen2', 'Gen2'])
+        self.assertEqual(list(gen2['timestep_index']), [1, 2])
+        self.assertEqual(list(gen2['cost']), [5.0, 5.0])
+        self.assertEqual(list(gen2['generator_type']), ['Unclassified', 'Unclassified'])
+        for output, expected in zip(gen2['output'], n.buses['Bus1'].generators['Gen2'].outputs[1:3]):
+            self.assertAlmostEqual(output, expected.varValue)
+
+        prices = read_series(path, 'nodal_prices', columns=['price'])
+        self.assertEqual(list(prices.columns), ['component', 'timestep_index', 'price'])
+        self.assertEqual(len(prices), 4)
+        socs = read_series(path, 'storage_units', start=3, columns=['soc_end_of_ts'])
+        self.assertAlmostEqual(socs['soc_end_of_ts'][0], 0.0)
+
+    def test_time_range_reads_only_its_row_groups(self):
+        n = synthetic_network(4, 48, "meshed")
+        n.solve(method="highs")
+        path = os.path.join(output_dir, "ParquetRowGroups")
+        save_network_parquet(n, path, row_group_components=3, row_group_timesteps=12)
+        parquet_file = pq.ParquetFile(os.path.join(path, "generators.parquet"))
+        names = sorted(g.name for g in n.generator_table.components)
+        component_blocks = -(-len(names) // 3)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 4 * component_blocks)
+
+        # One time block, and within it the one component block holding the name
+        self.assertEqual(len(row_groups(parquet_file, start=12, stop=24)), component_blocks)
+        self.assertEqual(len(row_groups(parquet_file, start=20, stop=30)), 2 * component_blocks)
+        self.assertEqual(len(row_groups(parquet_file, components=[names[4]], start=12, stop=24)), 1)
+
+        generator = n.generator_table.components[0]
+        series = read_series(path, 'generators', components=[generator.name], start=20, stop=30, columns=['output'])
+        self.assertEqual(list(series['timestep_index']), list(range(20, 30)))
+        np.testing.assert_allclose(series['output'], generator.outputs.values[20:30])
+        everything = read_series(path, 'generators')
+        self.assertEqual(list(everything['component']), [name for name in names for _ in range(48)])
+
+
+class ChunkedVisualiserData(unittest.TestCase):
+
+    def test_topology_snapshots_and_series(self):
+        timesteps = ['t0', 't1', 't2', 't3', 't4']
+        n = Network("Chunked", timesteps)
+        bus1 = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 5, costs=[1] * 5, bus=bus1)
+        Load("Load1", consumptions=[1, 2, 3, 4, 5], bus=bus1)
+        bus2 = Bus("Bus2", n)
+        Load("Load2", consumptions=[1] * 5, bus=bus2)
+        TransmissionLine(start_bus=bus1, end_bus=bus2, capacities=[5] * 5, network=n)
+        n.solve()
+
+        path = os.path.join(output_dir, n.name)
+        os.makedirs(path, exist_ok=True)
+        save_network_json(n, os.path.join(path, f"{n.name}.json"))
+        with open(os.path.join(path, f"{n.name}.json")) as f:
+            write_chunked_data(json.load(f), os.path.join(path, 'data'), chunk_size=2, max_points=2)
+
+        def read(*parts):
+            with open(os.path.join(path, 'data', *parts)) as f:
+                return json.load(f)
+
+        topology = read('topology.json')
+        self.assertTrue(topology['downsampled'])
+        self.assertEqual([b['name'] for b in topology['buses']], ['Bus1', 'Bus2'])
+        self.assertEqual(topology['buses'][1]['loads'], [1])
+        self.assertEqual(topology['transmission_lines'][0]['end_bus'], 'Bus2')
+        self.assertNotIn('outputs', json.dumps(topology))
+
+        # Five timesteps in chunks of two
+        self.assertEqual(sorted(os.listdir(os.path.join(path, 'data', 'snapshots'))), ['0.json', '1.json', '2.json'])
+        snapshot = read('snapshots', '1.json')
+        self.assertEqual(snapshot['start'], 2)
+        self.assertEqual(snapshot['loads']['consumptions'][1], [4.0, 1.0])
+        self.assertAlmostEqual(snapshot['generators']['outputs'][1][0], 5.0)
+
+        load = read('series', 'loads', '0.json')
+        self.assertEqual(load['consumptions'], [1.0, 2.0, 3.0, 4.0, 5.0])
+        downsampled = read('series', 'loads', '0.downsampled.json')
+        self.assertEqual(downsampled['timestep_indices'], [0, 2])
+        # One bucket of five timesteps keeps its minimum and maximum
+        self.assertEqual(downsampled['consumptions'], [1.0, 5.0])
+
+    def test_unsolved_network_past_downsampling_threshold(self):
+        timesteps = [f"t{i}" for i in range(MAX_CHART_POINTS + 10)]
+        n = Network("UnsolvedLong", timesteps)
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * len(timesteps), costs=[1] * len(timesteps), bus=bus)
+        Load("Load1", consumptions=[5] * len(timesteps), bus=bus)
+
+        path = os.path.join(output_dir, n.name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        save_network_json(n, os.path.join(path, f"{n.name}.json"))
+        visualise(os.path.join(path, f"{n.name}.json"), os.path.join(path, 'visualisation'), open_browser=False)
+
+        with open(os.path.join(path, 'visualisation', 'data', 'series', 'generators', '0.downsampled.json')) as f:
+            generator = json.load(f)
+        self.assertEqual(len(generator['outputs']), len(generator['timestep_indices']))
+        self.assertTrue(all(output is None for output in generator['outputs']))
+        self.assertEqual(set(generator['capacities']), {10})
+
+    def test_downsample_keeps_extremes_and_skips_unsolved(self):
+        values = [1, 9, 2, 3, -4, 3]
+        self.assertEqual(downsample(values, 2), [1, 9, 3, -4])
+        self.assertEqual(downsample_indices(len(values), 2), [0, 1, 3, 4])
+        self.assertEqual(downsample([None, 2, None, None, None], 2), [2, 2, None, None])
+        self.assertEqual(downsample([5, None, 7], 3), [5, None, 7])
+
+
+class SolveInstrumentation(unittest.TestCase):
+
+    def build(self):
+        timesteps = ['t0', 't1', 't2']
+        n = Network("Instrumented", timesteps)
+        bus1 = Bus("Bus1", n)
+        bus2 = Bus("Bus2", n)
+        Generator("Gen1", capacities=[20] * 3, costs=[1, 1, 1], bus=bus1)
+        Generator("Gen2", capacities=[20] * 3, costs=[5, 5, 5], bus=bus2)
+        Load("Load1", consumptions=[5, 10, 15], bus=bus2)
+        StorageUnit("Storage1", bus=bus2, max_soc_capacity=10, max_charge_capacities=[5] * 3,
+                    max_discharge_capacities=[5] * 3, min_soc_requirements_start_of_ts=[0] * 3, consumptions=[0] * 3,
+                    charge_efficiency=1, discharge_efficiency=1)
+        TransmissionLine(bus1, bus2, capacities=[8] * 3, network=n)
+        return n
+
+    def test_pulp_phases_and_model_size(self):
+        n = self.build()
+        n.solve(method="pulp", reduce=False)
+        stats = n.solve_stats
+        self.assertEqual(stats.status, "Optimal")
+        self.assertEqual(list(stats.phases), ["check_timesteps", "build", "cbc", "results", "duals"])
+        for phase in stats.phases.values():
+            self.assertGreaterEqual(phase['seconds'], 0)
+            self.assertGreaterEqual(phase['peak_rss_growth_mb'], 0)
+        self.assertGreater(stats.to_dict()['peak_rss_mb'], 0)
+        self.assertGreaterEqual(stats.wall_seconds, sum(p['seconds'] for p in stats.phases.values()))
+
+        # Every constraint of the PuLP model is attributed to exactly one component type
+        totals = stats.totals()
+        self.assertEqual(totals['constraints'], len(n.model.constraints))
+        self.assertEqual(totals['nonzeros'], sum(len(c) for c in n.model.constraints.values()))
+        self.assertEqual(stats.model_size['generators'], {'variables': 6, 'constraints': 6, 'nonzeros': 6})
+        self.assertEqual(stats.model_size['buses']['constraints'], 6)
+        self.assertEqual(stats.model_size['storage_units']['variables'], 12)
+
+    def test_peak_rss_unavailable(self):
+        # Without the resource module (Windows) memory is reported as unknown rather than guessed
+        with mock.patch('microgrid.stats.resource', None):
+            stats = SolveStats("NoResource", "pulp")
+            with stats.phase("build"):
+                pass
+            stats.finish("Optimal")
+        self.assertIsNone(stats.phases['build']['peak_rss_growth_mb'])
+        self.assertIsNone(stats.to_dict()['peak_rss_mb'])
+
+    def test_highs_model_size(self):
+        n = self.build()
+        n.solve(method="highs")
+        stats = n.solve_stats
+        self.assertEqual(list(stats.phases), ["check_timesteps", "build", "highs", "apply"])
+        program = NetworkProgram(n).build()
+        self.assertEqual(stats.totals(), {'variables': program.lp.num_col, 'constraints': program.lp.num_row,
+                                          'nonzeros': program.lp.num_nz})
+
+    def test_records_stream_to_file_and_logger(self):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, "solve_stats.jsonl")
+        if os.path.exists(path):
+            os.remove(path)
+        n = self.build()
+        n.stats_hook = path
+        n.solve(method="pulp")
+        n.solve_rolling(window=2, method="highs")
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        solves = [r for r in records if r['event'] == 'solve']
+        self.assertEqual([r['method'] for r in solves], ["pulp", "highs"])
+        self.assertEqual(list(solves[0]['phases']), ["check_timesteps", "build", "cbc", "results", "duals"])
+        self.assertEqual(solves[1]['phases']['highs']['calls'], 2)
+        self.assertIn('cbc', [r['phase'] for r in records if r['event'] == 'phase'])
+
+        handler = logging.handlers.BufferingHandler(100)
+        n.stats_hook = handler
+        n.solve(method="highs")
+        messages = [json.loads(record.getMessage()) for record in handler.buffer]
+        self.assertEqual(messages[-1]['event'], 'solve')
+        self.assertEqual(messages[-1]['status'], 'Optimal')
+
+class SyntheticBenchmark(unittest.TestCase):
+
+    def test_generator_is_reproducible_and_feasible(self):
+        radial = synthetic_network(6, 24, "radial", seed=1)
+        again = synthetic_network(6, 24, "radial", seed=1)
+        meshed = synthetic_network(6, 24, "meshed", seed=1)
+        self.assertEqual(len(radial.transmission_lines), 5)
+        self.assertGreater(len(meshed.transmission_lines), 5)
+        self.assertTrue((radial.generator_table.column('capacities') == again.generator_table.column('capacities')).all())
+        self.assertTrue((radial.load_table.column('consumptions') == again.load_table.column('consumptions')).all())
+        for n in (radial, meshed):
+            self.assertEqual(n.solve(method="highs"), "Optimal")
+
+    def test_generator_mix_and_storage_density(self):
+        n = synthetic_network(4, 12, "meshed", generator_mix={GeneratorType.NUCLEAR: 1},
+                              storage_density={StorageType.BATTERY: 1, StorageType.EV_FLEET: 1})
+        types = {g.generator_type for g in n.generator_table.components if not g.name.startswith("Backstop")}
+        self.assertEqual(types, {GeneratorType.NUCLEAR})
+        self.assertEqual(sum(su.storage_type == StorageType.BATTERY for su in n.storage_table.components), 4)
+        self.assertEqual(sum(su.storage_type == StorageType.EV_FLEET for su in n.storage_table.components), 4)
+        self.assertEqual(n.solve(method="pulp"), "Optimal")
+
+    def test_compare_flags_regressions(self):
+        baseline = {'cases': {'radial_5x24': {'seconds': {'solve': 1.0, 'draw_network': 0.001}}}}
+        results = {'cases': {
+            'radial_5x24': {'seconds': {'solve': 1.3, 'draw_network': 0.003, 'build': 5.0}},
+            'meshed_5x24': {'seconds': {'solve': 9.0}},
+        }}
+        # draw_network is 3x slower but within timer noise, build and meshed_5x24 have no baseline
+        self.assertEqual(compare(results, baseline, tolerance=0.25), [('radial_5x24', 'solve', 1.3, 1.0)])
+        self.assertEqual(compare(results, baseline, tolerance=0.5), [])
+
+    def test_benchmark_case(self):
+        case = benchmark_case(3, 4, "meshed", repeats=1)
+        self.assertEqual(case['status'], "Optimal")
+        # Timed on the default solve path
+        self.assertEqual(case['method'], "pulp")
+        self.assertEqual(set(case['seconds']), {'build', 'solve', 'save_network_json', 'save_network_duckdb', 'draw_network'})
+        self.assertGreater(case['model_size']['variables'], 0)
+
+class LazyVariables(unittest.TestCase):
+
+    def build(self):
+        n = Network("Lazy", ['t0', 't1', 't2'])
+        bus1 = Bus("Bus1", n)
+        bus2 = Bus("Bus2", n)
+        gen = Generator("Gen1", capacities=[5] * 3, costs=[1, 2, 3], bus=bus1)
+        Load("Load1", consumptions=[10, 12, 14], bus=bus2)
+        TransmissionLine(bus1, bus2, capacities=[20] * 3, network=n)
+        # Reassigned after construction - variable bounds must use the current capacities
+        gen.capacities = [20] * 3
+        return n
+
+    def test_no_variables_until_solved(self):
+        n = self.build()
+        gen = n.buses["Bus1"].generators["Gen1"]
+        self.assertFalse(hasattr(gen, '__dict__'))
+        self.assertIsNone(gen.outputs[0].varValue)
+        self.assertTrue(np.isnan(n.generator_table.result('outputs')).all())
+
+        self.assertEqual(n.solve(method="pulp"), "Optimal")
+        self.assertEqual([v.varValue for v in gen.outputs], [10, 12, 14])
+        self.assertEqual(gen.outputs.tolist(), [10, 12, 14])
+        self.assertEqual(n.transmission_lines["Bus1_to_Bus2"].flows[-1].varValue, 14)
+        self.assertEqual(len(n.model.variables()), 3 * 2)
+
+    def test_rolling_windows_fill_results(self):
+        n = self.build()
+        n.solve_rolling(window=2, method="pulp")
+        self.assertEqual(n.generator_table.result('outputs').tolist(), [[10, 12, 14]])
+        # Only the last window's variables are in the model
+        self.assertEqual(len(n.model.variables()), 2)
+
+class ModelReduction(unittest.TestCase):
+
+    def build(self):
+        timesteps = ['t0', 't1', 't2', 't3']
+        n = Network("Reduced", timesteps)
+        bus1 = Bus("Bus1", n)
+        bus2 = Bus("Bus2", n)
+        Generator("Gen1", capacities=[20] * 4, costs=[1, 8, 1, 8], bus=bus1)
+        Generator("Gen2", capacities=[30] * 4, costs=[10] * 4, bus=bus2)
+        Load("Load1", consumptions=[5, 15, 10, 25], bus=bus2)
+        StorageUnit("EV1", bus=bus2, max_soc_capacity=20, max_charge_capacities=[10, 10, 0, 0],
+                    max_discharge_capacities=[5, 5, 0, 0], min_soc_requirements_start_of_ts=[0, 0, 10, 0],
+                    consumptions=[0, 0, 6, 4], storage_type=StorageType.EV_FLEET, charge_efficiency=0.9, discharge_efficiency=0.9)
+        TransmissionLine(bus1, bus2, capacities=[12] * 4, network=n)
+        return n
+
+    def results(self, n):
+        return (
+            n.generator_table.result('outputs').tolist(),
+            n.storage_table.result('socs_start_of_ts').tolist(),
+            n.storage_table.result('socs_end_of_ts').tolist(),
+            n.line_table.result('flows').tolist(),
+            [list(b.nodal_prices) for b in n.buses.values()],
+        )
+
+    def test_same_solution_as_full_model(self):
+        full, reduced = self.build(), self.build()
+        self.assertEqual(full.solve(method="pulp", reduce=False), "Optimal")
+        self.assertEqual(reduced.solve(method="pulp"), "Optimal")
+        for reduced_values, full_values in zip(self.results(reduced), self.results(full)):
+            for row, expected_row in zip(reduced_values, full_values):
+                for value, expected in zip(row, expected_row):
+                    self.assertAlmostEqual(value, expected, places=5)
+
+        # Both sizes are counted from the PuLP models that were solved
+        full_size, reduced_size = full.solve_stats.totals(), reduced.solve_stats.totals()
+        self.assertEqual(full_size['constraints'], len(full.model.constraints))
+        self.assertEqual(reduced_size['constraints'], len(reduced.model.constraints))
+        self.assertEqual(reduced_size['variables'], len(reduced.model.variables()))
+        self.assertLess(reduced_size['constraints'], full_size['constraints'] / 2)
+        self.assertLess(reduced_size['variables'], full_size['variables'])
+        self.assertLess(reduced_size['nonzeros'], full_size['nonzeros'])
+        self.assertEqual(full.solve_stats.removed, {})
+
+    def test_removed_accounts_for_the_size_difference(self):
+        # A window inside the horizon, against the unreduced build of the same window
+        for start, stop in ((1, 3), (0, 4)):
+            full, reduced = SolveStats("Full", "pulp"), SolveStats("Reduced", "pulp")
+            self.build().solve_window(start, stop, stats=full, reduce=False)
+            self.build().solve_window(start, stop, stats=reduced)
+            self.assertEqual(full.removed, {})
+            for component_type, size in full.model_size.items():
+                removed = reduced.removed.get(component_type, {'variables': 0, 'constraints': 0, 'nonzeros': 0})
+                for key in ('variables', 'constraints', 'nonzeros'):
+                    self.assertEqual(reduced.model_size[component_type][key] + removed[key], size[key], (component_type, key))
+            self.assertEqual(reduced.to_dict()['removed'], reduced.removed)
+
+    def test_rolling_windows(self):
+        full, reduced = self.build(), self.build()
+        full.solve_rolling(window=3, overlap=1, reduce=False)
+        reduced.solve_rolling(window=3, overlap=1)
+        for reduced_values, full_values in zip(self.results(reduced), self.results(full)):
+            for row, expected_row in zip(reduced_values, full_values):
+                for value, expected in zip(row, expected_row):
+                    self.assertAlmostEqual(value, expected, places=5)
+
+    def test_infeasible_start_stays_infeasible(self):
+        # A fixed start SOC above capacity or below the requirement is a bound conflict rather than a violated row
+        for reduce in (False, True):
+            for initial_soc in (25.0, 2.0):
+                n = self.build()
+                n.storage_table.components[0].min_soc_requirements_start_of_ts = [5, 0, 10, 0]
+                self.assertEqual(n.solve_window(0, 4, "pulp", initial_socs=np.array([initial_soc]), reduce=reduce), "Infeasible")
+
+    def test_solvers_agree_on_infeasible_start(self):
+        for initial_soc in (25.0, 2.0):
+            statuses = []
+            for method in ("pulp", "highs"):
+                n = self.build()
+                n.storage_table.components[0].min_soc_requirements_start_of_ts = [5, 0, 10, 0]
+                statuses.append(n.solve_window(0, 4, method, initial_socs=np.array([initial_soc])))
+            self.assertEqual(statuses, ["Infeasible", "Infeasible"])
+
+class BackgroundSolve(unittest.TestCase):
+
+    def cbc_processes(self, group):
+        # CBC processes in a process group, from /proc
+        pids = []
+        for pid in filter(str.isdigit, os.listdir('/proc')):
+            try:
+                with open(f'/proc/{pid}/stat') as f:
+                    stat = f.read().rsplit(')', 1)[1].split()
+                with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                    command = f.read()
+            except OSError:
+                continue
+            if int(stat[2]) == group and b'cbc' in command.lower():
+                pids.append(int(pid))
+        return pids
+
+    def test_results_written_back(self):
+        n, expected = synthetic_network(5, 24, "meshed"), synthetic_network(5, 24, "meshed")
+        records = []
+        n.stats_hook = records.append
+        expected.solve(method="pulp")
+        self.assertEqual(n.solve_in_background(method="pulp").result(60), "Optimal")
+        np.testing.assert_allclose(n.generator_table.result('outputs'), expected.generator_table.result('outputs'), atol=1e-6)
+        np.testing.assert_allclose(n.line_table.result('flows'), expected.line_table.result('flows'), atol=1e-6)
+        for bus in n.buses.values():
+            np.testing.assert_allclose(bus.nodal_prices, expected.buses[bus.name].nodal_prices, atol=1e-6)
+        self.assertEqual(n.solve_stats.status, "Optimal")
+        self.assertEqual([r['event'] for r in records], ['solve'])
+
+    def test_async_timeout_leaves_network_untouched(self):
+        n = synthetic_network(5, 24, "meshed")
+        with self.assertRaises(TimeoutError):
+            asyncio.run(n.solve_async(timeout=0.01, method="pulp"))
+        self.assertTrue(np.isnan(n.generator_table.result('outputs')).all())
+        self.assertEqual(asyncio.run(n.solve_async(timeout=60, method="highs")), "Optimal")
+        self.assertFalse(np.isnan(n.generator_table.result('outputs')).any())
+
+    @unittest.skipUnless(os.path.exists('/proc/self/stat'), "needs /proc")
+    def test_cancel_kills_solver(self):
+        n = synthetic_network(50, 168, "meshed")
+        future = n.solve_in_background(method="pulp")
+        group = future._process.pid
+        deadline = time.time() + 60
+        while not self.cbc_processes(group) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.cbc_processes(group))
+        self.assertTrue(future.cancel())
+        future._process.join(10)
+        time.sleep(0.2)
+        self.assertFalse(future._process.is_alive())
+        self.assertEqual(self.cbc_processes(group), [])
+        self.assertTrue(np.isnan(n.generator_table.result('outputs')).all())
+
+    def disk_backed(self, directory):
+        n = Network("DiskBacked", ['t0', 't1'], series_dir=directory)
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10, 10], costs=[1, 1], bus=bus)
+        Load("Load1", consumptions=[4, 6], bus=bus)
+        self.assertEqual(n.solve(method="pulp"), "Optimal")
+        return n
+
+    def test_disk_backed_results_untouched_by_failed_solves(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        n = self.disk_backed(directory)
+        solved = n.generator_table.result('outputs').copy()
+
+        # The worker has solved (into its own copy of the tables) by the time the marker exists
+        marker = os.path.join(directory, 'solved')
+        solve = Network.solve
+        def solve_then_wait(network, **kwargs):
+            status = solve(network, **kwargs)
+            open(marker, 'w').close()
+            time.sleep(60)
+            return status
+
+        n.load_table.components[0].consumptions = [2, 3]
+        with mock.patch.object(Network, 'solve', solve_then_wait):
+            future = n.solve_in_background(method="pulp")
+        deadline = time.time() + 60
+        while not os.path.exists(marker) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(future.cancel())
+        future._process.join(10)
+        np.testing.assert_array_equal(n.generator_table.result('outputs'), solved)
+
+        # An infeasible solve writes its (meaningless) values in the worker only
+        n.load_table.components[0].consumptions = [40, 60]
+        self.assertEqual(n.solve_in_background(method="pulp").result(60), "Infeasible")
+        np.testing.assert_array_equal(n.generator_table.result('outputs'), solved)
+
+class ResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def results(self, n):
+        return [n.generator_table.result('outputs'), n.storage_table.result('socs_end_of_ts'), n.line_table.result('flows'),
+                np.array([b.nodal_prices for b in n.buses.values()], dtype=float)]
+
+    def test_hit_fills_results_without_solving(self):
+        cache = SolveCache(self.directory)
+        solved, cached = synthetic_network(5, 24, "meshed"), synthetic_network(5, 24, "meshed")
+        self.assertEqual(solved.solve(method="pulp", cache=cache), "Optimal")
+        self.assertIn('cbc', solved.solve_stats.phases)
+        self.assertEqual(len(cache.entries()), 1)
+
+        self.assertEqual(cached.solve(method="pulp", cache=cache), "Optimal")
+        self.assertNotIn('cbc', cached.solve_stats.phases)
+        for cached_values, solved_values in zip(self.results(cached), self.results(solved)):
+            np.testing.assert_array_equal(cached_values, solved_values)
+
+    def test_key_covers_inputs_and_settings(self):
+        n = synthetic_network(5, 24, "meshed")
+        key = network_key(n, method="pulp")
+        self.assertEqual(network_key(synthetic_network(5, 24, "meshed"), method="pulp"), key)
+        self.assertNotEqual(network_key(n, method="highs"), key)
+        load = n.load_table.components[0]
+        load.consumptions = load.consumptions * 1.01
+        self.assertNotEqual(network_key(n, method="pulp"), key)
+        n.storage_table.components[0].max_soc_capacity += 1
+        self.assertNotEqual(network_key(synthetic_network(5, 24, "meshed"), method="pulp"), network_key(n, method="pulp"))
+
+    def test_least_recently_used_evicted(self):
+        cache = SolveCache(self.directory)
+        networks = [synthetic_network(3, 12, "radial", seed=seed) for seed in range(3)]
+        keys = []
+        for n in networks:
+            n.solve(method="highs", cache=cache)
+            keys.append(network_key(n, method="highs", persistent=False, decompose=False, block_size=None, reduce=True, ptdf=False))
+            time.sleep(0.01)
+        # Using the first entry makes the second the least recently used
+        self.assertEqual(cache.load(synthetic_network(3, 12, "radial", seed=0), keys[0]), "Optimal")
+        cache.max_bytes = sum(size for _, size, _ in cache.entries()) - 1
+        cache.evict()
+        self.assertEqual(sorted(path for _, _, path in cache.entries()), sorted([cache.path(keys[0]), cache.path(keys[2])]))
+
+class PriceSensitivityRanging(unittest.TestCase):
+
+    def resolve(self, n, bus, timestep, extra_demand):
+        # The brute force answer - re-solve with extra demand at one bus and timestep
+        program = NetworkProgram(n).build()
+        col_cost, col_lower, col_upper, row_lower, row_upper = program.vectors(program.inputs())
+        row = program.energy_balance[bus, timestep]
+        row_lower[row] += extra_demand
+        row_upper[row] += extra_demand
+        program.lp.set_vectors(col_cost, col_lower, col_upper, row_lower, row_upper)
+        status, objective, _, row_dual = program.run()
+        self.assertEqual(status, "Optimal")
+        return objective, row_dual[program.energy_balance]
+
+    def test_matches_resolves_within_range(self):
+        n = synthetic_network(4, 12, "meshed")
+        sensitivity = price_sensitivity(n)
+        self.assertEqual(sensitivity.nodal_prices.shape, (4, 12))
+        self.assertTrue((sensitivity.demand_lower <= sensitivity.demand).all())
+        self.assertTrue((sensitivity.demand <= sensitivity.demand_upper).all())
+        self.assertTrue(np.isnan(n.generator_table.result('outputs')).all())
+
+        for bus, timestep in [(0, 0), (1, 5), (3, 11)]:
+            room = sensitivity.demand_upper[bus, timestep] - sensitivity.demand[bus, timestep]
+            extra_demand = min(room / 2, 5.0)
+            extra = np.zeros((4, 12))
+            extra[bus, timestep] = extra_demand
+            objective, prices = self.resolve(n, bus, timestep, extra_demand)
+            self.assertAlmostEqual(objective - sensitivity.objective, sensitivity.objective_change(extra)[bus, timestep], places=4)
+            np.testing.assert_allclose(prices, sensitivity.nodal_prices, atol=1e-6)
+
+        # Prices match a normal solve
+        n.solve(method="highs")
+        np.testing.assert_allclose(np.array([b.nodal_prices for b in n.buses.values()], dtype=float), sensitivity.nodal_prices, atol=1e-6)
+
+    def test_outside_range_is_nan(self):
+        sensitivity = price_sensitivity(synthetic_network(3, 6, "radial"))
+        extra = sensitivity.demand_upper - sensitivity.demand + 1.0
+        self.assertTrue(np.isnan(sensitivity.objective_change(extra)[np.isfinite(extra)]).all())
+        self.assertEqual(len(sensitivity.to_dict(sensitivity.buses[0])['nodal_price']), 6)
+
+class PTDFFlows(unittest.TestCase):
+
+    def build(self, timesteps=['t0']):
+        # Cheap generation at Bus1, expensive at Bus2 and all the load at Bus3, on a triangle of equal reactances
+        T = len(timesteps)
+        n = Network("PTDF", timesteps)
+        bus1, bus2, bus3 = Bus("Bus1", n), Bus("Bus2", n), Bus("Bus3", n)
+        Generator("Cheap", capacities=[200] * T, costs=[10] * T, bus=bus1)
+        Generator("Expensive", capacities=[200] * T, costs=[50] * T, bus=bus2)
+        Load("Load", consumptions=[150] * T, bus=bus3)
+        TransmissionLine(bus1, bus2, capacities=[500] * T, network=n)
+        TransmissionLine(bus1, bus3, capacities=[80] * T, network=n)
+        TransmissionLine(bus2, bus3, capacities=[500] * T, network=n)
+        return n
+
+    def test_ptdf_matrix(self):
+        n = self.build()
+        ptdf = n.ptdf()
+        # 1 MW from Bus2 to the Bus1 slack splits 2/3 direct and 1/3 through Bus3
+        np.testing.assert_allclose(ptdf[:, 1], [-2 / 3, -1 / 3, 1 / 3])
+        np.testing.assert_allclose(ptdf[:, 0], 0)
+        self.assertIs(n.ptdf(), ptdf)
+        n.transmission_lines["Bus1_to_Bus3"].reactance = 2.0
+        self.assertIsNot(n.ptdf(), ptdf)
+
+    def test_congested_dispatch_and_prices(self):
+        n = self.build(['t0', 't1'])
+        n.line_table.components[1].capacities = [80, 500]
+        self.assertEqual(n.solve(method="highs", ptdf=True), "Optimal")
+        self.assertEqual(n.solve_stats.method, "highs")
+        outputs = n.generator_table.result('outputs')
+        # Bus1 to Bus3 carries 2/3 of Bus1's output and 1/3 of Bus2's, so the 80 MW limit caps Bus1 at 90 MW
+        np.testing.assert_allclose(outputs, [[90, 150], [60, 0]], atol=1e-6)
+        np.testing.assert_allclose(n.line_table.result('flows')[:, 0], [10, 80, 70], atol=1e-6)
+        self.assertAlmostEqual(n.buses["Bus3"].nodal_prices[0], 90.0)
+        self.assertAlmostEqual(n.buses["Bus2"].nodal_prices[0], 50.0)
+        self.assertAlmostEqual(n.buses["Bus3"].nodal_prices[1], 10.0)
+        # Only the one overloaded line and timestep got a constraint
+        self.assertEqual(n.solve_stats.model_size['transmission_lines']['constraints'], 1)
+
+    def test_needs_highs(self):
+        with self.assertRaises(ValueError):
+            self.build().solve(method="pulp", ptdf=True)
+
+class SolutionSnapshot(unittest.TestCase):
+
+    def test_snapshot_outlives_model(self):
+        n = synthetic_network(4, 12, "meshed")
+        n.solve(method="pulp")
+        solution = n.solution
+        self.assertEqual(solution.status, "Optimal")
+        np.testing.assert_array_equal(solution.result('outputs'), n.generator_table.result('outputs'))
+        np.testing.assert_array_equal(solution.nodal_prices, np.array([b.nodal_prices for b in n.buses.values()], dtype=float))
+        self.assertAlmostEqual(solution.objective, n.model.objective.value(), places=4)
+
+        json_path = os.path.join(output_dir, "snapshot.json")
+        os.makedirs(output_dir, exist_ok=True)
+        save_network_json(n, json_path)
+        with open(json_path) as f:
+            before = f.read()
+        source = draw_network(n, n.timesteps[3]).source
+
+        model = weakref.ref(n.model)
+        n.release_model()
+        gc.collect()
+        self.assertIsNone(model())
+        self.assertIsNone(n.model)
+        save_network_json(n, json_path)
+        with open(json_path) as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(draw_network(n, n.timesteps[3]).source, source)
+
+        # Without a series_dir it is a copy, so later writes to the tables do not reach it
+        n.generator_table.result('outputs')[:] = 0
+        self.assertFalse((solution.result('outputs') == 0).all())
+
+    def test_results_written_outside_solve(self):
+        n = synthetic_network(3, 6, "radial")
+        n.solve(method="highs")
+        self.assertIsNotNone(n.solution)
+        n.solve_window(0, 3, "highs")
+        self.assertIsNone(n.solution)
+        # Save and draw then read the tables directly
+        self.assertIn("£/MWh", draw_network(n, n.timesteps[0]).source)
+
+    def test_disk_backed_snapshot_views_results(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        n = Network("DiskBacked", ['t0', 't1'], series_dir=directory)
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10, 10], costs=[1, 1], bus=bus)
+        load = Load("Load1", consumptions=[4, 6], bus=bus)
+        n.solve(method="pulp")
+        solution = n.solution
+        outputs = solution.result('outputs')
+        self.assertTrue(np.shares_memory(outputs, n.generator_table.result('outputs')))
+        self.assertIsInstance(outputs, np.memmap)
+
+        # A re-solve copies the old snapshot out before overwriting the files
+        load.consumptions = [2, 3]
+        n.solve(method="pulp")
+        np.testing.assert_array_equal(solution.result('outputs'), [[4, 6]])
+        np.testing.assert_array_equal(n.solution.result('outputs'), [[2, 3]])
+        self.assertFalse(np.shares_memory(solution.result('outputs'), n.generator_table.result('outputs')))
+
+class MemoryMappedSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def build(self, timesteps, costs, capacities, consumptions, series_dir=None):
+        n = Network("Mapped", timesteps, series_dir=series_dir)
+        bus1, bus2 = Bus("Bus1", n), Bus("Bus2", n)
+        Generator("Gen1", capacities=capacities[0], costs=costs[0], bus=bus1)
+        Generator("Gen2", capacities=capacities[1], costs=costs[1], bus=bus2)
+        for i, consumption in enumerate(consumptions):
+            Load(f"Load{i}", consumptions=consumption, bus=bus2)
+        TransmissionLine(bus1, bus2, capacities=[15] * len(timesteps), network=n)
+        return n
+
+    def test_mapped_inputs_solve_like_lists(self):
+        # A year of profiles in shared files, the network covers one week starting at timestep 1000
+        T, offset = 168, 1000
+        rng = np.random.default_rng(0)
+        costs = rng.uniform(5, 50, (2, 8760))
+        np.save(os.path.join(self.directory, "costs.npy"), costs)
+        consumptions = rng.uniform(0, 2, (40, 8760))
+        arrow_path = os.path.join(self.directory, "loads.arrow")
+        table = pa.table({f"Load{i}": consumptions[i] for i in range(len(consumptions))})
+        with pa.ipc.new_file(arrow_path, table.schema) as writer:
+            writer.write_table(table)
+        timesteps = list(range(T))
+        capacities = [[40] * T, [60] * T]
+
+        expected = self.build(timesteps, costs[:, offset:offset + T], capacities, consumptions[:, offset:offset + T])
+        mapped = self.build(
+            timesteps,
+            [MappedSeries(os.path.join(self.directory, "costs.npy"), offset, row=i) for i in range(2)],
+            capacities,
+            [MappedSeries(arrow_path, offset, column=f"Load{i}") for i in range(len(consumptions))],
+            series_dir=os.path.join(self.directory, "series"),
+        )
+        self.assertIsInstance(mapped.load_table.arrays['consumptions'], np.memmap)
+        self.assertIsInstance(mapped.generator_table.results['outputs'], np.memmap)
+        # 40 loads grow the table past its first allocation without losing rows
+        np.testing.assert_array_equal(mapped.load_table.column('consumptions'), consumptions[:, offset:offset + T])
+        np.testing.assert_array_equal(mapped.buses["Bus1"].generators["Gen1"].costs, costs[0, offset:offset + T])
+
+        self.assertEqual(mapped.solve(method="highs"), "Optimal")
+        expected.solve(method="highs")
+        np.testing.assert_allclose(mapped.generator_table.result('outputs'), expected.generator_table.result('outputs'))
+        self.assertEqual(network_key(mapped, method="highs"), network_key(expected, method="highs"))
+
+    def test_short_series_rejected(self):
+        np.save(os.path.join(self.directory, "short.npy"), np.ones(10))
+        n = Network("Short", list(range(24)))
+        with self.assertRaises(TimestepLengthMismatch):
+            Load("Load", consumptions=MappedSeries(os.path.join(self.directory, "short.npy")), bus=Bus("Bus", n))
+
+class DuckDBSummaries(unittest.TestCase):
+
+    def test_summary_tables(self):
+        # Two days of hourly timesteps across a month boundary
+        n = synthetic_network(4, 48, "meshed")
+        n.solve(method="highs")
+        timestamps = np.datetime64('2024-01-31T00:00') + np.arange(48) * np.timedelta64(1, 'h')
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, "summaries.db")
+        save_network_duckdb(n, path, summaries=True, timestamps=timestamps)
+
+        with duckdb.connect(path) as conn:
+            # Energy tables add up to the raw generator outputs, per bus and type
+            raw = conn.sql("SELECT bus, generator_type, sum(output) FROM generator_outputs GROUP BY ALL ORDER BY ALL").fetchall()
+            for table in ("energy_daily", "energy_monthly"):
+                summary = conn.sql(f"SELECT bus, generator_type, sum(energy) FROM {table} GROUP BY ALL ORDER BY ALL").fetchall()
+                for (bus, generator_type, energy), (summary_bus, summary_type, summary_energy) in zip(raw, summary):
+                    self.assertEqual((bus, generator_type), (summary_bus, summary_type))
+                    self.assertAlmostEqual(energy, summary_energy, places=4)
+            self.assertEqual(conn.sql("SELECT count(DISTINCT day) FROM energy_daily").fetchone()[0], 2)
+            self.assertEqual([str(m) for (m,) in conn.sql("SELECT DISTINCT month FROM energy_monthly ORDER BY 1").fetchall()],
+                             ['2024-01-01', '2024-02-01'])
+            rows = conn.sql("SELECT bus, day FROM energy_daily").fetchall()
+            self.assertEqual(rows, sorted(rows))
+
+            prices = conn.sql("SELECT price FROM price_duration_curves WHERE bus = 'Bus0' ORDER BY rank").fetchall()
+            self.assertEqual(len(prices), 48)
+            self.assertEqual([p for (p,) in prices], sorted((p for (p,) in prices), reverse=True))
+            self.assertAlmostEqual(prices[0][0], max(n.buses['Bus0'].nodal_prices))
+
+            utilisation = conn.sql("SELECT transmission_line, max_utilisation, congested_timesteps FROM line_utilisation").fetchall()
+            self.assertEqual(len(utilisation), len(n.transmission_lines))
+            for name, max_utilisation, congested in utilisation:
+                line = n.transmission_lines[name]
+                self.assertAlmostEqual(max_utilisation, np.max(np.abs(line.flows.values) / line.capacities), places=6)
+                self.assertEqual(congested, int((np.abs(line.flows.values) >= line.capacities - 1e-6).sum()))
+
+            cycles = dict(conn.sql("SELECT storage_unit, equivalent_full_cycles FROM storage_cycles").fetchall())
+            for su in n.storage_table.components:
+                self.assertAlmostEqual(cycles[su.name], su.charge_inflows.values.sum() * su.charge_efficiency / su.max_soc_capacity, places=6)
+
+            indexes = {name for (name,) in conn.sql("SELECT index_name FROM duckdb_indexes()").fetchall()}
+            self.assertIn("energy_daily_index", indexes)
+
+    def test_energy_tables_need_dates(self):
+        n = synthetic_network(2, 6, "radial")
+        n.solve(method="highs")
+        path = os.path.join(output_dir, "summaries_no_dates.db")
+        os.makedirs(output_dir, exist_ok=True)
+        save_network_duckdb(n, path, summaries=True)
+        with duckdb.connect(path) as conn:
+            tables = {name for (name,) in conn.sql("SELECT table_name FROM duckdb_tables()").fetchall()}
+        self.assertNotIn("energy_daily", tables)
+        self.assertIn("price_duration_curves", tables)
+
+    def test_zero_capacity_lines_are_not_congested(self):
+        n = Network("ZeroCapacity", ['t0', 't1'])
+        bus1, bus2 = Bus("Bus1", n), Bus("Bus2", n)
+        Generator("Gen1", capacities=[10, 10], costs=[1, 1], bus=bus1)
+        Generator("Gen2", capacities=[10, 10], costs=[5, 5], bus=bus2)
+        Load("Load2", consumptions=[4, 4], bus=bus2)
+        TransmissionLine(bus1, bus2, capacities=[0, 0], network=n)
+        n.solve(method="highs")
+        path = os.path.join(output_dir, "summaries_zero_capacity.db")
+        os.makedirs(output_dir, exist_ok=True)
+        save_network_duckdb(n, path, summaries=True)
+        with duckdb.connect(path) as conn:
+            self.assertEqual(conn.sql("SELECT congested_timesteps FROM line_utilisation").fetchone()[0], 0)
+
+    def test_append_adds_label_columns(self):
+        n = synthetic_network(2, 6, "radial")
+        n.solve(method="highs")
+        timestamps = np.datetime64('2024-01-01T00:00') + np.arange(6) * np.timedelta64(1, 'h')
+        path = os.path.join(output_dir, "summaries_append.db")
+        os.makedirs(output_dir, exist_ok=True)
+        save_network_duckdb(n, path, summaries=True, timestamps=timestamps)
+        with DuckDBWriter(path, append=True) as writer:
+            writer.write_network(n, scenario="high_demand")
+            writer.write_summaries(n, timestamps, scenario="high_demand")
+        with duckdb.connect(path) as conn:
+            for table in ("nodal_prices", "energy_daily", "price_duration_curves", "line_utilisation"):
+                counts = conn.sql(f"SELECT scenario, count(*) FROM {table} GROUP BY ALL ORDER BY ALL NULLS FIRST").fetchall()
+                self.assertEqual([scenario for scenario, _ in counts], [None, "high_demand"], table)
+                self.assertEqual(counts[0][1], counts[1][1], table)
+
+    def test_numeric_labels_are_not_dates(self):
+        self.assertIsNone(timestep_times([0, 1, 2]))
+        self.assertIsNone(timestep_times([(0, 'a'), (1, 'b')]))
+        self.assertIsNone(timestep_times(['t0', 't1'], timestamps=[0.0, 1.0]))
+        np.testing.assert_array_equal(
+            timestep_times([('2024-01-01T00:00', 'a'), ('2024-01-01T01:00', 'b')]),
+            np.array(['2024-01-01T00:00', '2024-01-01T01:00'], dtype='datetime64[m]'),
+        )
+
+        n = Network("IntegerTimesteps", [0, 1, 2])
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 3, costs=[1] * 3, bus=bus)
+        Load("Load1", consumptions=[1, 2, 3], bus=bus)
+        n.solve(method="highs")
+        path = os.path.join(output_dir, "summaries_integer_timesteps.db")
+        os.makedirs(output_dir, exist_ok=True)
+        save_network_duckdb(n, path, summaries=True)
+        with duckdb.connect(path) as conn:
+            tables = {name for (name,) in conn.sql("SELECT table_name FROM duckdb_tables()").fetchall()}
+        self.assertNotIn("energy_daily", tables)
+
+class VisualiserHTTPServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.runs = []
+        for name in ['run1', 'run2']:
+            path = os.path.join(self.tmp.name, name)
+            os.makedirs(os.path.join(path, 'data'))
+            with open(os.path.join(path, 'data', 'topology.json'), 'w') as f:
+                json.dump({'name': name, 'values': list(range(1000))}, f)
+            self.runs.append(path)
+        precompress(self.tmp.name)
+        self.server = StoppableHTTPServer(port=0)
+        self.server.mount('run1', self.runs[0])
+        self.server.mount('run2', self.runs[1])
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def get(self, path, **headers):
+        request = urllib.request.Request(f"http://localhost:{self.server.port}{path}", headers=headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+    def test_mounts_compression_and_etag(self):
+        cwd = os.getcwd()
+        status, headers, body = self.get('/run2/data/topology.json')
+        self.assertEqual(status, 200)
+        self.assertIsNone(headers['Content-Encoding'])
+        self.assertEqual(json.loads(body)['name'], 'run2')
+        self.assertEqual(os.getcwd(), cwd)
+
+        status, headers, body = self.get('/run1/data/topology.json', **{'Accept-Encoding': 'gzip'})
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(body))['name'], 'run1')
+        self.assertEqual(headers['Cache-Control'], 'no-cache')
+
+        status, _, body = self.get('/run1/data/topology.json', **{'Accept-Encoding': 'gzip', 'If-None-Match': headers['ETag']})
+        self.assertEqual((status, body), (304, b''))
+        self.assertEqual(self.get('/run3/data/topology.json')[0], 404)
+
+    def test_byte_ranges(self):
+        _, _, full = self.get('/run1/data/topology.json')
+        status, headers, body = self.get('/run1/data/topology.json', Range='bytes=10-19')
+        self.assertEqual((status, body), (206, full[10:20]))
+        self.assertEqual(headers['Content-Range'], f'bytes 10-19/{len(full)}')
+        self.assertEqual(self.get('/run1/data/topology.json', Range='bytes=-5')[2], full[-5:])
+        self.assertEqual(self.get('/run1/data/topology.json', Range=f'bytes={len(full)}-')[0], 416)
+
+    def test_slow_client_does_not_block(self):
+        # A connection that never finishes its request holds only its own thread
+        with socket.create_connection(('localhost', self.server.port)) as stalled:
+            stalled.sendall(b'GET /run1/data/topology.json HTTP/1.1\r\n')
+            self.assertEqual(self.get('/run2/data/topology.json')[0], 200)
+            stalled.sendall(b'Connection: close\r\n\r\n')
+            self.assertTrue(stalled.recv(1024).startswith(b'HTTP/1.0 200'))
+
+
+class BatchRendering(unittest.TestCase):
+
+    def build(self):
+        n = Network("Frames", ['t0', 't1', 't2'])
+        bus = Bus("Bus1", n)
+        Generator("Gen1", capacities=[10] * 3, costs=[1, 2, 3], bus=bus)
+        Load("Load1", consumptions=[3, 5, 7], bus=bus)
+        n.solve()
+        return n
+
+    def test_layout_pins_nodes(self):
+        n = self.build()
+        dot = draw_network(n, 't1', layout={'Bus1': '10,20', 'Gen1': '100,20'})
+        self.assertEqual(dot.engine, 'neato')
+        self.assertIn('pos="10,20"', dot.source)
+        self.assertIn('pos="100,20"', dot.source)
+        self.assertNotIn('pos=', draw_network(n, 't1').source)
+
+    def test_few_frames_render_without_a_pool(self):
+        n = self.build()
+        # Without an animation Pillow is never imported
+        with mock.patch('microgrid.draw.network_layout', return_value={}), \
+                mock.patch('microgrid.draw._render_frame', side_effect=lambda job: job[1]), \
+                mock.patch('microgrid.draw.ProcessPoolExecutor') as executor, \
+                mock.patch.dict('sys.modules', {'PIL': None}):
+            paths = render_frames(n, 'frame')
+        executor.assert_not_called()
+        self.assertEqual(paths, ['frame_t0', 'frame_t1', 'frame_t2'])
+
+    @unittest.skipUnless(shutil.which('dot'), "graphviz binaries not installed")
+    def test_render_frames_and_animation(self):
+        n = self.build()
+        os.makedirs(os.path.join(output_dir, n.name), exist_ok=True)
+        prefix = os.path.join(output_dir, n.name, n.name)
+        paths = render_frames(n, prefix, max_workers=2, animation=f"{prefix}.gif")
+        self.assertEqual(len(paths), 3)
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+        self.assertTrue(os.path.exists(f"{prefix}.gif"))
+
 
 if __name__ == "__main__":
     unittest.main()
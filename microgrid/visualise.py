@@ -8,30 +8,321 @@ import time
 import socket
 import threading
 import http.server
-import socketserver
+import gzip
+import urllib.parse
+from http import HTTPStatus
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Path to the visualisation folder
 VISUALISE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "visualise")
 
+# Timesteps per snapshot chunk, and the longest series sent to a chart without downsampling
+CHUNK_SIZE = 168
+MAX_CHART_POINTS = 2000
+
+def bucket_bounds(n_values, n_buckets):
+    return [round(i * n_values / n_buckets) for i in range(n_buckets + 1)]
+
+def downsample_indices(n_values, n_buckets):
+    # Where the points of downsample are drawn: the start and middle of each bucket (one point for a bucket of one)
+    bounds = bucket_bounds(n_values, n_buckets)
+    return [i for a, b in zip(bounds[:-1], bounds[1:]) for i in ([a, (a + b) // 2] if b - a > 1 else [a])]
+
+def downsample(values, n_buckets):
+    # Smallest and largest value of each of n_buckets consecutive buckets, in the order they occur, so peaks
+    # and troughs survive. None (unsolved) values are skipped, and a bucket of only None stays None
+    bounds = bucket_bounds(len(values), n_buckets)
+    points = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        solved = [(v, i) for i, v in enumerate(values[a:b]) if v is not None]
+        if not solved:
+            points.extend([None] * min(b - a, 2))
+        elif b - a == 1:
+            points.append(solved[0][0])
+        else:
+            low, high = min(solved), max(solved, key=lambda p: (p[0], -p[1]))
+            points.extend(v for v, _ in sorted([low, high], key=lambda p: p[1]))
+    return points
+
+def write_chunked_data(network_data, data_dir, chunk_size=CHUNK_SIZE, max_points=MAX_CHART_POINTS):
+    """
+    Split a result JSON (see save_network_json) into the small files the visualiser fetches lazily:
+
+        topology.json                  names, buses, line ends and timesteps - no series
+        snapshots/<chunk>.json         every value shown on the network for chunk_size timesteps
+        series/<kind>/<i>.json         the full time series of one component (index into topology)
+        series/<kind>/<i>.downsampled.json  the same series as about max_points bucket minima and maxima, for long runs
+    """
+    network = network_data['network']
+    buses = network['buses']
+    timesteps = network['timesteps']
+    n_timesteps = len(timesteps)
+
+    # Component lists in a fixed order, series are addressed by position in these lists
+    components = {
+        'buses': [(name, bus) for name, bus in buses.items()],
+        'generators': [(name, g) for bus in buses.values() for name, g in bus['generators'].items()],
+        'loads': [(name, l) for bus in buses.values() for name, l in bus['loads'].items()],
+        'storage_units': [(name, su) for bus in buses.values() for name, su in bus['storage_units'].items()],
+        'transmission_lines': [(name, t) for name, t in network['transmission_lines'].items()],
+    }
+    series_keys = {
+        'buses': ['nodal_prices'],
+        'generators': ['outputs', 'capacities', 'costs'],
+        'loads': ['consumptions'],
+        'storage_units': ['soc_start_of_ts', 'soc_end_of_ts', 'charge_inflows', 'discharge_outflows', 'consumptions'],
+        'transmission_lines': ['flows', 'capacities'],
+    }
+    index = {kind: {name: i for i, (name, _) in enumerate(items)} for kind, items in components.items()}
+    downsampled = n_timesteps > max_points
+    # Two points (a minimum and a maximum) per bucket
+    n_buckets = max(1, max_points // 2)
+
+    topology = {
+        'name': network['name'],
+        'timesteps': timesteps,
+        'chunk_size': chunk_size,
+        'downsampled': downsampled,
+        'buses': [
+            {
+                'name': name,
+                'generators': [index['generators'][g] for g in bus['generators']],
+                'loads': [index['loads'][l] for l in bus['loads']],
+                'storage_units': [index['storage_units'][su] for su in bus['storage_units']],
+            }
+            for name, bus in components['buses']
+        ],
+        'generators': [{'name': name, 'bus': bus_name} for bus_name, bus in buses.items() for name in bus['generators']],
+        'loads': [{'name': name, 'bus': bus_name} for bus_name, bus in buses.items() for name in bus['loads']],
+        'storage_units': [{'name': name, 'bus': bus_name} for bus_name, bus in buses.items() for name in bus['storage_units']],
+        'transmission_lines': [
+            {'name': name, 'start_bus': t['start_bus'], 'end_bus': t['end_bus']}
+            for name, t in components['transmission_lines']
+        ],
+    }
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, 'topology.json'), 'w') as f:
+        json.dump(topology, f)
+
+    # Snapshots: values[kind][key][timestep in chunk][component]
+    os.makedirs(os.path.join(data_dir, 'snapshots'), exist_ok=True)
+    for chunk, start in enumerate(range(0, n_timesteps, chunk_size)):
+        stop = min(start + chunk_size, n_timesteps)
+        snapshot = {'start': start, 'stop': stop}
+        for kind, items in components.items():
+            snapshot[kind] = {
+                key: [[item[key][t] for _, item in items] for t in range(start, stop)]
+                for key in series_keys[kind]
+            }
+        with open(os.path.join(data_dir, 'snapshots', f"{chunk}.json"), 'w') as f:
+            json.dump(snapshot, f)
+
+    for kind, items in components.items():
+        os.makedirs(os.path.join(data_dir, 'series', kind), exist_ok=True)
+        for i, (name, item) in enumerate(items):
+            series = {key: item[key] for key in series_keys[kind]}
+            with open(os.path.join(data_dir, 'series', kind, f"{i}.json"), 'w') as f:
+                json.dump({'name': name, **series}, f)
+            if downsampled:
+                with open(os.path.join(data_dir, 'series', kind, f"{i}.downsampled.json"), 'w') as f:
+                    json.dump({
+                        'name': name,
+                        'timestep_indices': downsample_indices(n_timesteps, n_buckets),
+                        **{key: downsample(values, n_buckets) for key, values in series.items()},
+                    }, f)
+
+    print(f"Wrote {len(range(0, n_timesteps, chunk_size))} snapshot chunks and series for {sum(len(items) for items in components.values())} components to {data_dir}")
+
+
 # Function to find an available port
 def find_free_port():
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind(('', 0))
         return s.getsockname()[1]
 
+# Encodings the server can send pre-compressed files in, most preferred first, and their file suffixes
+ENCODINGS = {'br': '.br', 'gzip': '.gz'} if brotli else {'gzip': '.gz'}
+COMPRESSIBLE = ('.json', '.js', '.css', '.html', '.svg', '.txt')
+# Files smaller than this are sent as they are
+MIN_COMPRESS_BYTES = 1024
+
+def precompress(directory, min_bytes=MIN_COMPRESS_BYTES):
+    """
+    Write a .gz (and, with brotli installed, a .br) copy next to every text asset under directory, for
+    the server to send to clients that accept them. Copies already newer than their file are kept.
+    """
+    written = 0
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if not filename.endswith(COMPRESSIBLE) or os.path.getsize(path) < min_bytes:
+                continue
+            data = None
+            for encoding, suffix in ENCODINGS.items():
+                if os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= os.path.getmtime(path):
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                compressed = brotli.compress(data) if encoding == 'br' else gzip.compress(data, mtime=0)
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    print(f"Pre-compressed {written} files in {directory}")
+
+class VisualiserRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves files from the directories mounted on the server without changing the working directory.
+    Files are sent pre-compressed when the client accepts it (see precompress), with an ETag to
+    revalidate against and single byte Range support.
+    """
+    def translate_path(self, path):
+        # /<name>/... is served from the directory mounted as name, anything else from the one at the root
+        directories = self.server.directories
+        name, _, rest = urllib.parse.urlsplit(path).path.lstrip('/').partition('/')
+        if name in directories:
+            self.directory = directories[name]
+            return super().translate_path('/' + rest)
+        if '' in directories:
+            self.directory = directories['']
+            return super().translate_path(path)
+        return ''
+
+    def end_headers(self):
+        if self.command in ('GET', 'HEAD'):
+            # Results are rewritten in place, so always revalidate against the ETag
+            self.send_header('Cache-Control', 'no-cache')
+        super().end_headers()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            # Directories (index.html, listings and redirects) and 404s
+            return super().send_head()
+
+        content_type = self.guess_type(path)
+        encoding = None
+        accepted = {part.split(';')[0].strip() for part in self.headers.get('Accept-Encoding', '').split(',')}
+        for candidate, suffix in ENCODINGS.items():
+            if candidate in accepted and os.path.isfile(path + suffix) \
+                    and os.path.getmtime(path + suffix) >= os.path.getmtime(path):
+                encoding = candidate
+                path += suffix
+                break
+
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        try:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}{"-" + encoding if encoding else ""}"'
+            if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header('ETag', etag)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                f.close()
+                return None
+
+            start, stop = 0, size
+            byte_range = self.byte_range(size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                f.close()
+                return None
+            if byte_range and self.headers.get('If-Range', etag) == etag:
+                start, stop = byte_range
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header('Content-Range', f'bytes {start}-{stop - 1}/{size}')
+            else:
+                self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', content_type)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(stop - start))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+            self.end_headers()
+            f.seek(start)
+            return _RangeFile(f, stop - start)
+        except Exception:
+            f.close()
+            raise
+
+    def byte_range(self, size):
+        # (start, stop) of a single 'bytes=' Range header, None to send the whole file, or 'unsatisfiable'
+        header = self.headers.get('Range', '')
+        if not header.startswith('bytes=') or ',' in header:
+            return None
+        first, _, last = header[len('bytes='):].strip().partition('-')
+        try:
+            if not first:
+                start, stop = max(size - int(last), 0), size
+            else:
+                start, stop = int(first), min(int(last) + 1, size) if last else size
+        except ValueError:
+            return None
+        if start >= size or start >= stop:
+            return 'unsatisfiable'
+        return start, stop
+
+class _RangeFile:
+    # The first length bytes of an open file, for copyfile to send
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, n=-1):
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        data = self.f.read(n)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+class VisualiserServer(http.server.ThreadingHTTPServer):
+    # One thread per request, so slow downloads do not hold up other clients
+    daemon_threads = True
+
+    def __init__(self, address, directories=None):
+        self.directories = dict(directories or {})
+        super().__init__(address, VisualiserRequestHandler)
+
 # HTTP Server class that can be stopped
 class StoppableHTTPServer(threading.Thread):
-    def __init__(self, directory, port=8000):
+    """
+    Serves directory at the root of http://localhost:port, or nothing at the root when it is None.
+    mount() adds more result directories under /<name>/ while the server runs, so one process can
+    serve many of them. port=0 picks a free port.
+    """
+    def __init__(self, directory=None, port=8000):
         super().__init__(daemon=True)
         self.directory = directory
-        self.port = port
-        self.server = None
+        self.server = VisualiserServer(("", port), {'': os.path.abspath(directory)} if directory else {})
+        self.port = self.server.server_address[1]
         self.running = False
-        
+
+    def mount(self, name, directory):
+        """Serve directory under /<name>/ and return its URL."""
+        self.server.directories[name] = os.path.abspath(directory)
+        return f"http://localhost:{self.port}/{name}/"
+
+    def unmount(self, name):
+        self.server.directories.pop(name, None)
+
     def run(self):
-        handler = http.server.SimpleHTTPRequestHandler
-        os.chdir(self.directory)  # Change to the directory to serve
-        self.server = socketserver.TCPServer(("", self.port), handler)
         self.running = True
         print(f"Serving at http://localhost:{self.port}")
         self.server.serve_forever()
@@ -42,15 +333,17 @@ class StoppableHTTPServer(threading.Thread):
             self.server.shutdown()
             self.server.server_close()
 
-def visualise(json_file_path, output_dir, open_browser=True):
+def visualise(json_file_path, output_dir, open_browser=True, server=None):
     """
-    Create a visualization of a microgrid network by copying the visualization files and JSON data.
-    Serves the files using a local HTTP server to avoid CORS issues.
+    Create a visualization of a microgrid network by copying the visualization files and splitting the
+    JSON data into chunks (see write_chunked_data). Serves the files using a local HTTP server to avoid CORS issues.
     
     Args:
         json_file_path (str, optional): Path to the JSON file containing network data.
         output_dir (str, optional): Directory where the visualization files should be saved. If None, a temporary directory is created.
         open_browser (bool, optional): Whether to open the HTML file in a browser. Defaults to True.
+        server (StoppableHTTPServer, optional): A running server to mount the output directory on, under its
+            folder name, instead of starting one and blocking until Ctrl+C.
     
     Returns:
         str: Path to the output directory.
@@ -73,17 +366,24 @@ def visualise(json_file_path, output_dir, open_browser=True):
         print(f"Error copying visualization files: {e}")
         return None
     
-    # Copy the JSON file to the output directory as data.json
+    # Split the JSON file into the chunked files under data/ that the page fetches as it needs them
     try:
         if json_file_path:
-            # Copy the JSON file to data.json in the output directory
-            dest_json_path = os.path.join(output_dir, 'data.json')
-            shutil.copy2(json_file_path, dest_json_path)
-            print(f"Copied JSON data to {dest_json_path}")
+            with open(json_file_path) as f:
+                network_data = json.load(f)
+            write_chunked_data(network_data, os.path.join(output_dir, 'data'))
     except Exception as e:
         print(f"Error handling JSON data: {e}")
     
+    precompress(output_dir)
     print(f"Visualization saved to: {output_dir}")
+
+    if server is not None:
+        url = server.mount(os.path.basename(os.path.normpath(output_dir)), output_dir) + "index.html"
+        print(f"Serving visualization at {url}")
+        if open_browser:
+            webbrowser.open(url)
+        return output_dir
     
     # Start a local HTTP server to serve the files
     if open_browser:
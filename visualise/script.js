@@ -3,7 +3,9 @@ document.addEventListener('DOMContentLoaded', () => {
     console.log('DOM content loaded');
     
     // Initialize with empty network data
-    let networkData = null;
+    // Only the topology is loaded up front - snapshots and series are fetched as they are shown
+    let topology = null;
+    let componentIndex = null;
     let visNodes = null;
     let visEdges = null;
     let generatorChart; // global ref so we can destroy/update later
@@ -11,47 +13,237 @@ document.addEventListener('DOMContentLoaded', () => {
     let storageChart; // global ref so we can destroy/update later
     let loadChart; // global ref so we can destroy/update later
 
-    // Load network data from data.json
-    fetch('data.json')
+    // Client side caches of fetched chunks and series, keyed by URL
+    const snapshotCache = new Map();
+    const seriesCache = new Map();
+
+    function fetchJSON(url, cache) {
+        if (!cache.has(url)) {
+            cache.set(url, fetch(url).then(response => {
+                if (!response.ok) throw new Error(`${url}: ${response.status}`);
+                return response.json();
+            }).catch(error => {
+                cache.delete(url); // let a later request retry
+                throw error;
+            }));
+        }
+        return cache.get(url);
+    }
+
+    // Values shown on the network at one timestep, read from the chunk that holds it
+    function getSnapshot(timestepIndex) {
+        const chunk = Math.floor(timestepIndex / topology.chunk_size);
+        return fetchJSON(`data/snapshots/${chunk}.json`, snapshotCache).then(data => {
+            const row = timestepIndex - data.start;
+            return {
+                value: (kind, key, i) => {
+                    const values = data[kind] && data[kind][key] && data[kind][key][row];
+                    return values && values[i] !== undefined && values[i] !== null ? values[i] : undefined;
+                }
+            };
+        });
+    }
+
+    // Full (or pre-downsampled) time series of one component - full always gives every timestep
+    function getSeries(kind, name, full = false) {
+        const i = componentIndex[kind][name];
+        const suffix = topology.downsampled && !full ? '.downsampled' : '';
+        return fetchJSON(`data/series/${kind}/${i}${suffix}.json`, seriesCache);
+    }
+
+    // Timestep index of every point of a series, matching the downsampled points when there are any
+    function seriesIndices(series) {
+        return series.timestep_indices || topology.timesteps.map((_, i) => i);
+    }
+
+    function timestepName(i) {
+        const timestep = topology.timesteps[i];
+        return Number.isInteger(i) && timestep ? String(timestep[1]) : '';
+    }
+
+    // Most points a chart draws per dataset. After every zoom or pan the visible range is re-sampled
+    // from the full series, so detail appears as you zoom in
+    const CHART_POINTS = 1000;
+
+    // First position in the sorted xs not below x
+    function bisect(xs, x) {
+        let lo = 0, hi = xs.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (xs[mid] < x) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    function range(start, stop) {
+        return Array.from({ length: Math.max(stop - start, 0) }, (_, i) => start + i);
+    }
+
+    // Largest-Triangle-Three-Buckets: positions in [start, stop) of n points that keep the line's shape,
+    // peaks and troughs included
+    function lttb(xs, ys, start, stop, n) {
+        const count = stop - start;
+        if (count <= n || n < 3) return range(start, stop);
+        const y = j => ys[j] || 0;
+        const every = (count - 2) / (n - 2);
+        const picked = [start];
+        let a = start;
+        for (let i = 0; i < n - 2; i++) {
+            const bucketStart = start + 1 + Math.floor(i * every);
+            const bucketStop = start + 1 + Math.floor((i + 1) * every);
+            // The third corner of each triangle is the mean of the next bucket
+            const nextStop = Math.min(start + 1 + Math.floor((i + 2) * every), stop);
+            let meanX = 0, meanY = 0;
+            for (let j = bucketStop; j < nextStop; j++) {
+                meanX += xs[j];
+                meanY += y(j);
+            }
+            meanX /= Math.max(nextStop - bucketStop, 1);
+            meanY /= Math.max(nextStop - bucketStop, 1);
+
+            let best = bucketStart, bestArea = -1;
+            for (let j = bucketStart; j < bucketStop; j++) {
+                const area = Math.abs((xs[a] - meanX) * (y(j) - y(a)) - (xs[a] - xs[j]) * (meanY - y(a)));
+                if (area > bestArea) {
+                    bestArea = area;
+                    best = j;
+                }
+            }
+            picked.push(best);
+            a = best;
+        }
+        picked.push(stop - 1);
+        return picked;
+    }
+
+    // Positions in [start, stop) of the smallest and largest value of every series in each bucket, shared
+    // by all of them so stacked bars line up
+    function minMax(seriesValues, start, stop, n) {
+        const count = stop - start;
+        if (count <= n) return range(start, stop);
+        const buckets = Math.max(1, Math.floor(n / (2 * seriesValues.length)));
+        const picked = new Set();
+        for (let b = 0; b < buckets; b++) {
+            const bucketStart = start + Math.floor(b * count / buckets);
+            const bucketStop = start + Math.floor((b + 1) * count / buckets);
+            for (const values of seriesValues) {
+                let low = bucketStart, high = bucketStart;
+                for (let j = bucketStart; j < bucketStop; j++) {
+                    if (values[j] < values[low]) low = j;
+                    if (values[j] > values[high]) high = j;
+                }
+                picked.add(low);
+                picked.add(high);
+            }
+        }
+        return Array.from(picked).sort((p, q) => p - q);
+    }
+
+    function format(value) {
+        return value !== undefined ? value.toFixed(2) : 'N/A';
+    }
+
+    fetch('data/topology.json')
         .then(response => response.json())
         .then(data => {
-            networkData = data;
-            console.log('Network data loaded successfully');
+            topology = data;
+            componentIndex = {};
+            for (const kind of ['buses', 'generators', 'loads', 'storage_units', 'transmission_lines']) {
+                componentIndex[kind] = {};
+                topology[kind].forEach((component, i) => { componentIndex[kind][component.name] = i; });
+            }
+            console.log('Network topology loaded successfully');
             
             // Set up the timestep slider based on the data
-            setupTimestepSlider(networkData);
+            setupTimestepSlider(topology);
             
-            // Draw the network with the loaded data
-            drawNetwork(networkData, 0);
+            // Draw the network with the first timestep
+            return getSnapshot(0).then(snapshot => drawNetwork(topology, snapshot));
         })
         .catch(error => {
             console.error('Error loading network data:', error);
-            // Draw sample network if data loading fails
-            drawNetwork(null, 0);
         });
     
     // DOM elements
     const graphPopup = document.getElementById('graph-popup');
     const closeGraphBtn = document.getElementById('close-graph-btn');
     const timestepSlider = document.getElementById('timestep-slider');
+    const playBtn = document.getElementById('play-btn');
     
     // Event listeners
     closeGraphBtn.addEventListener('click', () => {
         hideGraphPopup();
     });
     
+    // Slider input is coalesced to one update per animation frame, however fast events arrive
+    let pendingTimestep = null;
     timestepSlider.addEventListener('input', (e) => {
-        const timestepIndex = parseInt(e.target.value, 10);
-        console.log(`Timestep changed to index: ${timestepIndex}`);
-        // Update visualization based on timestep
-        updateVisualization(timestepIndex);
+        stopPlaying();
+        if (pendingTimestep === null) {
+            requestAnimationFrame(() => {
+                const timestepIndex = pendingTimestep;
+                pendingTimestep = null;
+                showTimestep(timestepIndex);
+            });
+        }
+        pendingTimestep = parseInt(e.target.value, 10);
+    });
+
+    playBtn.addEventListener('click', () => {
+        if (playing) stopPlaying(); else startPlaying();
     });
+
+    // Index of the latest requested timestep, so slow chunk fetches can't overwrite a newer one
+    let requestedTimestep = 0;
+
+    // Play mode advances by wall clock time, skipping timesteps when a frame runs late, so playback
+    // keeps a steady rate however large the network is
+    const PLAY_TIMESTEPS_PER_SECOND = 10;
+    let playing = false;
+    let playStart = 0;
+    let playFrom = 0;
+
+    function startPlaying() {
+        if (!topology) return;
+        playing = true;
+        playStart = performance.now();
+        playFrom = parseInt(timestepSlider.value, 10);
+        playBtn.textContent = 'Pause';
+        requestAnimationFrame(playFrame);
+    }
+
+    function stopPlaying() {
+        playing = false;
+        playBtn.textContent = 'Play';
+    }
+
+    function playFrame(now) {
+        if (!playing) return;
+        const numTimesteps = topology.timesteps.length;
+        const timestepIndex = (playFrom + Math.floor((now - playStart) * PLAY_TIMESTEPS_PER_SECOND / 1000)) % numTimesteps;
+        if (timestepIndex !== requestedTimestep) {
+            showTimestep(timestepIndex);
+            // Fetch the next chunk ahead of time so playback does not stall at chunk boundaries
+            getSnapshot(Math.min(timestepIndex + topology.chunk_size, numTimesteps - 1)).catch(() => {});
+        }
+        requestAnimationFrame(playFrame);
+    }
+
+    // Move the slider and its label to a timestep and show it on the network
+    function showTimestep(timestepIndex) {
+        timestepSlider.value = timestepIndex;
+        const timestepLabel = document.getElementById('timestep-label');
+        if (timestepLabel && topology.timesteps[timestepIndex]) {
+            timestepLabel.textContent = `Time: ${topology.timesteps[timestepIndex][1]}`;
+        }
+        updateVisualization(timestepIndex);
+    }
     
     // Set up the timestep slider based on the data
     function setupTimestepSlider(data) {
-        if (!data || !data.network || !data.network.timesteps) return;
+        if (!data || !data.timesteps) return;
         
-        const timesteps = data.network.timesteps;
+        const timesteps = data.timesteps;
         const numTimesteps = timesteps.length;
         
         // Set the max value of the slider to the number of timesteps - 1
@@ -69,14 +261,6 @@ document.addEventListener('DOMContentLoaded', () => {
         if (timestepControl && !document.getElementById('timestep-label')) {
             timestepControl.appendChild(timestepLabel);
         }
-        
-        // Update the label when the slider changes
-        timestepSlider.addEventListener('input', (e) => {
-            const index = parseInt(e.target.value, 10);
-            if (timestepLabel && timesteps[index]) {
-                timestepLabel.textContent = `Time: ${timesteps[index][1]}`;
-            }
-        });
     }
     
     // Functions
@@ -106,10 +290,10 @@ document.addEventListener('DOMContentLoaded', () => {
     // Keep track of the network instance
     let networkInstance = null;
     
-    function drawNetwork(networkData, timestepIndex) {
+    function drawNetwork(topology, snapshot) {
         // This will be called just once when the page loads
 
-        console.log('Drawing network with data:', networkData);
+        console.log('Drawing network with topology:', topology);
         
         // Create a network
         var container = document.getElementById('network-visualization');
@@ -142,12 +326,9 @@ document.addEventListener('DOMContentLoaded', () => {
         var edges = [];
 
         // Add bus nodes
-        for (let bus in networkData.network.buses) {
-            const busData = networkData.network.buses[bus];
-            const nodalPrice = busData.nodal_prices && busData.nodal_prices[timestepIndex] !== undefined 
-                ? busData.nodal_prices[timestepIndex].toFixed(2) 
-                : 'N/A';
-            
+        topology.buses.forEach((busData, i) => {
+            const bus = busData.name;
+            const nodalPrice = format(snapshot.value('buses', 'nodal_prices', i));
 
                 nodes.push({
                     id: bus,
@@ -160,166 +341,142 @@ document.addEventListener('DOMContentLoaded', () => {
                     type: 'bus'
                 });
             
-        }
+        });
 
         // Add generator nodes
-        for (let bus in networkData.network.buses) {
-            for (let generator in networkData.network.buses[bus].generators) {
-                const generatorData = networkData.network.buses[bus].generators[generator];
-                const output = generatorData.outputs && generatorData.outputs[timestepIndex] !== undefined 
-                    ? generatorData.outputs[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const capacity = generatorData.capacities && generatorData.capacities[timestepIndex] !== undefined
-                    ? generatorData.capacities[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                nodes.push({
-                    id: generator,
-                    label: `${generator}\nOutput: ${output} / ${capacity}`,
-                    shape: 'box',
-                    color: {
-                        background: '#FFD700',
-                        border: '#FF8C00'
-                    },
-                    type: 'generator'
-                });
+        topology.generators.forEach((generatorData, i) => {
+            const generator = generatorData.name;
+            const output = format(snapshot.value('generators', 'outputs', i));
+            const capacity = format(snapshot.value('generators', 'capacities', i));
+            nodes.push({
+                id: generator,
+                label: `${generator}\nOutput: ${output} / ${capacity}`,
+                shape: 'box',
+                color: {
+                    background: '#FFD700',
+                    border: '#FF8C00'
+                },
+                type: 'generator'
+            });
 
-                edges.push({
-                    id: generator,
-                    from: generator,
-                    to: bus,
-                    color: { color: 'blue' },
-                    label: `${output}`
-                });
-            }
-        }
+            edges.push({
+                id: generator,
+                from: generator,
+                to: generatorData.bus,
+                color: { color: 'blue' },
+                label: `${output}`
+            });
+        });
 
         // Add demand nodes
-        for (let bus in networkData.network.buses) {
-            for (let load in networkData.network.buses[bus].loads) {
-                const loadData = networkData.network.buses[bus].loads[load];
-                const consumption = loadData.consumptions && loadData.consumptions[timestepIndex] !== undefined 
-                    ? loadData.consumptions[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                nodes.push({
-                    id: load,
-                    label: `${load}\nConsumption: ${consumption}`,
-                    shape: 'box',
-                    color: {
-                        background: '#FFD700',
-                        border: '#FF8C00'
-                    },
-                    type: 'load'
-                });
-                if (consumption > 0){
-                edges.push({
-                    id: load,
-                    from: bus,
-                    to: load,
-                    color: { color: 'blue' },
-                    label: `${consumption}`
-                })
-            } else if (consumption < 0) {
-                edges.push({
-                    id: load,
-                    from: load,
-                    to: bus,
-                    color: { color: 'blue' },
-                    label: `${-consumption}`
-                })
+        topology.loads.forEach((loadData, i) => {
+            const load = loadData.name;
+            const bus = loadData.bus;
+            const consumption = format(snapshot.value('loads', 'consumptions', i));
+            nodes.push({
+                id: load,
+                label: `${load}\nConsumption: ${consumption}`,
+                shape: 'box',
+                color: {
+                    background: '#FFD700',
+                    border: '#FF8C00'
+                },
+                type: 'load'
+            });
+            if (consumption > 0){
+            edges.push({
+                id: load,
+                from: bus,
+                to: load,
+                color: { color: 'blue' },
+                label: `${consumption}`
+            })
+        } else if (consumption < 0) {
+            edges.push({
+                id: load,
+                from: load,
+                to: bus,
+                color: { color: 'blue' },
+                label: `${-consumption}`
+            })
 
-            }
-            }
         }
+        });
 
         // Add storage unit nodes
-        for (let bus in networkData.network.buses) {
-            for (let storage in networkData.network.buses[bus].storage_units) {
-                const storageData = networkData.network.buses[bus].storage_units[storage];
-                const start_soc = storageData.soc_start_of_ts && storageData.soc_start_of_ts[timestepIndex] !== undefined 
-                    ? storageData.soc_start_of_ts[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const end_soc = storageData.soc_end_of_ts && storageData.soc_end_of_ts[timestepIndex] !== undefined 
-                    ? storageData.soc_end_of_ts[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const charge_inflow = storageData.charge_inflows && storageData.charge_inflows[timestepIndex] !== undefined 
-                    ? storageData.charge_inflows[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const discharge_outflow = storageData.discharge_outflows && storageData.discharge_outflows[timestepIndex] !== undefined 
-                    ? storageData.discharge_outflows[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const net_inflow = charge_inflow - discharge_outflow;
-                const consumption = storageData.consumptions && storageData.consumptions[timestepIndex] !== undefined 
-                    ? storageData.consumptions[timestepIndex].toFixed(2)
-                    : 'N/A';
-                    
-
-                // Add the storage unit
-                nodes.push({
-                    id: storage,
-                    label: `${storage}\nStart SOC: ${start_soc}\nEnd SOC: ${end_soc}`,
-                    shape: 'ellipse',
-                    color: {
-                        background: '#FFD700',
-                        border: '#FF8C00'
-                    },
-                    type: 'storage'
-                });
+        topology.storage_units.forEach((storageData, i) => {
+            const storage = storageData.name;
+            const bus = storageData.bus;
+            const start_soc = format(snapshot.value('storage_units', 'soc_start_of_ts', i));
+            const end_soc = format(snapshot.value('storage_units', 'soc_end_of_ts', i));
+            const charge_inflow = format(snapshot.value('storage_units', 'charge_inflows', i));
+            const discharge_outflow = format(snapshot.value('storage_units', 'discharge_outflows', i));
+            const net_inflow = charge_inflow - discharge_outflow;
+            const consumption = format(snapshot.value('storage_units', 'consumptions', i));
+                
 
-                // Add the storage unit energy sync
-                nodes.push({
-                    id: `${storage}_consumption`,
-                    label: `${storage}\nConsumption: ${consumption}`,
-                    shape: 'box',
-                    color: {
-                        background: '#FFD700',
-                        border: '#FF8C00'
-                    },
-                    type: 'storage_consumption'
-                });
+            // Add the storage unit
+            nodes.push({
+                id: storage,
+                label: `${storage}\nStart SOC: ${start_soc}\nEnd SOC: ${end_soc}`,
+                shape: 'ellipse',
+                color: {
+                    background: '#FFD700',
+                    border: '#FF8C00'
+                },
+                type: 'storage'
+            });
 
+            // Add the storage unit energy sync
+            nodes.push({
+                id: `${storage}_consumption`,
+                label: `${storage}\nConsumption: ${consumption}`,
+                shape: 'box',
+                color: {
+                    background: '#FFD700',
+                    border: '#FF8C00'
+                },
+                type: 'storage_consumption'
+            });
 
 
-                if (net_inflow > 0) {
-                    edges.push({
-                        id: storage,
-                        from: bus,
-                        to: storage,
-                        color: { color: 'blue' },
-                        label: `${net_inflow}`
-                    })
-                } else {
-                    edges.push({
-                        id: storage,
-                        from: storage,
-                        to: bus,
-                        color: { color: 'blue' },
-                        label: `${-net_inflow}`
-                    })
-                }
 
-                // Add the storage unit energy sync edge
+            if (net_inflow > 0) {
                 edges.push({
-                    id: `${storage}_consumption`,
+                    id: storage,
+                    from: bus,
+                    to: storage,
+                    color: { color: 'blue' },
+                    label: `${net_inflow}`
+                })
+            } else {
+                edges.push({
+                    id: storage,
                     from: storage,
-                    to: `${storage}_consumption`,
+                    to: bus,
                     color: { color: 'blue' },
-                    label: `${consumption}`
+                    label: `${-net_inflow}`
                 })
-
             }
-        }
+
+            // Add the storage unit energy sync edge
+            edges.push({
+                id: `${storage}_consumption`,
+                from: storage,
+                to: `${storage}_consumption`,
+                color: { color: 'blue' },
+                label: `${consumption}`
+            })
+
+        });
 
 
         
         // Add transmission lines
-        for (let line in networkData.network.transmission_lines) {
-            let lineData = networkData.network.transmission_lines[line];
-            const flow = lineData.flows && lineData.flows[timestepIndex] !== undefined 
-                ? lineData.flows[timestepIndex].toFixed(2) 
-                : 'N/A';
-            const capacity = lineData.capacities && lineData.capacities[timestepIndex] !== undefined
-                ? lineData.capacities[timestepIndex].toFixed(2) 
-                : 'N/A';
+        topology.transmission_lines.forEach((lineData, i) => {
+            const line = lineData.name;
+            const flow = format(snapshot.value('transmission_lines', 'flows', i));
+            const capacity = format(snapshot.value('transmission_lines', 'capacities', i));
             if (flow > 0) {
                 edges.push({
                     id: line,
@@ -338,7 +495,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 })
             }
 
-        }
+        });
 
 
        
@@ -418,173 +575,123 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function updateVisualization(timestepIndex) {
-        // This function will update the network visualization based on the timestep
-        console.log(`Updating visualization for timestep index ${timestepIndex}`);
+        // Fetch the chunk holding this timestep (usually cached) and update the network labels from it
+        requestedTimestep = timestepIndex;
+        getSnapshot(timestepIndex).then(snapshot => {
+            // The slider has moved on while this chunk was loading
+            if (timestepIndex !== requestedTimestep) return;
+            applySnapshot(timestepIndex, snapshot);
+        }).catch(error => {
+            console.error(`Error loading timestep ${timestepIndex}:`, error);
+        });
+    }
+
+    function applySnapshot(timestepIndex, snapshot) {
+        // Every label and edge direction for the timestep is collected first and applied as one
+        // batched DataSet update each for nodes and edges, so the network redraws once
+        const nodeUpdates = [];
+        const edgeUpdates = [];
+        const edgeIds = new Set(visEdges.getIds());
+        const hasEdge = id => edgeIds.has(id);
         
         // Update bus nodes
-        for (let bus in networkData.network.buses) {
-            const busData = networkData.network.buses[bus];
-            const nodalPrice = busData.nodal_prices && busData.nodal_prices[timestepIndex] !== undefined 
-                ? busData.nodal_prices[timestepIndex].toFixed(2) 
-                : 'N/A';
+        topology.buses.forEach((busData, i) => {
+            const bus = busData.name;
+            const nodalPrice = format(snapshot.value('buses', 'nodal_prices', i));
             
-            // Update node 
-            visNodes.update({
+            nodeUpdates.push({
                 id: bus,
                 label: `${bus}\nNodal Price: ${nodalPrice}`
             });
-        }
+        });
 
         // Update generator nodes
-        for (let bus in networkData.network.buses) {
-            for (let generator in networkData.network.buses[bus].generators) {
-                const generatorData = networkData.network.buses[bus].generators[generator];
-                const output = generatorData.outputs && generatorData.outputs[timestepIndex] !== undefined 
-                    ? generatorData.outputs[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const capacity = generatorData.capacities && generatorData.capacities[timestepIndex] !== undefined
-                    ? generatorData.capacities[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                
-                // Update node label
-                const node = visNodes.get(generator);
-                if (node) {
-                    node.label = `${generator}\nOutput: ${output} / ${capacity}`;
-                    visNodes.update(node);
-                }
+        topology.generators.forEach((generatorData, i) => {
+            const generator = generatorData.name;
+            const output = format(snapshot.value('generators', 'outputs', i));
+            const capacity = format(snapshot.value('generators', 'capacities', i));
+            
+            nodeUpdates.push({ id: generator, label: `${generator}\nOutput: ${output} / ${capacity}` });
 
-                // Update edge labels
-                const edge = visEdges.get(generator);
-                if (edge) {
-                    edge.label = `${output}`;
-                    visEdges.update(edge);
-                }
+            // Update edge labels
+            if (hasEdge(generator)) {
+                edgeUpdates.push({ id: generator, label: `${output}` });
             }
-        }
+        });
 
         // Update load nodes
-        for (let bus in networkData.network.buses) {
-            for (let load in networkData.network.buses[bus].loads) {
-                const loadData = networkData.network.buses[bus].loads[load];
-                const consumption = loadData.consumptions && loadData.consumptions[timestepIndex] !== undefined 
-                    ? loadData.consumptions[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                
-                // Update node label
-                const node = visNodes.get(load);
-                if (node) {
-                    node.label = `${load}\nConsumption: ${consumption}`;
-                    visNodes.update(node);
-                }
+        topology.loads.forEach((loadData, i) => {
+            const load = loadData.name;
+            const bus = loadData.bus;
+            const consumption = format(snapshot.value('loads', 'consumptions', i));
+            
+            nodeUpdates.push({ id: load, label: `${load}\nConsumption: ${consumption}` });
 
-                // Update edge labels
-                const edge = visEdges.get(load);
-                if (edge) {
-                    if (consumption > 0) {
+            // Update edge labels
+            if (hasEdge(load)) {
+                const edge = { id: load, label: `${consumption}` };
+                if (consumption > 0) {
                     edge.from = bus;
                     edge.to = load;
-                    } else if (consumption < 0) {
+                } else if (consumption < 0) {
                     edge.from = load;
                     edge.to = bus;
-                    }
-                    edge.label = `${consumption}`;
-                    visEdges.update(edge);
                 }
+                edgeUpdates.push(edge);
             }
-        }
+        });
 
         // Update storage unit nodes
-        for (let bus in networkData.network.buses) {
-            for (let storage in networkData.network.buses[bus].storage_units) {
-                const storageData = networkData.network.buses[bus].storage_units[storage];
-                const start_soc = storageData.soc_start_of_ts && storageData.soc_start_of_ts[timestepIndex] !== undefined 
-                    ? storageData.soc_start_of_ts[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const end_soc = storageData.soc_end_of_ts && storageData.soc_end_of_ts[timestepIndex] !== undefined 
-                    ? storageData.soc_end_of_ts[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const charge_inflow = storageData.charge_inflows && storageData.charge_inflows[timestepIndex] !== undefined 
-                    ? storageData.charge_inflows[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const discharge_outflow = storageData.discharge_outflows && storageData.discharge_outflows[timestepIndex] !== undefined 
-                    ? storageData.discharge_outflows[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                const net_inflow = charge_inflow - discharge_outflow;
-                const consumption = storageData.consumptions && storageData.consumptions[timestepIndex] !== undefined 
-                    ? storageData.consumptions[timestepIndex].toFixed(2) 
-                    : 'N/A';
-                
-                // Update node label
-                const node = visNodes.get(storage);
-                if (node) {
-                    node.label = `${storage}\nStart SOC: ${start_soc}\nEnd SOC: ${end_soc}`;
-                    visNodes.update(node);
-                }
-
-                // Update storage consumption node
-                const consumptionNode = visNodes.get(`${storage}_consumption`);
-                if (consumptionNode) {
-                    consumptionNode.label = `${storage}\nConsumption: ${consumption}`;
-                    visNodes.update(consumptionNode);
-                }
+        topology.storage_units.forEach((storageData, i) => {
+            const storage = storageData.name;
+            const bus = storageData.bus;
+            const start_soc = format(snapshot.value('storage_units', 'soc_start_of_ts', i));
+            const end_soc = format(snapshot.value('storage_units', 'soc_end_of_ts', i));
+            const charge_inflow = format(snapshot.value('storage_units', 'charge_inflows', i));
+            const discharge_outflow = format(snapshot.value('storage_units', 'discharge_outflows', i));
+            const net_inflow = charge_inflow - discharge_outflow;
+            const consumption = format(snapshot.value('storage_units', 'consumptions', i));
+            
+            nodeUpdates.push({ id: storage, label: `${storage}\nStart SOC: ${start_soc}\nEnd SOC: ${end_soc}` });
+            nodeUpdates.push({ id: `${storage}_consumption`, label: `${storage}\nConsumption: ${consumption}` });
 
-                // Update edge labels
-                const edge = visEdges.get(storage);
-
-                if (edge) {
-                    if (net_inflow > 0) {
-                        edge.from = bus;
-                        edge.to = storage;
-                        edge.label = `${net_inflow}`;
-                        visEdges.update(edge);
-                    } else {
-                        edge.from = storage;
-                        edge.to = bus;
-                        edge.label = `${-net_inflow}`;
-                        visEdges.update(edge);
-                    }
+            // Update edge labels
+            if (hasEdge(storage)) {
+                if (net_inflow > 0) {
+                    edgeUpdates.push({ id: storage, from: bus, to: storage, label: `${net_inflow}` });
+                } else {
+                    edgeUpdates.push({ id: storage, from: storage, to: bus, label: `${-net_inflow}` });
                 }
+            }
 
-                // Update storage consumption edge
-                const consumptionEdge = visEdges.get(`${storage}_consumption`);
-                if (consumptionEdge) {
-                    consumptionEdge.from = storage;
-                    consumptionEdge.to = `${storage}_consumption`;
-                    consumptionEdge.label = `${consumption}`;
-                    visEdges.update(consumptionEdge);
-                }
+            // Update storage consumption edge
+            if (hasEdge(`${storage}_consumption`)) {
+                edgeUpdates.push({
+                    id: `${storage}_consumption`,
+                    from: storage,
+                    to: `${storage}_consumption`,
+                    label: `${consumption}`
+                });
             }
-        }
+        });
 
-        // Update transmission line nodes
-        for (let line in networkData.network.transmission_lines) {
-            const lineData = networkData.network.transmission_lines[line];
-            const flow = lineData.flows && lineData.flows[timestepIndex] !== undefined 
-                ? lineData.flows[timestepIndex].toFixed(2) 
-                : 'N/A';
-            const capacity = lineData.capacities && lineData.capacities[timestepIndex] !== undefined
-                ? lineData.capacities[timestepIndex].toFixed(2) 
-                : 'N/A';
+        // Update transmission line edges
+        topology.transmission_lines.forEach((lineData, i) => {
+            const line = lineData.name;
+            const flow = format(snapshot.value('transmission_lines', 'flows', i));
+            const capacity = format(snapshot.value('transmission_lines', 'capacities', i));
             
-            // Update node label
-            const edge = visEdges.get(line);
-            if (edge) {
+            if (hasEdge(line)) {
                 if (flow > 0) {
-                    edge.from = lineData.start_bus;
-                    edge.to = lineData.end_bus;
-                    edge.label = `${flow} / ${capacity}`;
-                    visEdges.update(edge);
+                    edgeUpdates.push({ id: line, from: lineData.start_bus, to: lineData.end_bus, label: `${flow} / ${capacity}` });
                 } else {
-                    edge.from = lineData.end_bus;
-                    edge.to = lineData.start_bus;
-                    edge.label = `${-flow} / ${capacity}`;
-                    visEdges.update(edge);
+                    edgeUpdates.push({ id: line, from: lineData.end_bus, to: lineData.start_bus, label: `${-flow} / ${capacity}` });
                 }
             }
-        }
-
-
+        });
 
+        visNodes.update(nodeUpdates);
+        visEdges.update(edgeUpdates);
     }
     
     function generateColor(index, baseHue = 180, saturation = 60, lightness = 60) {
@@ -658,213 +765,212 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
-    function renderBusChart(busId) {
+    function destroyCharts() {
+        if (generatorChart) generatorChart.destroy(); // prevent duplicate overlays
+        if (busChart) busChart.destroy();
+        if (storageChart) storageChart.destroy();
+        if (loadChart) loadChart.destroy();
+    }
 
-            if (generatorChart) generatorChart.destroy(); // prevent duplicate overlays
-            if (busChart) busChart.destroy();
-            if (storageChart) storageChart.destroy();
-            if (loadChart) loadChart.destroy();
+    // Points of every layer in the timestep range [min, max], sampled down to CHART_POINTS
+    function samplePoints(type, layers, seriesList, min, max) {
+        const xs = seriesIndices(seriesList[0]);
+        const start = bisect(xs, min);
+        const stop = bisect(xs, max + 1);
+        const values = layers.map((layer, i) => seriesList[i][layer.key]);
+        const positions = type === 'line' && layers.length === 1
+            ? lttb(xs, values[0], start, stop, CHART_POINTS)
+            : minMax(values, start, stop, CHART_POINTS);
+        return layers.map((layer, i) => positions.map(p => ({
+            x: xs[p],
+            y: values[i][p] === null ? null : (layer.sign || 1) * values[i][p]
+        })));
+    }
 
-            const ctx = document.getElementById('flow-chart').getContext('2d');
-            
-            const busData = networkData.network.buses[busId];
+    // Chart of component series on a timestep axis. Each layer is a dataset style plus the series it
+    // draws: {kind, name, key, sign}. Wheel or pinch zooms, dragging pans and a double click resets.
+    function seriesChart(type, layers, options) {
+        return Promise.all(layers.map(layer => getSeries(layer.kind, layer.name))).then(seriesList => {
+            destroyCharts();
+            const canvas = document.getElementById('flow-chart');
+            const lastTimestep = topology.timesteps.length - 1;
+            let fullSeries = topology.downsampled ? null : seriesList;
 
-            const flows = {
-                labels: networkData.network.timesteps,
-                datasets: []
-            }
-            let index = 0;
-            // Add generator data if exists
-            if (busData.generators) {
-                for (let generator in busData.generators) {
-                    const generatorData = busData.generators[generator];
-                    if (generatorData.outputs) {
-                        flows.datasets.push({
-                            label: generator,
-                            data: generatorData.outputs,
-                            backgroundColor: generateColor(index),
-                            stack: 'energy'
-                        });
-                        index++;
+            const resample = ({ chart }) => {
+                const { min, max } = chart.scales.x;
+                const full = fullSeries || Promise.all(layers.map(layer => getSeries(layer.kind, layer.name, true)));
+                Promise.resolve(full).then(series => {
+                    fullSeries = series;
+                    // The chart was replaced or the view moved again while the full series loaded
+                    if (Chart.getChart(canvas) !== chart || chart.scales.x.min !== min || chart.scales.x.max !== max) return;
+                    samplePoints(type, layers, series, min, max).forEach((points, i) => {
+                        chart.data.datasets[i].data = points;
+                    });
+                    chart.update('none');
+                }).catch(error => console.error('Error loading full series:', error));
+            };
+
+            const x = (options.scales && options.scales.x) || {};
+            const plugins = options.plugins || {};
+            const chart = new Chart(canvas.getContext('2d'), {
+                type: type,
+                data: {
+                    datasets: samplePoints(type, layers, seriesList, 0, lastTimestep).map((points, i) => {
+                        const { kind, name, key, sign, ...style } = layers[i];
+                        return { ...style, data: points };
+                    })
+                },
+                options: {
+                    ...options,
+                    animation: false,
+                    scales: {
+                        ...options.scales,
+                        x: {
+                            ...x,
+                            type: 'linear',
+                            min: 0,
+                            max: lastTimestep,
+                            ticks: { ...x.ticks, callback: value => timestepName(value) }
+                        }
+                    },
+                    plugins: {
+                        ...plugins,
+                        tooltip: {
+                            ...plugins.tooltip,
+                            callbacks: { title: items => items.length ? timestepName(items[0].parsed.x) : '' }
+                        },
+                        zoom: {
+                            limits: { x: { min: 0, max: lastTimestep, minRange: 2 } },
+                            zoom: { wheel: { enabled: true }, pinch: { enabled: true }, mode: 'x', onZoomComplete: resample },
+                            pan: { enabled: true, mode: 'x', onPanComplete: resample }
+                        }
                     }
                 }
+            });
+            // Bucket extremes give a quick first view, the full series then puts the points where they occur
+            if (topology.downsampled) resample({ chart });
+            canvas.ondblclick = () => {
+                chart.resetZoom('none');
+                resample({ chart });
+            };
+            return chart;
+        });
+    }
+
+    function renderBusChart(busId) {
+
+            const busData = topology.buses[componentIndex.buses[busId]];
+            const lines = topology.transmission_lines.filter(line => line.start_bus === busId || line.end_bus === busId);
+            const layers = [];
+
+            let index = 0;
+            // Add generator data if exists
+            for (const i of busData.generators) {
+                const name = topology.generators[i].name;
+                layers.push({
+                    kind: 'generators', name: name, key: 'outputs',
+                    label: name,
+                    backgroundColor: generateColor(index),
+                    stack: 'energy'
+                });
+                index++;
             }
 
             // Outflows (Loads) as negative
-            if (busData.loads) {
-                for (let load in busData.loads) {
-                    const loadData = busData.loads[load];
-                    if (loadData.consumptions) {
-                        flows.datasets.push({
-                            label: load,
-                            data: loadData.consumptions.map(v => -v),
-                            backgroundColor: generateColor(index, 300),
-                            stack: 'energy'
-                        });
-                    }
-                }
+            for (const i of busData.loads) {
+                const name = topology.loads[i].name;
+                layers.push({
+                    kind: 'loads', name: name, key: 'consumptions', sign: -1,
+                    label: name,
+                    backgroundColor: generateColor(index, 300),
+                    stack: 'energy'
+                });
             }
 
-            //  Transmission line flows
-            for (let line in networkData.network.transmission_lines) {
-                const lineData = networkData.network.transmission_lines[line];
-                let color = generateColor(index, 240);
-                if (lineData.start_bus === busId) {
-                    flows.datasets.push({
-                        label: line,
-                        data: lineData.flows.map(v => -v),
-                        backgroundColor: color,
-                        stack: 'energy'
-                    })
-                        
-                } else if (lineData.end_bus === busId){
-                    flows.datasets.push({
-                        label: line,
-                        data: lineData.flows,
-                        backgroundColor: color,
-                        stack: 'energy'
-                    })
-                }
+            //  Transmission line flows, into the bus as positive
+            for (const line of lines) {
+                layers.push({
+                    kind: 'transmission_lines', name: line.name, key: 'flows', sign: line.start_bus === busId ? -1 : 1,
+                    label: line.name,
+                    backgroundColor: generateColor(index, 240),
+                    stack: 'energy'
+                });
             }
 
             // Storage flows
-            for (let storage in busData.storage_units) {
-                const storageData = busData.storage_units[storage];
-                const charge_inflows = storageData.charge_inflows
-                const discharge_outflows = storageData.discharge_outflows
+            for (const i of busData.storage_units) {
+                const name = topology.storage_units[i].name;
                 let color = generateColor(index, 60);
-                
-                flows.datasets.push({
-                    label: storage + " Charge",
-                    data: charge_inflows.map(v => -v),
+
+                layers.push({
+                    kind: 'storage_units', name: name, key: 'charge_inflows', sign: -1,
+                    label: name + " Charge",
                     backgroundColor: color,
                     stack: 'energy'
-                })
-                flows.datasets.push({
-                    label: storage + " Discharge",
-                    data: discharge_outflows,
+                });
+                layers.push({
+                    kind: 'storage_units', name: name, key: 'discharge_outflows',
+                    label: name + " Discharge",
                     backgroundColor: color,
                     stack: 'energy'
-                })
+                });
             }
 
-            busChart = new Chart(ctx, {
-                type: 'bar',
-                data: flows,
-                options: chartOptions
-            });
+            if (!layers.length) return;
+            // Every series on the bus is fetched at once, each only the first time it is shown
+            seriesChart('bar', layers, chartOptions)
+                .then(chart => { busChart = chart; })
+                .catch(error => console.error(`Error loading series for ${busId}:`, error));
         }
     
     function renderGeneratorChart(generatorId){
 
-
-        if (generatorChart) generatorChart.destroy(); // prevent duplicate overlays
-        if (busChart) busChart.destroy();
-        if (storageChart) storageChart.destroy();
-        if (loadChart) loadChart.destroy();
-
-        const ctx = document.getElementById('flow-chart').getContext('2d');
-        for (let bus in networkData.network.buses) {
-            const busData = networkData.network.buses[bus];
-            if (busData.generators && busData.generators[generatorId]) {
-                const generatorData = busData.generators[generatorId];
-                const output = generatorData.outputs;
-                const outputData = {
-                    labels: networkData.network.timesteps,
-                    datasets: [{
-                        label: generatorId,
-                        data: output,
-                        backgroundColor: 'rgba(75, 192, 192, 0.2)',
-                        borderColor: 'rgba(75, 192, 192, 1)',
-                        borderWidth: 1
-                    }]
-                };
-                generatorChart = new Chart(ctx, {
-                    type: 'line',
-                    data: outputData,
-                    options: chartOptions
-                });
-                return;
-            }
-        }
+        seriesChart('line', [{
+            kind: 'generators', name: generatorId, key: 'outputs',
+            label: generatorId,
+            backgroundColor: 'rgba(75, 192, 192, 0.2)',
+            borderColor: 'rgba(75, 192, 192, 1)',
+            borderWidth: 1
+        }], chartOptions)
+            .then(chart => { generatorChart = chart; })
+            .catch(error => console.error(`Error loading series for ${generatorId}:`, error));
 
     }
           
     function renderLoadChart(loadId){
-        if (generatorChart) generatorChart.destroy(); // prevent duplicate overlays
-        if (busChart) busChart.destroy();
-        if (storageChart) storageChart.destroy();
-        if (loadChart) loadChart.destroy();
-
-        const ctx = document.getElementById('flow-chart').getContext('2d');
-        for (let bus in networkData.network.buses) {
-            const busData = networkData.network.buses[bus];
-            if (busData.loads && busData.loads[loadId]) {
-                const loadData = busData.loads[loadId];
-                const consumption = loadData.consumptions;
-                const consumptionData = {
-                    labels: networkData.network.timesteps,
-                    datasets: [{
-                        label: loadId,
-                        data: consumption,
-                        backgroundColor: 'rgba(255, 99, 132, 0.2)',
-                        borderColor: 'rgba(255, 99, 132, 1)',
-                        borderWidth: 1
-                    }]
-                };
-                loadChart = new Chart(ctx, {
-                    type: 'line',
-                    data: consumptionData,
-                    options: chartOptions
-                });
-                return;
-            }
-        }
+        seriesChart('line', [{
+            kind: 'loads', name: loadId, key: 'consumptions',
+            label: loadId,
+            backgroundColor: 'rgba(255, 99, 132, 0.2)',
+            borderColor: 'rgba(255, 99, 132, 1)',
+            borderWidth: 1
+        }], chartOptions)
+            .then(chart => { loadChart = chart; })
+            .catch(error => console.error(`Error loading series for ${loadId}:`, error));
     }
 
     function renderStorageChart(storageId) {
 
-        if (generatorChart) generatorChart.destroy(); // prevent duplicate overlays
-        if (busChart) busChart.destroy();
-        if (storageChart) storageChart.destroy();
-        if (loadChart) loadChart.destroy();
-
-        const ctx = document.getElementById('flow-chart').getContext('2d');
-        
-        for (let bus in networkData.network.buses) {
-            const busData = networkData.network.buses[bus]; 
-            if (busData.storage_units && busData.storage_units[storageId]) {
-                const storageData = busData.storage_units[storageId];
-                const charge_inflows = storageData.charge_inflows
-                const discharge_outflows = storageData.discharge_outflows
-                const consumptions = storageData.consumptions.map(v => -v)
-
-                storageChart = new Chart(ctx, {
-                    type: 'bar',
-                    data: {
-                        labels: networkData.network.timesteps,
-                        datasets: [
-                            {
-                                label: storageId + " Charge",
-                                data: charge_inflows,
-                                backgroundColor: 'rgba(75, 192, 192, 0.7)',
-                                stack: 'storage'
-                            },
-                            {
-                                label: storageId + " Discharge",
-                                data: discharge_outflows.map(v => -v),
-                                backgroundColor: 'rgba(99, 169, 255, 0.7)',
-                                stack: 'storage'
-                            },
-                            {
-                                label: storageId + " Consumption",
-                                data: consumptions,
-                                backgroundColor: 'rgba(255, 0, 55, 0.7)',
-                                stack: 'storage'
-                            }
-                        ]
-                    },
-                    options: {
+        seriesChart('bar', [
+            {
+                kind: 'storage_units', name: storageId, key: 'charge_inflows',
+                label: storageId + " Charge",
+                backgroundColor: 'rgba(75, 192, 192, 0.7)',
+                stack: 'storage'
+            },
+            {
+                kind: 'storage_units', name: storageId, key: 'discharge_outflows', sign: -1,
+                label: storageId + " Discharge",
+                backgroundColor: 'rgba(99, 169, 255, 0.7)',
+                stack: 'storage'
+            },
+            {
+                kind: 'storage_units', name: storageId, key: 'consumptions', sign: -1,
+                label: storageId + " Consumption",
+                backgroundColor: 'rgba(255, 0, 55, 0.7)',
+                stack: 'storage'
+            }
+        ], {
                         responsive: true,
                         scales: {
                             x: {
@@ -908,12 +1014,9 @@ document.addEventListener('DOMContentLoaded', () => {
                                 }
                             }
                         }
-                    }
-                });
-                return;
-            }
-
-        }
+        })
+            .then(chart => { storageChart = chart; })
+            .catch(error => console.error(`Error loading series for ${storageId}:`, error));
     }
 
 